@@ -0,0 +1,80 @@
+"""Input size per step of a long ReAct loop, with and without context compaction.
+
+    pytest benchmarks/bench_context.py
+
+Replays a 10-step investigation whose tool results come from the fake
+backends. Before every model call the messages go through the agent's
+pre-model hook (`agent.context.compact_context`), and the estimated input
+tokens are compared with the same loop left uncompacted. The benchmark times
+the hook over the whole loop.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Tuple
+
+from conftest import CONTEXT_RESULTS
+from fakes import FakeDataset
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langgraph.graph.message import add_messages
+
+import tools.k8s as k8s
+import tools.prometheus as prometheus
+from agent.context import (
+    CONTEXT_TOKEN_BUDGET,
+    compact_context,
+    estimate_tokens,
+    fetch_tool_result,
+)
+
+
+def _steps(data: FakeDataset) -> List[Tuple[Any, Dict[str, Any]]]:
+    pod = data.pod_items[len(data.pod_items) // 2]["metadata"]
+    namespace = pod["namespace"]
+    return [
+        (k8s.list_pods, {"namespace": "all"}),
+        (k8s.get_events, {"namespace": "all", "limit": 300}),
+        (k8s.list_deployments, {"namespace": "all"}),
+        (k8s.describe_pod, {"pod_name": pod["name"], "namespace": namespace}),
+        (k8s.get_pod_logs, {"pod_name": pod["name"], "namespace": namespace, "tail_lines": 500}),
+        (prometheus.get_alerts, {}),
+        (k8s.list_nodes, {}),
+        (prometheus.execute_query, {"query": f'up{{namespace="{namespace}"}}'}),
+        (k8s.list_services, {"namespace": "all"}),
+        (k8s.list_pods, {"namespace": namespace}),
+    ]
+
+
+def _run_loop(results: List[Tuple[str, Dict[str, Any], str]], compact: bool) -> List[int]:
+    messages: List[BaseMessage] = add_messages([], [HumanMessage("Why is the checkout service failing?")])
+    per_step = []
+    for i, (name, args, output) in enumerate(results):
+        call_id = f"call-{i}"
+        messages = add_messages(messages, [
+            AIMessage("", tool_calls=[{"name": name, "args": args, "id": call_id}]),
+            ToolMessage(output, name=name, tool_call_id=call_id),
+        ])
+        if compact:
+            messages = add_messages(messages, compact_context({"messages": messages}).get("messages", []))
+        per_step.append(estimate_tokens(messages))
+    return per_step
+
+
+def test_context_compaction(benchmark, backends, dataset: FakeDataset) -> None:
+    results = []
+    for tool, args in _steps(dataset):
+        output = asyncio.run(tool.ainvoke(args))
+        results.append((tool.name, args, output if isinstance(output, str) else json.dumps(output, default=str)))
+
+    raw = _run_loop(results, compact=False)
+    compacted = benchmark(_run_loop, results, True)
+    for step, (before, after) in enumerate(zip(raw, compacted), 1):
+        CONTEXT_RESULTS.append({"step": step, "tool": results[step - 1][0], "raw_tokens": before, "compacted_tokens": after})
+    benchmark.extra_info.update({"raw_total_tokens": sum(raw), "compacted_total_tokens": sum(compacted)})
+
+    # Only the latest tool result may push the context over the budget
+    largest = max(len(output) for _, _, output in results) // 4
+    assert max(compacted) <= CONTEXT_TOKEN_BUDGET + largest
+    # Compacted results can still be read back
+    fetched = asyncio.run(fetch_tool_result.ainvoke({"ref": "call-0", "grep": "Running"}))
+    assert "error" not in fetched and fetched["content"]
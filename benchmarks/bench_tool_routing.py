@@ -0,0 +1,79 @@
+"""Input tokens per ReAct step with and without tool routing.
+
+    pytest benchmarks/bench_tool_routing.py
+
+Every model call sends the system prompt, the bound tool schemas and the
+conversation. For a set of representative requests this compares the fixed
+part (prompt + tools + request) when all tools are bound with the subset
+picked by `agent.tool_router`, and times the routing itself. Tokens are
+counted with tiktoken's o200k_base encoding when it is available locally,
+otherwise estimated at 4 characters per token.
+"""
+
+import json
+from typing import List
+
+import pytest
+from conftest import ROUTING_RESULTS
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent.constants import SYSTEM_PROMPT
+from agent.tool_router import ToolRouter
+from tools.registry import SRE_TOOLS, TOOL_GROUPS
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # not installed, or the encoding cannot be downloaded
+    _ENCODING = None
+
+ALERT = json.dumps({"status": "firing", "alerts": [{
+    "labels": {"alertname": "KubePodCrashLooping", "namespace": "payments", "pod": "checkout-7d9f8b6c5d-x2k4q", "severity": "critical"},
+    "annotations": {"summary": "Pod payments/checkout-7d9f8b6c5d-x2k4q is crash looping"},
+    "startsAt": "2025-01-01T10:00:00Z",
+}]})
+
+REQUESTS = {
+    "alert": [HumanMessage(ALERT)],
+    "pods": [HumanMessage("Quais pods estão em CrashLoopBackOff no namespace payments?")],
+    "metrics": [HumanMessage("A latência p99 do checkout subiu na última hora?")],
+    "owner": [HumanMessage("Quem é o dono do serviço checkout no catálogo?")],
+    "deploy": [HumanMessage("Houve algum rollout do argocd no payments hoje?")],
+    "generic": [HumanMessage("Pode me ajudar com um problema?")],
+    "escalated": [
+        HumanMessage("Pode me ajudar com um problema?"),
+        AIMessage("", tool_calls=[{"name": "request_tools", "args": {"groups": ["backstage"]}, "id": "call-1"}]),
+    ],
+}
+
+
+def _tokens(text: str) -> int:
+    return len(_ENCODING.encode(text)) if _ENCODING else len(text) // 4
+
+
+def _step_tokens(tools: List, messages: List[BaseMessage]) -> int:
+    schemas = json.dumps([convert_to_openai_tool(tool) for tool in tools])
+    return _tokens(SYSTEM_PROMPT) + _tokens(schemas) + sum(_tokens(str(m.content)) for m in messages)
+
+
+@pytest.mark.parametrize("request_name", list(REQUESTS))
+def test_tool_routing(benchmark, request_name: str) -> None:
+    router = ToolRouter(TOOL_GROUPS)
+    messages = REQUESTS[request_name]
+    routed = benchmark(router.select_tools, messages)
+
+    full = _step_tokens(SRE_TOOLS, messages)
+    subset = _step_tokens(routed, messages)
+    row = {
+        "name": request_name,
+        "tools": f"{len(routed)}/{len(SRE_TOOLS)}",
+        "groups": ",".join(sorted(router.select_groups(messages))),
+        "full_tokens": full,
+        "routed_tokens": subset,
+        "reduction_pct": 100.0 * (full - subset) / full,
+    }
+    benchmark.extra_info.update(row)
+    ROUTING_RESULTS.append(row)
+    assert subset <= full
@@ -0,0 +1,156 @@
+"""Latency, memory and payload size of every tool against the fake backends.
+
+    pytest benchmarks/bench_tools.py
+    BENCH_PODS=100000 pytest benchmarks/bench_tools.py -k k8s --benchmark-autosave
+    pytest benchmarks/bench_tools.py --benchmark-compare   # against the last saved run
+
+Sizes come from the BENCH_* variables documented in `benchmarks/fakes.py`.
+"""
+
+import asyncio
+import json
+import os
+import resource
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from conftest import RESULTS
+from fakes import FakeDataset
+
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", 10))
+
+Case = Tuple[str, str, Callable[[FakeDataset], Dict[str, Any]]]
+
+
+def _pod(data: FakeDataset) -> Dict[str, Any]:
+    return data.pod_items[len(data.pod_items) // 2]["metadata"]
+
+
+def _series(data: FakeDataset, metric: str) -> Dict[str, str]:
+    return next(labels for labels in data.series_labels if labels["__name__"] == metric)
+
+
+def _deployment(data: FakeDataset) -> Dict[str, Any]:
+    return data.deployment_items[len(data.deployment_items) // 2]["metadata"]
+
+
+CASES: List[Case] = [
+    ("k8s", "list_pods", lambda d: {"namespace": "all"}),
+    ("k8s", "list_pods", lambda d: {"namespace": _pod(d)["namespace"]}),
+    ("k8s", "list_pods", lambda d: {"namespace": _pod(d)["namespace"], "cluster": "all"}),
+    ("k8s", "describe_pod", lambda d: {"pod_name": _pod(d)["name"], "namespace": _pod(d)["namespace"]}),
+    ("k8s", "describe_pods", lambda d: {"namespace": _pod(d)["namespace"], "label_selector": f'app={_pod(d)["labels"]["app"]}'}),
+    ("k8s", "describe_pods", lambda d: {"namespace": _pod(d)["namespace"], "pod_names": [
+        p["metadata"]["name"] for p in d.pod_items if p["metadata"]["namespace"] == _pod(d)["namespace"]
+    ][:15]}),
+    ("k8s", "get_pod_logs", lambda d: {"pod_name": _pod(d)["name"], "namespace": _pod(d)["namespace"], "tail_lines": 500}),
+    ("k8s", "search_logs", lambda d: {"namespace": _pod(d)["namespace"], "selector": f'app={_pod(d)["labels"]["app"]}', "pattern": "ERROR.*upstream"}),
+    ("k8s", "list_deployments", lambda d: {"namespace": "all"}),
+    ("k8s", "describe_deployment", lambda d: {"deployment_name": _deployment(d)["name"], "namespace": _deployment(d)["namespace"]}),
+    ("k8s", "describe_deployments", lambda d: {"namespace": _deployment(d)["namespace"], "deployment_names": [
+        x["metadata"]["name"] for x in d.deployment_items if x["metadata"]["namespace"] == _deployment(d)["namespace"]
+    ][:30]}),
+    ("k8s", "list_services", lambda d: {"namespace": "all"}),
+    ("k8s", "get_events", lambda d: {"namespace": "all", "limit": 500}),
+    ("k8s", "list_nodes", lambda d: {}),
+    ("k8s", "cluster_capacity", lambda d: {}),
+    ("prometheus", "execute_query", lambda d: {"query": "container_memory_working_set_bytes"}),
+    ("prometheus", "execute_query", lambda d: {"query": f'up{{namespace="{_pod(d)["namespace"]}"}}'}),
+    ("prometheus", "execute_range_query", lambda d: {
+        "query": f'http_requests_total{{namespace="{_series(d, "http_requests_total")["namespace"]}"}}',
+        "start": str(d.now - 3600), "end": str(d.now), "step": "60",
+    }),
+    ("prometheus", "list_metric_label_values", lambda d: {"metric": "container_cpu_usage_seconds_total", "label": "pod"}),
+    ("prometheus", "get_alerts", lambda d: {}),
+    ("prometheus", "search_metrics", lambda d: {"term": "cpu usage"}),
+    ("analytics", "correlate_change_points", lambda d: {"starts_at": str(d.now - 1500)}),
+    ("analytics", "score_anomalies", lambda d: {"query": "node_cpu_seconds_total", "window": "30m", "baseline": "1d", "end": str(d.now)}),
+    ("timeline", "build_timeline", lambda d: {"scope": _pod(d)["namespace"], "since": "2h"}),
+    ("argocd", "list_applications", lambda d: {}),
+    ("argocd", "get_application_status", lambda d: {"app_name": d.application_items[0]["metadata"]["name"]}),
+    ("argocd", "get_application_events", lambda d: {"app_name": d.application_items[0]["metadata"]["name"]}),
+    ("argocd", "correlate_deploys", lambda d: {"alert_time": str(d.now - 900)}),
+    ("argocd", "get_application_logs", lambda d: {"app_name": d.application_items[0]["metadata"]["name"], "container_name": "app", "lines": 200}),
+    ("backstage", "list_entities", lambda d: {"kind": "component"}),
+    ("backstage", "get_entity_metadata", lambda d: {"kind": "component", "name": d.entity_items[0]["metadata"]["name"]}),
+    ("backstage", "search_entities_by_attribute", lambda d: {"kind": "component", "attribute": "spec.lifecycle", "value": "production"}),
+    ("backstage", "search_catalog_entities", lambda d: {"term": "team-07"}),
+    ("backstage", "list_entity_attributes", lambda d: {"kind": "group", "name": d.entity_items[3]["metadata"]["name"]}),
+]
+
+
+def _case_id(case: Case) -> str:
+    return f"{case[0]}.{case[1]}"
+
+
+def _resolve_tool(module: str, name: str) -> Any:
+    import importlib
+
+    return getattr(importlib.import_module(f"tools.{module}"), name)
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _measure(benchmark, tool: Any, args: Dict[str, Any], label: str) -> Any:
+    samples: List[float] = []
+
+    def call() -> Any:
+        start = time.perf_counter()
+        result = asyncio.run(tool.ainvoke(args))
+        samples.append(time.perf_counter() - start)
+        return result
+
+    result = benchmark.pedantic(call, rounds=ROUNDS, iterations=1, warmup_rounds=1)
+    assert not (isinstance(result, dict) and result.get("error")), result
+
+    # Allocation peak is measured on a separate run: tracemalloc distorts timings
+    tracemalloc.start()
+    asyncio.run(tool.ainvoke(args))
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    row = {
+        "name": f"{label}({', '.join(f'{k}={v}' for k, v in args.items())})"[:44],
+        "p50_ms": _percentile(samples, 0.50) * 1000,
+        "p99_ms": _percentile(samples, 0.99) * 1000,
+        "peak_alloc_mb": peak_alloc / 2**20,
+        # ru_maxrss is the process high-water mark (KiB on Linux)
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "output_bytes": len(json.dumps(result, default=str)),
+    }
+    benchmark.extra_info.update(row)
+    RESULTS.append(row)
+    return result
+
+
+@pytest.mark.parametrize("case", CASES, ids=[_case_id(c) for c in CASES])
+def test_tool(benchmark, backends, dataset, case: Case):
+    module, name, make_args = case
+    _measure(benchmark, _resolve_tool(module, name), make_args(dataset), _case_id(case))
+
+
+FAST_PATH_CASES: List[Case] = [
+    ("k8s", "list_pods", lambda d: {"namespace": "all"}),
+    ("k8s", "get_events", lambda d: {"namespace": "all", "limit": 1000}),
+    ("k8s", "list_nodes", lambda d: {}),
+]
+
+
+@pytest.mark.parametrize("fast_path", [True, False], ids=["raw", "model"])
+@pytest.mark.parametrize("case", FAST_PATH_CASES, ids=[_case_id(c) for c in FAST_PATH_CASES])
+def test_k8s_fast_path(benchmark, backends, dataset, monkeypatch, case: Case, fast_path: bool):
+    """Raw JSON fast path against client model deserialization, same output."""
+    import tools.k8s as k8s
+
+    module, name, make_args = case
+    tool, args = _resolve_tool(module, name), make_args(dataset)
+    monkeypatch.setattr(k8s, "K8S_FAST_PATH", not fast_path)
+    expected = asyncio.run(tool.ainvoke(args))
+    monkeypatch.setattr(k8s, "K8S_FAST_PATH", fast_path)
+    result = _measure(benchmark, tool, args, f"{_case_id(case)}[{'raw' if fast_path else 'model'}]")
+    assert result == expected
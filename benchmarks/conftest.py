@@ -0,0 +1,86 @@
+"""Fixtures wiring the tools in `src/tools/` to the fake backends."""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+for _p in (str(SRC_DIR), str(BENCH_DIR)):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from fakes import FakeDataset, start_all  # noqa: E402
+
+# Rows collected by the benchmarks for the end-of-session summary
+RESULTS: List[Dict[str, Any]] = []
+# Rows of bench_tool_routing.py and bench_context.py
+ROUTING_RESULTS: List[Dict[str, Any]] = []
+CONTEXT_RESULTS: List[Dict[str, Any]] = []
+
+
+@pytest.fixture(scope="session")
+def dataset() -> FakeDataset:
+    start = time.perf_counter()
+    data = FakeDataset()
+    sys.stdout.write(
+        f"\nfake dataset: {len(data.pod_items)} pods, {len(data.series_labels)} series, "
+        f"{len(data.entity_items)} entities ({time.perf_counter() - start:.1f}s)\n"
+    )
+    return data
+
+
+@pytest.fixture(scope="session")
+def backends(dataset: FakeDataset):
+    """Start every fake backend and point the tool modules at them."""
+    from kubernetes import client
+
+    import tools.argocd as argocd
+    import tools.backstage as backstage
+    import tools.k8s as k8s
+    import tools.prometheus as prometheus
+
+    servers = start_all(dataset, float(os.environ.get("BENCH_LATENCY_MS", 0)) / 1000.0)
+    prometheus.config.url = servers["prometheus"].url
+    argocd.config.url, argocd.config.token = servers["argocd"].url, "fake"
+    backstage.config.url = servers["backstage"].url
+    k8s.clusters.add(k8s.clusters.default, k8s.TracedApiClient(client.Configuration(host=servers["kubernetes"].url)))
+    # A second cluster on the same fake API exercises the concurrent 'all' mode
+    k8s.clusters.add("bench-replica", k8s.TracedApiClient(client.Configuration(host=servers["kubernetes"].url)))
+    yield servers
+    for server in servers.values():
+        server.stop()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if ROUTING_RESULTS:
+        terminalreporter.section("input tokens per step (system prompt + tool schemas + request)")
+        terminalreporter.write_line(f"{'request':<12} {'tools':>7} {'all tools':>10} {'routed':>8} {'saved':>7}  groups")
+        for row in ROUTING_RESULTS:
+            terminalreporter.write_line(
+                f"{row['name']:<12} {row['tools']:>7} {row['full_tokens']:>10} {row['routed_tokens']:>8} "
+                f"{row['reduction_pct']:>6.1f}%  {row['groups']}"
+            )
+    if CONTEXT_RESULTS:
+        terminalreporter.section("estimated input tokens per ReAct step")
+        terminalreporter.write_line(f"{'step':>4} {'tool result added':<20} {'uncompacted':>12} {'compacted':>10}")
+        for row in CONTEXT_RESULTS:
+            terminalreporter.write_line(f"{row['step']:>4} {row['tool']:<20} {row['raw_tokens']:>12} {row['compacted_tokens']:>10}")
+        terminalreporter.write_line(
+            f"{'sum':>4} {'':<20} {sum(r['raw_tokens'] for r in CONTEXT_RESULTS):>12} "
+            f"{sum(r['compacted_tokens'] for r in CONTEXT_RESULTS):>10}"
+        )
+    if not RESULTS:
+        return
+    terminalreporter.section("tool latency / memory / payload")
+    header = f"{'benchmark':<44} {'p50 ms':>9} {'p99 ms':>9} {'peak alloc MB':>14} {'peak RSS MB':>12} {'output KB':>10}"
+    terminalreporter.write_line(header)
+    for row in RESULTS:
+        terminalreporter.write_line(
+            f"{row['name']:<44} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+            f"{row['peak_alloc_mb']:>14.1f} {row['peak_rss_mb']:>12.1f} {row['output_bytes'] / 1024:>10.1f}"
+        )
@@ -0,0 +1,854 @@
+#!/usr/bin/env python3
+"""Local stand-ins for the backends used by the tools in `src/tools/`.
+
+Each fake is a small threaded HTTP server speaking just enough of the real API
+for the tools: Prometheus `/api/v1/*`, ArgoCD `/api/v1/applications*`,
+Backstage `/entities` and `/api/search/query`, and the Kubernetes core/apps
+APIs. Data is generated deterministically from a seed and scales through
+`FakeDataset` (or the BENCH_* environment variables), e.g. 100k pods, 10k
+series or 5k catalog entities.
+
+Run it standalone to point the agent at fake backends:
+
+    python benchmarks/fakes.py --pods 20000 --series 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+Query = Dict[str, List[str]]
+Body = Union[bytes, Iterable[bytes]]
+Route = Tuple["re.Pattern[str]", Callable[..., Tuple[int, Body, str]]]
+
+METRIC_FAMILIES = {
+    "up": "gauge",
+    "container_cpu_usage_seconds_total": "counter",
+    "container_memory_working_set_bytes": "gauge",
+    "kube_pod_container_status_restarts_total": "counter",
+    "http_requests_total": "counter",
+    "http_request_duration_seconds_bucket": "histogram",
+    "http_server_errors_total": "counter",
+    "node_cpu_seconds_total": "counter",
+    "node_memory_MemAvailable_bytes": "gauge",
+    "kube_deployment_status_replicas_available": "gauge",
+}
+MATCHER_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(=~|!~|!=|=)\s*"([^"]*)"')
+IDENTIFIER_RE = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _json(data: Any) -> Tuple[int, bytes, str]:
+    return 200, json.dumps(data, separators=(",", ":")).encode(), "application/json"
+
+
+def _first(query: Query, key: str, default: Optional[str] = None) -> Optional[str]:
+    values = query.get(key)
+    return values[0] if values else default
+
+
+@dataclass
+class FakeDataset:
+    """Deterministic fake cluster, metrics, GitOps and catalog data."""
+
+    pods: int = field(default_factory=lambda: _env_int("BENCH_PODS", 1000))
+    series: int = field(default_factory=lambda: _env_int("BENCH_SERIES", 10000))
+    entities: int = field(default_factory=lambda: _env_int("BENCH_ENTITIES", 5000))
+    events: int = field(default_factory=lambda: _env_int("BENCH_EVENTS", 2000))
+    applications: int = field(default_factory=lambda: _env_int("BENCH_APPS", 200))
+    log_lines: int = field(default_factory=lambda: _env_int("BENCH_LOG_LINES", 2000))
+    seed: int = 42
+    now: float = field(default_factory=time.time)
+
+    def __post_init__(self) -> None:
+        rng = random.Random(self.seed)
+        self.namespace_names = [f"team-{i:02d}" for i in range(max(5, self.pods // 200))]
+        self.node_names = [f"node-{i:03d}" for i in range(max(3, self.pods // 100))]
+        self.deployment_items = self._build_deployments(rng)
+        self.pod_items = self._build_pods(rng)
+        self.node_items = self._build_nodes()
+        self.service_items = [self._service(d) for d in self.deployment_items]
+        self.event_items = self._build_events(rng)
+        self.series_labels = self._build_series(rng)
+        self.alert_items = self._build_alerts()
+        self.application_items = self._build_applications(rng)
+        self.entity_items = self._build_entities(rng)
+        self._by_name: Dict[str, List[int]] = {}
+        for index, labels in enumerate(self.series_labels):
+            self._by_name.setdefault(labels["__name__"], []).append(index)
+
+    # -- Kubernetes -------------------------------------------------------
+
+    def _build_deployments(self, rng: random.Random) -> List[Dict[str, Any]]:
+        deployments = []
+        for i in range(max(1, self.pods // 4)):
+            namespace = self.namespace_names[i % len(self.namespace_names)]
+            name = f"svc-{i:05d}"
+            replicas = 4
+            template_hash = f"{rng.getrandbits(36):09x}"[:9]
+            container = {
+                "name": "app",
+                "image": f"registry.local/{name}:1.{i % 7}.0",
+                "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+                "resources": {
+                    "requests": {"cpu": rng.choice(["100m", "250m", "500m", "1"]), "memory": rng.choice(["128Mi", "256Mi", "512Mi", "1Gi"])},
+                    "limits": {"cpu": rng.choice(["500m", "1", "2"]), "memory": rng.choice(["512Mi", "1Gi", "2Gi"])},
+                },
+            }
+            deployments.append({
+                "apiVersion": "apps/v1",
+                "kind": "Deployment",
+                "metadata": {
+                    "name": name,
+                    "namespace": namespace,
+                    "uid": f"dep-{i}",
+                    "labels": {"app": name},
+                    "creationTimestamp": _iso(self.now - 86400 * (1 + i % 30)),
+                },
+                "spec": {
+                    "replicas": replicas,
+                    "selector": {"matchLabels": {"app": name}},
+                    "strategy": {"type": "RollingUpdate"},
+                    "template": {
+                        "metadata": {"labels": {"app": name, "pod-template-hash": template_hash}},
+                        "spec": {"containers": [container]},
+                    },
+                },
+                "status": {
+                    "replicas": replicas,
+                    "readyReplicas": replicas,
+                    "updatedReplicas": replicas,
+                    "availableReplicas": replicas,
+                    "conditions": [
+                        {"type": "Available", "status": "True", "reason": "MinimumReplicasAvailable", "message": "Deployment has minimum availability."},
+                        {"type": "Progressing", "status": "True", "reason": "NewReplicaSetAvailable", "message": f'ReplicaSet "{name}-{template_hash}" has successfully progressed.'},
+                    ],
+                },
+            })
+        return deployments
+
+    def _build_pods(self, rng: random.Random) -> List[Dict[str, Any]]:
+        pods = []
+        for i in range(self.pods):
+            deployment = self.deployment_items[i % len(self.deployment_items)]
+            meta = deployment["metadata"]
+            template = deployment["spec"]["template"]
+            template_hash = template["metadata"]["labels"]["pod-template-hash"]
+            name = f"{meta['name']}-{template_hash}-{rng.getrandbits(25):07x}"[:len(meta['name']) + 16]
+            started = self.now - rng.randint(600, 86400 * 3)
+            crashing = rng.random() < 0.03
+            pending = not crashing and rng.random() < 0.01
+            restarts = rng.randint(5, 60) if crashing else (rng.randint(0, 2) if rng.random() < 0.1 else 0)
+            container = template["spec"]["containers"][0]
+            if crashing:
+                state = {"waiting": {"reason": "CrashLoopBackOff", "message": "back-off 5m0s restarting failed container"}}
+                last_state = {"terminated": {"exitCode": 137, "reason": "OOMKilled", "finishedAt": _iso(self.now - 120)}}
+            else:
+                state = {"running": {"startedAt": _iso(started)}}
+                last_state = {}
+            status: Dict[str, Any] = {
+                "phase": "Pending" if pending else "Running",
+                "startTime": _iso(started),
+                "conditions": [{"type": "Ready", "status": "False" if (crashing or pending) else "True"}],
+            }
+            if not pending:
+                status["podIP"] = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+                status["containerStatuses"] = [{
+                    "name": container["name"],
+                    "image": container["image"],
+                    "imageID": f"docker-pullable://{container['image']}@sha256:{i:064x}",
+                    "ready": not crashing,
+                    "restartCount": restarts,
+                    "started": not crashing,
+                    "state": state,
+                    "lastState": last_state,
+                }]
+            pods.append({
+                "apiVersion": "v1",
+                "kind": "Pod",
+                "metadata": {
+                    "name": name,
+                    "namespace": meta["namespace"],
+                    "uid": f"pod-{i}",
+                    "labels": dict(template["metadata"]["labels"]),
+                    "creationTimestamp": _iso(started),
+                    "ownerReferences": [{
+                        "apiVersion": "apps/v1", "kind": "ReplicaSet", "name": f"{meta['name']}-{template_hash}",
+                        "uid": f"rs-{meta['uid']}", "controller": True,
+                    }],
+                },
+                "spec": {
+                    "nodeName": None if pending else self.node_names[i % len(self.node_names)],
+                    "containers": [container],
+                },
+                "status": status,
+            })
+        return pods
+
+    def _build_nodes(self) -> List[Dict[str, Any]]:
+        nodes = []
+        for i, name in enumerate(self.node_names):
+            labels = {"kubernetes.io/hostname": name}
+            if i == 0:
+                labels["node-role.kubernetes.io/control-plane"] = ""
+            memory_pressure = "True" if i % 17 == 5 else "False"
+            nodes.append({
+                "apiVersion": "v1",
+                "kind": "Node",
+                "metadata": {"name": name, "uid": f"node-{i}", "labels": labels, "creationTimestamp": _iso(self.now - 86400 * 60)},
+                "status": {
+                    "capacity": {"cpu": "16", "memory": "65843092Ki", "pods": "110", "ephemeral-storage": "100Gi"},
+                    "allocatable": {"cpu": "15890m", "memory": "64Gi", "pods": "110", "ephemeral-storage": "95Gi"},
+                    "conditions": [
+                        {"type": "MemoryPressure", "status": memory_pressure, "reason": "KubeletHasSufficientMemory"},
+                        {"type": "DiskPressure", "status": "False", "reason": "KubeletHasNoDiskPressure"},
+                        {"type": "PIDPressure", "status": "False", "reason": "KubeletHasSufficientPID"},
+                        {"type": "Ready", "status": "True", "reason": "KubeletReady"},
+                    ],
+                    "nodeInfo": {
+                        "architecture": "amd64", "bootID": f"boot-{i}", "containerRuntimeVersion": "containerd://1.7.13",
+                        "kernelVersion": "6.1.0", "kubeProxyVersion": "v1.29.2", "kubeletVersion": "v1.29.2",
+                        "machineID": f"machine-{i}", "operatingSystem": "linux", "osImage": "Debian GNU/Linux 12",
+                        "systemUUID": f"uuid-{i}",
+                    },
+                },
+            })
+        return nodes
+
+    def _service(self, deployment: Dict[str, Any]) -> Dict[str, Any]:
+        meta = deployment["metadata"]
+        index = int(meta["uid"].split("-")[1])
+        return {
+            "apiVersion": "v1",
+            "kind": "Service",
+            "metadata": {"name": meta["name"], "namespace": meta["namespace"], "uid": f"svc-{index}", "creationTimestamp": meta["creationTimestamp"]},
+            "spec": {
+                "type": "ClusterIP",
+                "clusterIP": f"10.96.{(index >> 8) & 255}.{index & 255}",
+                "ports": [{"port": 80, "targetPort": 8080, "protocol": "TCP"}],
+                "selector": {"app": meta["name"]},
+            },
+        }
+
+    def _build_events(self, rng: random.Random) -> List[Dict[str, Any]]:
+        reasons = [
+            ("Normal", "Scheduled", "Successfully assigned pod"),
+            ("Normal", "Pulled", "Container image already present on machine"),
+            ("Warning", "BackOff", "Back-off restarting failed container"),
+            ("Warning", "Unhealthy", "Readiness probe failed: HTTP probe failed with statuscode: 503"),
+            ("Warning", "FailedScheduling", "0/3 nodes are available: insufficient memory"),
+            ("Normal", "ScalingReplicaSet", "Scaled up replica set"),
+        ]
+        events = []
+        for i in range(self.events):
+            pod = self.pod_items[rng.randrange(len(self.pod_items))]
+            event_type, reason, message = reasons[rng.randrange(len(reasons))]
+            last = self.now - rng.randint(0, 7200)
+            events.append({
+                "apiVersion": "v1",
+                "kind": "Event",
+                "metadata": {"name": f"{pod['metadata']['name']}.{i:08x}", "namespace": pod["metadata"]["namespace"], "creationTimestamp": _iso(last - 60)},
+                "involvedObject": {"kind": "Pod", "name": pod["metadata"]["name"], "namespace": pod["metadata"]["namespace"]},
+                "reason": reason,
+                "message": message,
+                "type": event_type,
+                "count": rng.randint(1, 20),
+                "firstTimestamp": _iso(last - rng.randint(60, 3600)),
+                "lastTimestamp": _iso(last),
+                "source": {"component": "kubelet"},
+            })
+        events.sort(key=lambda e: e["lastTimestamp"])
+        return events
+
+    # -- Prometheus -------------------------------------------------------
+
+    def _build_series(self, rng: random.Random) -> List[Dict[str, str]]:
+        names = list(METRIC_FAMILIES)
+        series = []
+        for i in range(self.series):
+            pod = self.pod_items[i % len(self.pod_items)]["metadata"]
+            labels = {
+                "__name__": names[i % len(names)],
+                "namespace": pod["namespace"],
+                "pod": pod["name"],
+                "container": "app",
+                "instance": f"10.0.{(i >> 8) & 255}.{i & 255}:8080",
+                "job": "kubernetes-pods",
+            }
+            if labels["__name__"].startswith("http_"):
+                labels["code"] = rng.choice(["200", "200", "200", "500"])
+            series.append(labels)
+        return series
+
+    def series_value(self, index: int, ts: float) -> float:
+        """Deterministic sample: a daily wave plus noise, with ~1% of series shifting 30 minutes ago."""
+        base = 10 + (index % 97)
+        wave = math.sin(ts / 3600.0 + index) * base * 0.1
+        noise = ((index * 2654435761 + int(ts)) % 1000) / 1000.0 * base * 0.05
+        shifted = index % 100 == 7 and ts > self.now - 1800
+        return (base + wave + noise) * (5.0 if shifted else 1.0)
+
+    def select_series(self, query: str) -> List[int]:
+        """Return indexes of series matched by the first known metric name and the equality/regex matchers of `query`."""
+        names = [token for token in IDENTIFIER_RE.findall(query) if token in self._by_name]
+        candidates = self._by_name.get(names[0], []) if names else []
+        matchers = MATCHER_RE.findall(query)
+        selected = []
+        for index in candidates:
+            labels = self.series_labels[index]
+            ok = True
+            for label, op, value in matchers:
+                actual = labels.get(label, "")
+                if op == "=":
+                    ok = actual == value
+                elif op == "!=":
+                    ok = actual != value
+                elif op == "=~":
+                    ok = re.fullmatch(value, actual) is not None
+                else:
+                    ok = re.fullmatch(value, actual) is None
+                if not ok:
+                    break
+            if ok:
+                selected.append(index)
+        return selected
+
+    def _build_alerts(self) -> List[Dict[str, Any]]:
+        alerts = []
+        for pod in self.pod_items:
+            statuses = pod["status"].get("containerStatuses") or []
+            if statuses and statuses[0]["state"].get("waiting"):
+                alerts.append({
+                    "labels": {
+                        "alertname": "PodCrashLooping", "severity": "critical",
+                        "namespace": pod["metadata"]["namespace"], "pod": pod["metadata"]["name"],
+                    },
+                    "annotations": {"summary": f"Pod {pod['metadata']['name']} is crash looping"},
+                    "state": "firing",
+                    "activeAt": _iso(self.now - 900),
+                    "value": str(statuses[0]["restartCount"]),
+                })
+        return alerts[:500]
+
+    # -- ArgoCD -----------------------------------------------------------
+
+    def _build_applications(self, rng: random.Random) -> List[Dict[str, Any]]:
+        apps = []
+        for i, deployment in enumerate(self.deployment_items[: self.applications]):
+            meta = deployment["metadata"]
+            history = []
+            deployed_at = self.now - rng.randint(0, 6 * 3600)
+            for h in range(10):
+                revision = f"{rng.getrandbits(160):040x}"
+                history.append({
+                    "id": 10 - h,
+                    "revision": revision,
+                    "deployStartedAt": _iso(deployed_at - 30),
+                    "deployedAt": _iso(deployed_at),
+                    "source": {"repoURL": "https://git.local/platform/apps.git", "path": f"apps/{meta['name']}", "targetRevision": "HEAD"},
+                })
+                deployed_at -= rng.randint(3600, 3 * 86400)
+            history.reverse()
+            latest = history[-1]
+            degraded = i % 25 == 3
+            apps.append({
+                "metadata": {"name": meta["name"], "namespace": "argocd", "uid": f"app-{i}", "creationTimestamp": meta["creationTimestamp"]},
+                "spec": {
+                    "project": "default",
+                    "source": latest["source"],
+                    "destination": {"server": "https://kubernetes.default.svc", "namespace": meta["namespace"]},
+                },
+                "status": {
+                    "sync": {"status": "OutOfSync" if degraded else "Synced", "revision": latest["revision"]},
+                    "health": {"status": "Degraded" if degraded else "Healthy"},
+                    "history": history,
+                    "operationState": {
+                        "phase": "Succeeded",
+                        "message": "successfully synced (all tasks run)",
+                        "startedAt": latest["deployStartedAt"],
+                        "finishedAt": latest["deployedAt"],
+                        "syncResult": {"revision": latest["revision"]},
+                    },
+                    "reconciledAt": _iso(self.now - 60),
+                    "summary": {"images": [deployment["spec"]["template"]["spec"]["containers"][0]["image"]]},
+                },
+            })
+        return apps
+
+    # -- Backstage --------------------------------------------------------
+
+    def _build_entities(self, rng: random.Random) -> List[Dict[str, Any]]:
+        kinds = [("Component", "service"), ("Component", "website"), ("API", "openapi"), ("Group", "team"), ("System", None), ("User", None)]
+        entities = []
+        for i in range(self.entities):
+            kind, spec_type = kinds[i % len(kinds)]
+            name = f"{kind.lower()}-{i:05d}"
+            spec: Dict[str, Any] = {"owner": f"group:team-{i % 40:02d}", "lifecycle": rng.choice(["production", "experimental"])}
+            if spec_type:
+                spec["type"] = spec_type
+            entities.append({
+                "apiVersion": "backstage.io/v1alpha1",
+                "kind": kind,
+                "metadata": {
+                    "name": name,
+                    "namespace": "default",
+                    "uid": f"ent-{i}",
+                    "description": f"{kind} {name} owned by team-{i % 40:02d}",
+                    "annotations": {"backstage.io/kubernetes-id": name, "argocd/app-name": name},
+                    "tags": ["tier-1" if i % 5 == 0 else "tier-2"],
+                },
+                "spec": spec,
+                "relations": [{"type": "ownedBy", "targetRef": spec["owner"]}],
+            })
+        return entities
+
+
+# -- HTTP plumbing ---------------------------------------------------------
+
+
+class FakeBackend:
+    """A threaded HTTP server dispatching GET requests to regex routes."""
+
+    def __init__(self, name: str, routes: List[Route], latency: float = 0.0):
+        self.name = name
+        self.routes = routes
+        self.latency = latency
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, a
+            # keep-alive client's delayed ACK adds ~40 ms to every response
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                backend._dispatch(self)
+
+            def handle(self) -> None:
+                # Clients that stop reading a stream early just hang up
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeBackend:
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"fake-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(handler.path)
+        query = parse_qs(parsed.query)
+        for pattern, func in self.routes:
+            match = pattern.fullmatch(parsed.path)
+            if match:
+                try:
+                    status, body, content_type = func(query, **match.groupdict())
+                except Exception as e:  # surface generator bugs as API errors
+                    status, body, content_type = 500, json.dumps({"error": repr(e)}).encode(), "application/json"
+                break
+        else:
+            status, body, content_type = 404, b'{"message":"not found"}', "application/json"
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        if isinstance(body, bytes):
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        else:
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.end_headers()
+            for chunk in body:
+                if chunk:
+                    handler.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            handler.wfile.write(b"0\r\n\r\n")
+
+
+def _routes(*pairs: Tuple[str, Callable[..., Tuple[int, Body, str]]]) -> List[Route]:
+    return [(re.compile(pattern), func) for pattern, func in pairs]
+
+
+# -- Prometheus -----------------------------------------------------------
+
+
+def prometheus_backend(data: FakeDataset, latency: float = 0.0) -> FakeBackend:
+    """Fake Prometheus HTTP API (query, query_range, series, labels, metadata, alerts)."""
+
+    def ok(payload: Any) -> Tuple[int, bytes, str]:
+        return _json({"status": "success", "data": payload})
+
+    def query(q: Query) -> Tuple[int, bytes, str]:
+        ts = float(_first(q, "time") or data.now)
+        result = [
+            {"metric": data.series_labels[i], "value": [ts, f"{data.series_value(i, ts):.4f}"]}
+            for i in data.select_series(_first(q, "query", ""))
+        ]
+        return ok({"resultType": "vector", "result": result})
+
+    def query_range(q: Query) -> Tuple[int, bytes, str]:
+        start, end = float(_first(q, "start")), float(_first(q, "end"))
+        step = float(re.sub(r"s$", "", _first(q, "step", "60")))
+        points = min(11000, int((end - start) // step) + 1)
+        timestamps = [start + k * step for k in range(points)]
+        result = [
+            {"metric": data.series_labels[i], "values": [[t, f"{data.series_value(i, t):.4f}"] for t in timestamps]}
+            for i in data.select_series(_first(q, "query", ""))
+        ]
+        return ok({"resultType": "matrix", "result": result})
+
+    def series(q: Query) -> Tuple[int, bytes, str]:
+        limit = int(_first(q, "limit", "0") or 0)
+        matched: List[Dict[str, str]] = []
+        for selector in q.get("match[]", []):
+            matched.extend(data.series_labels[i] for i in data.select_series(selector))
+        return ok(matched[:limit] if limit else matched)
+
+    def label_values(q: Query, label: str) -> Tuple[int, bytes, str]:
+        if "match[]" in q:
+            indexes = [i for selector in q["match[]"] for i in data.select_series(selector)]
+        else:
+            indexes = range(len(data.series_labels))
+        values = sorted({data.series_labels[i].get(label) for i in indexes} - {None})
+        return ok(values)
+
+    def labels(q: Query) -> Tuple[int, bytes, str]:
+        return ok(sorted({key for labels in data.series_labels for key in labels}))
+
+    def metadata(q: Query) -> Tuple[int, bytes, str]:
+        return ok({
+            name: [{"type": kind, "help": f"Fake {name.replace('_', ' ')}.", "unit": ""}]
+            for name, kind in METRIC_FAMILIES.items()
+        })
+
+    def alerts(q: Query) -> Tuple[int, bytes, str]:
+        return ok({"alerts": data.alert_items})
+
+    return FakeBackend("prometheus", _routes(
+        (r"/api/v1/query", query),
+        (r"/api/v1/query_range", query_range),
+        (r"/api/v1/series", series),
+        (r"/api/v1/label/(?P<label>[^/]+)/values", label_values),
+        (r"/api/v1/labels", labels),
+        (r"/api/v1/metadata", metadata),
+        (r"/api/v1/alerts", alerts),
+    ), latency)
+
+
+# -- ArgoCD ---------------------------------------------------------------
+
+
+def argocd_backend(data: FakeDataset, latency: float = 0.0) -> FakeBackend:
+    """Fake ArgoCD API (applications, application events and logs)."""
+    apps = {app["metadata"]["name"]: app for app in data.application_items}
+    events_by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+    for event in data.event_items:
+        events_by_namespace.setdefault(event["metadata"]["namespace"], []).append(event)
+
+    def not_found(name: str) -> Tuple[int, bytes, str]:
+        return 404, json.dumps({"error": f"application {name} not found", "code": 5}).encode(), "application/json"
+
+    def list_apps(q: Query) -> Tuple[int, bytes, str]:
+        return _json({"metadata": {}, "items": data.application_items})
+
+    def get_app(q: Query, name: str) -> Tuple[int, bytes, str]:
+        return _json(apps[name]) if name in apps else not_found(name)
+
+    def app_events(q: Query, name: str) -> Tuple[int, bytes, str]:
+        if name not in apps:
+            return not_found(name)
+        namespace = apps[name]["spec"]["destination"]["namespace"]
+        items = [e for e in events_by_namespace.get(namespace, []) if e["involvedObject"]["name"].startswith(name)]
+        return _json({"metadata": {}, "items": items})
+
+    def app_logs(q: Query, name: str) -> Tuple[int, Body, str]:
+        if name not in apps:
+            return not_found(name)
+        lines = int(_first(q, "tailLines", "100"))
+
+        def stream() -> Iterator[bytes]:
+            for line in _log_lines(name, data.now, lines):
+                yield json.dumps({"result": {"content": line, "podName": name, "timeStamp": line[:20]}}).encode() + b"\n"
+
+        return 200, stream(), "application/json"
+
+    return FakeBackend("argocd", _routes(
+        (r"/api/v1/applications", list_apps),
+        (r"/api/v1/applications/(?P<name>[^/]+)", get_app),
+        (r"/api/v1/applications/(?P<name>[^/]+)/events", app_events),
+        (r"/api/v1/applications/(?P<name>[^/]+)/logs", app_logs),
+    ), latency)
+
+
+# -- Backstage ------------------------------------------------------------
+
+
+def _get_path(entity: Dict[str, Any], path: str) -> Any:
+    value: Any = entity
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def backstage_backend(data: FakeDataset, latency: float = 0.0) -> FakeBackend:
+    """Fake Backstage catalog (`/entities`) and search (`/api/search/query`) APIs."""
+
+    def entities(q: Query) -> Tuple[int, bytes, str]:
+        conditions = []
+        for clause in (_first(q, "filter", "") or "").split(","):
+            if "=" in clause:
+                key, value = clause.split("=", 1)
+                conditions.append((key.strip(), value.strip().lower()))
+        result = [
+            e for e in data.entity_items
+            if all(str(_get_path(e, key)).lower() == value for key, value in conditions)
+        ]
+        return _json(result)
+
+    def search(q: Query) -> Tuple[int, bytes, str]:
+        term = (_first(q, "term", "") or "").lower()
+        results = []
+        for entity in data.entity_items:
+            text = f"{entity['metadata']['name']} {entity['metadata']['description']}".lower()
+            if term and term in text:
+                results.append({
+                    "type": "software-catalog",
+                    "document": {
+                        "title": entity["metadata"]["name"],
+                        "text": entity["metadata"]["description"],
+                        "kind": entity["kind"],
+                        "namespace": "default",
+                        "location": f"/catalog/default/{entity['kind'].lower()}/{entity['metadata']['name']}",
+                    },
+                    "rank": len(results) + 1,
+                })
+                if len(results) >= 25:
+                    break
+        return _json({"results": results, "numberOfResults": len(results)})
+
+    return FakeBackend("backstage", _routes(
+        (r"/entities", entities),
+        (r"/api/search/query", search),
+    ), latency)
+
+
+# -- Kubernetes -----------------------------------------------------------
+
+
+def _log_lines(seed: str, now: float, count: int) -> Iterator[str]:
+    """Deterministic application log lines, ~2% of them errors."""
+    base = sum(map(ord, seed))
+    for k in range(count):
+        ts = _iso(now - (count - k))
+        if (base + k) % 50 == 0:
+            yield f"{ts} ERROR request failed: upstream connect error or disconnect/reset before headers (request_id={base}-{k})"
+        else:
+            yield f"{ts} INFO GET /api/items/{(base * 31 + k) % 1000} 200 {(base + k) % 90 + 3}ms"
+
+
+def _match_labels(labels: Dict[str, str], selector: Optional[str]) -> bool:
+    if not selector:
+        return True
+    for clause in selector.split(","):
+        clause = clause.strip()
+        if "!=" in clause:
+            key, value = clause.split("!=", 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif "=" in clause:
+            key, value = clause.replace("==", "=").split("=", 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif clause and clause not in labels:
+            return False
+    return True
+
+
+def _match_fields(item: Dict[str, Any], selector: Optional[str]) -> bool:
+    if not selector:
+        return True
+    for clause in selector.split(","):
+        negate = "!=" in clause
+        key, value = clause.split("!=" if negate else "=", 1)
+        actual = str(_get_path(item, key.strip()) or "")
+        if (actual == value.strip()) == negate:
+            return False
+    return True
+
+
+def kubernetes_backend(data: FakeDataset, latency: float = 0.0) -> FakeBackend:
+    """Fake Kubernetes API server for the core/v1 and apps/v1 resources used by the tools."""
+    collections = {
+        "pods": ("PodList", data.pod_items),
+        "services": ("ServiceList", data.service_items),
+        "events": ("EventList", data.event_items),
+        "deployments": ("DeploymentList", data.deployment_items),
+    }
+    by_key = {
+        (kind, item["metadata"]["namespace"], item["metadata"]["name"]): item
+        for kind, (_, items) in collections.items() for item in items
+    }
+    pods_by_name = {(p["metadata"]["namespace"], p["metadata"]["name"]): p for p in data.pod_items}
+
+    def not_found(kind: str, name: str) -> Tuple[int, bytes, str]:
+        return 404, json.dumps({
+            "kind": "Status", "apiVersion": "v1", "status": "Failure", "reason": "NotFound", "code": 404,
+            "message": f'{kind} "{name}" not found',
+        }).encode(), "application/json"
+
+    def list_items(q: Query, kind: str, namespace: Optional[str] = None) -> Tuple[int, bytes, str]:
+        list_kind, items = collections[kind]
+        label_selector, field_selector = _first(q, "labelSelector"), _first(q, "fieldSelector")
+        limit = int(_first(q, "limit", "0") or 0)
+        # The continue token is simply the index of the next item to look at
+        offset = int(_first(q, "continue", "0") or 0)
+        selected = []
+        metadata: Dict[str, Any] = {"resourceVersion": "1"}
+        for index in range(offset, len(items)):
+            item = items[index]
+            if namespace and item["metadata"]["namespace"] != namespace:
+                continue
+            if not _match_labels(item["metadata"].get("labels") or {}, label_selector):
+                continue
+            if not _match_fields(item, field_selector):
+                continue
+            if limit and len(selected) >= limit:
+                metadata["continue"] = str(index)
+                break
+            selected.append(item)
+        api_version = "apps/v1" if kind == "deployments" else "v1"
+        return _json({"kind": list_kind, "apiVersion": api_version, "metadata": metadata, "items": selected})
+
+    def read_item(q: Query, kind: str, namespace: str, name: str) -> Tuple[int, bytes, str]:
+        item = by_key.get((kind, namespace, name))
+        return _json(item) if item else not_found(kind, name)
+
+    def list_nodes(q: Query) -> Tuple[int, bytes, str]:
+        return _json({"kind": "NodeList", "apiVersion": "v1", "metadata": {}, "items": data.node_items})
+
+    def pod_log(q: Query, namespace: str, name: str) -> Tuple[int, Body, str]:
+        if (namespace, name) not in pods_by_name:
+            return not_found("pods", name)
+        total = data.log_lines
+        tail = int(_first(q, "tailLines", str(total)) or total)
+        lines = list(_log_lines(name, data.now, total))[-tail:]
+        if (_first(q, "timestamps") or "").lower() != "true":
+            lines = [line.split(" ", 1)[1] for line in lines]
+
+        def stream() -> Iterator[bytes]:
+            for start in range(0, len(lines), 256):
+                yield ("\n".join(lines[start:start + 256]) + "\n").encode()
+
+        return 200, stream(), "text/plain"
+
+    return FakeBackend("kubernetes", _routes(
+        (r"/api/v1/(?P<kind>pods|services|events)", list_items),
+        (r"/api/v1/namespaces/(?P<namespace>[^/]+)/(?P<kind>pods|services|events)", list_items),
+        (r"/api/v1/namespaces/(?P<namespace>[^/]+)/(?P<kind>pods|services|events)/(?P<name>[^/]+)", read_item),
+        (r"/api/v1/namespaces/(?P<namespace>[^/]+)/pods/(?P<name>[^/]+)/log", pod_log),
+        (r"/apis/apps/v1/(?P<kind>deployments)", list_items),
+        (r"/apis/apps/v1/namespaces/(?P<namespace>[^/]+)/(?P<kind>deployments)", list_items),
+        (r"/apis/apps/v1/namespaces/(?P<namespace>[^/]+)/(?P<kind>deployments)/(?P<name>[^/]+)", read_item),
+        (r"/api/v1/nodes", list_nodes),
+    ), latency)
+
+
+def start_all(data: FakeDataset, latency: float = 0.0) -> Dict[str, FakeBackend]:
+    """Start one fake per backend; returns them keyed by backend name."""
+    return {
+        backend.name: backend.start()
+        for backend in (
+            prometheus_backend(data, latency),
+            argocd_backend(data, latency),
+            backstage_backend(data, latency),
+            kubernetes_backend(data, latency),
+        )
+    }
+
+
+def write_kubeconfig(url: str, path: str, context: str = "kind-agent-cluster") -> str:
+    """Write a kubeconfig pointing `context` at the fake Kubernetes API."""
+    kubeconfig = {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": "fake", "cluster": {"server": url}}],
+        "users": [{"name": "fake", "user": {"token": "fake"}}],
+        "contexts": [{"name": context, "context": {"cluster": "fake", "user": "fake"}}],
+        "current-context": context,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(kubeconfig, f)  # JSON is valid YAML
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve fake Prometheus/ArgoCD/Backstage/Kubernetes APIs.")
+    parser.add_argument("--pods", type=int, default=_env_int("BENCH_PODS", 1000))
+    parser.add_argument("--series", type=int, default=_env_int("BENCH_SERIES", 10000))
+    parser.add_argument("--entities", type=int, default=_env_int("BENCH_ENTITIES", 5000))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per request")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = FakeDataset(pods=args.pods, series=args.series, entities=args.entities)
+    backends = start_all(data, args.latency_ms / 1000.0)
+    kubeconfig = write_kubeconfig(backends["kubernetes"].url, os.path.abspath("fake-kubeconfig.json"))
+    sys.stdout.write("\n".join([
+        f"# generated data in {time.perf_counter() - start:.1f}s; export these to point the agent at the fakes",
+        f"export PROMETHEUS_URL={backends['prometheus'].url}",
+        f"export ARGOCD_URL={backends['argocd'].url} ARGOCD_TOKEN=fake",
+        f"export BACKSTAGE_BASE_URL={backends['backstage'].url}",
+        f"export KUBECONFIG={kubeconfig}",
+    ]) + "\n")
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for backend in backends.values():
+            backend.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
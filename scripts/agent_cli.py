@@ -3,8 +3,12 @@
 import os
 import sys
 import json
+import time
+import asyncio
+import logging
+import argparse
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, TextIO
 
 from dotenv import load_dotenv
 
@@ -27,9 +31,40 @@ def ensure_sys_path(repo_root: Path) -> None:
         sys.path.insert(0, str(src_dir))
 
 
-def get_prompt_from_args() -> Optional[str]:
-    if len(sys.argv) > 1:
-        return " ".join(sys.argv[1:]).strip()
+USAGE = (
+    "Usage: agent_cli.py <prompt text>\n"
+    "       echo 'your prompt' | agent_cli.py\n"
+    "       agent_cli.py --batch prompts.jsonl [--concurrency N]\n"
+    "       agent_cli.py --record run.jsonl.gz <prompt text>\n"
+    "       agent_cli.py --replay run.jsonl.gz [--replay-latency 1.0] <prompt text>"
+)
+
+# Keys holding the prompt / identifier in a batch JSONL line, in priority order
+PROMPT_KEYS = ("prompt", "body", "content", "message", "text")
+ID_KEYS = ("id", "request_id")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(usage=USAGE, add_help=True)
+    parser.add_argument("prompt", nargs="*", help="prompt text (read from stdin when omitted)")
+    parser.add_argument(
+        "--batch", metavar="FILE", nargs="?", const="-",
+        help="run every prompt of a JSONL file ('-' or no value for stdin) and stream JSONL results",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum prompts in flight in batch mode")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE", help="record backend and LLM responses of the run to a cassette file")
+    cassette.add_argument("--replay", metavar="CASSETTE", help="answer backend and LLM requests from a recorded cassette, offline")
+    parser.add_argument(
+        "--replay-latency", type=float, default=None, metavar="SCALE",
+        help="on replay, sleep this fraction of each recorded response time (0: none, 1: as recorded)",
+    )
+    return parser.parse_args()
+
+
+def get_prompt_from_args(args: argparse.Namespace) -> Optional[str]:
+    if args.prompt:
+        return " ".join(args.prompt).strip()
     if not sys.stdin.isatty():
         data = sys.stdin.read().strip()
         if data:
@@ -37,6 +72,95 @@ def get_prompt_from_args() -> Optional[str]:
     return None
 
 
+def read_batch_items(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Parse JSONL prompts: either plain JSON strings or objects with a prompt/body field."""
+    items = []
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            items.append({"id": line_no, "error": f"invalid JSON: {e}"})
+            continue
+        if isinstance(data, str):
+            items.append({"id": line_no, "prompt": data})
+            continue
+        item_id = next((data[k] for k in ID_KEYS if data.get(k) is not None), line_no)
+        prompt = next((data[k] for k in PROMPT_KEYS if data.get(k)), None)
+        if prompt and data.get("title") and "prompt" not in data:
+            prompt = f"{data['title']}\n\n{prompt}"
+        if prompt:
+            items.append({"id": item_id, "prompt": str(prompt)})
+        else:
+            items.append({"id": item_id, "error": f"no prompt field (expected one of {', '.join(PROMPT_KEYS)})"})
+    return items
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract answer, tool calls, token usage and tool timings from a graph result."""
+    from langchain_core.messages import AIMessage
+
+    messages = result.get("messages", []) if isinstance(result, dict) else []
+    ai_messages = [m for m in messages if isinstance(m, AIMessage)]
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for message in ai_messages:
+        for key in usage:
+            usage[key] += (message.usage_metadata or {}).get(key, 0)
+    tool_steps = result.get("tool_steps", []) if isinstance(result, dict) else []
+    return {
+        "answer": ai_messages[-1].content if ai_messages else None,
+        "tool_calls": [
+            {"name": call["name"], "args": call["args"]}
+            for message in ai_messages for call in message.tool_calls
+        ],
+        "token_usage": usage,
+        "tool_time": {
+            "steps": len(tool_steps),
+            "wall_seconds": round(sum(s.get("wall_seconds", 0) for s in tool_steps), 4),
+            "sum_seconds": round(sum(s.get("sum_seconds", 0) for s in tool_steps), 4),
+        },
+        "cached": bool((result.get("investigation") or {}).get("cached")) if isinstance(result, dict) else False,
+    }
+
+
+async def run_batch(graph: Any, items: List[Dict[str, Any]], concurrency: int, out: TextIO) -> int:
+    """Run the batch through one warm graph and write results in completion order.
+
+    Returns:
+        The number of failed items.
+    """
+    from langchain_core.messages import HumanMessage
+
+    from telemetry import tracing
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def emit(record: Dict[str, Any]) -> None:
+        out.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        out.flush()
+
+    async def run(item: Dict[str, Any]) -> bool:
+        if "error" in item:
+            emit(item)
+            return False
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                with tracing.span("cli.prompt", {"batch.item_id": str(item["id"])}):
+                    result = await graph.ainvoke({"messages": [HumanMessage(content=item["prompt"])], "memory": {}})
+                record = {"id": item["id"], **summarize_result(result)}
+            except Exception as e:
+                record = {"id": item["id"], "error": f"Agent invocation failed: {e}"}
+            record["latency_seconds"] = round(time.perf_counter() - start, 3)
+        emit(record)
+        return "error" not in record
+
+    outcomes = await asyncio.gather(*(run(item) for item in items))
+    return outcomes.count(False)
+
+
 def main() -> int:
     repo_root = Path(__file__).resolve().parents[1]
 
@@ -44,22 +168,65 @@ def main() -> int:
     load_env_files(repo_root)
     ensure_sys_path(repo_root)
 
-    prompt = get_prompt_from_args()
-    if not prompt:
-        print("Usage: agent_cli.py <prompt text>\n       echo 'your prompt' | agent_cli.py", file=sys.stderr)
-        return 2
-
+    args = parse_args()
+    prompt = None
+    if args.batch is None:
+        prompt = get_prompt_from_args(args)
+        if not prompt:
+            print(USAGE, file=sys.stderr)
+            return 2
+
+    if args.replay:
+        # Chat completions come from the cassette
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
     if not os.getenv("OPENAI_API_KEY"):
         print("ERROR: OPENAI_API_KEY is not set in environment or .env files.", file=sys.stderr)
         return 3
 
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
     # Lazy imports after sys.path is set
     from langchain_core.messages import HumanMessage
-    from agent.graph import graph
+    from agent import get_graph
+    from telemetry import cassette, tracing
+
+    # Before the graph is built: its chat models pick their transport on creation
+    if args.record:
+        cassette.install(args.record, cassette.RECORD)
+    elif args.replay:
+        latency = cassette.AGENT_CASSETTE_LATENCY if args.replay_latency is None else args.replay_latency
+        cassette.install(args.replay, cassette.REPLAY, latency)
+    else:
+        cassette.install_from_env()
+
+    # Short-lived CLI runs only expose /metrics when explicitly asked to
+    if os.getenv("METRICS_PORT"):
+        from telemetry.metrics import start_metrics_server
+        start_metrics_server()
+
+    if args.batch is not None:
+        if args.batch == "-":
+            items = read_batch_items(sys.stdin)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                items = read_batch_items(f)
+        start = time.perf_counter()
+        failures = asyncio.run(run_batch(get_graph(), items, args.concurrency, sys.stdout))
+        logging.getLogger(__name__).info(
+            f"Batch of {len(items)} prompt(s) finished in {time.perf_counter() - start:.1f}s with {failures} failure(s)"
+        )
+        return 1 if failures else 0
 
     try:
+        graph = get_graph()
         state = {"messages": [HumanMessage(content=prompt)], "memory": {}}
-        result = graph.invoke(state)
+        # Graph nodes and tools are async-only
+        with tracing.span("cli.prompt"):
+            result = asyncio.run(graph.ainvoke(state))
         # Print last assistant message content if available
         if isinstance(result, dict) and "messages" in result and result["messages"]:
             last = result["messages"][-1]
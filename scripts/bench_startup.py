@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Measure cold-start time of the agent entry points.
+
+Every scenario runs in a fresh interpreter so module caches do not hide import
+costs. Examples:
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --runs 10 --importtime 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+SCENARIOS: Dict[str, List[str]] = {
+    "import agent": ["-c", "import agent"],
+    "import agent.graph": ["-c", "import agent.graph"],
+    "import tools.k8s": ["-c", "import tools.k8s"],
+    "build graph": ["-c", "from agent import get_graph; get_graph()"],
+    "agent_cli.py (usage)": [str(REPO_ROOT / "scripts" / "agent_cli.py")],
+}
+
+
+def run_once(args: List[str], env: Dict[str, str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return time.perf_counter() - start
+
+
+def top_imports(statement: str, env: Dict[str, str], limit: int) -> List[str]:
+    """Return the slowest modules (cumulative microseconds) reported by -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), module.rstrip()))
+    rows.sort(reverse=True)
+    return [f"{cumulative / 1e6:8.3f}s  {module}" for cumulative, module in rows[:limit]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports of the agent graph")
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT / "src"), os.environ.get("PYTHONPATH")])),
+        # A placeholder key lets the graph build without talking to OpenAI
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-benchmark",
+    }
+
+    out = sys.stdout
+    out.write(f"{'scenario':<24} {'min':>8} {'median':>8} {'max':>8}\n")
+    for name, scenario in SCENARIOS.items():
+        samples = [run_once(scenario, env) for _ in range(args.runs)]
+        out.write(f"{name:<24} {min(samples):8.3f} {statistics.median(samples):8.3f} {max(samples):8.3f}\n")
+        out.flush()
+
+    if args.importtime:
+        out.write("\nSlowest imports for building the graph (cumulative):\n")
+        for row in top_imports("from agent import get_graph; get_graph()", env, args.importtime):
+            out.write(f"{row}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
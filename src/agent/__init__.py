@@ -3,6 +3,22 @@
 This module defines a custom graph.
 """
 
-from agent.graph import graph
+from typing import Any
 
-__all__ = ["graph"]
+__all__ = ["graph", "get_graph"]
+
+
+def __getattr__(name: str) -> Any:
+    # The graph (and the tool clients behind it) is only built on first access
+    if name == "get_graph":
+        from agent.graph import get_graph
+
+        return get_graph
+    if name == "graph":
+        from agent.graph import get_graph
+
+        # Importing agent.graph binds the submodule to this name; replace it
+        # with the compiled graph like the eager import used to.
+        globals()["graph"] = compiled = get_graph()
+        return compiled
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
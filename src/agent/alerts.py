@@ -0,0 +1,164 @@
+"""Helpers to recognise Alertmanager notifications in incoming messages.
+
+Alerts reach the agent either as raw Alertmanager webhook JSON (CLI, LangGraph
+server) or as the Discord text rendered by the webhook proxy in
+`cluster/resources/prometheus/discord-webhook-proxy.py`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Labels that identify *which* alert fired. Everything else (e.g. severity)
+# is descriptive and may change between notifications of the same alert.
+IDENTITY_LABEL_EXCLUDES = {"severity"}
+
+# Matches the header rendered by the Discord webhook proxy: "🚨 **Name** (FIRING)"
+_PROXY_HEADER_RE = re.compile(r"\*\*(?P<alertname>[^*\n]+)\*\*\s*\((?P<status>FIRING|RESOLVED)\)", re.IGNORECASE)
+_PROXY_FIELD_RE = re.compile(r"^\*\*(?P<key>[^*:]+):\*\*\s*(?P<value>.+?)\s*$", re.MULTILINE)
+# Matches Prometheus label sets such as `alertname="X", namespace="apps"`
+_LABEL_PAIR_RE = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"(?P<value>[^"]*)"')
+
+# Discord proxy field names mapped to alert labels / attributes
+_PROXY_FIELDS = {
+    "instance": "instance",
+    "severidade": "severity",
+    "namespace": "namespace",
+    "pod": "pod",
+    "deployment": "deployment",
+}
+
+
+@dataclass(frozen=True)
+class AlertNotification:
+    """A single alert extracted from a notification message."""
+
+    alertname: str
+    labels: Dict[str, str] = field(default_factory=dict)
+    status: str = "firing"
+    starts_at: Optional[str] = None
+
+    @property
+    def identity_labels(self) -> Dict[str, str]:
+        """Return the labels that identify this alert across re-notifications."""
+        return {k: v for k, v in self.labels.items() if k not in IDENTITY_LABEL_EXCLUDES}
+
+    @property
+    def fingerprint(self) -> str:
+        """Return a stable hash of the alert name and identity labels."""
+        payload = json.dumps(
+            {"alertname": self.alertname, "labels": self.identity_labels},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @property
+    def resolved(self) -> bool:
+        """Return True if the notification reports the alert as resolved."""
+        return self.status.lower() == "resolved"
+
+
+def _from_alertmanager_alert(alert: Dict[str, Any], default_status: str) -> Optional[AlertNotification]:
+    labels = {str(k): str(v) for k, v in (alert.get("labels") or {}).items()}
+    alertname = labels.get("alertname")
+    if not alertname:
+        return None
+    return AlertNotification(
+        alertname=alertname,
+        labels=labels,
+        status=str(alert.get("status") or alert.get("state") or default_status),
+        starts_at=alert.get("startsAt") or alert.get("activeAt"),
+    )
+
+
+def _parse_json_payload(text: str) -> List[AlertNotification]:
+    try:
+        payload = json.loads(text)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(payload, dict):
+        return []
+    if isinstance(payload.get("alerts"), list):
+        default_status = str(payload.get("status", "firing"))
+        alerts = [_from_alertmanager_alert(a, default_status) for a in payload["alerts"] if isinstance(a, dict)]
+        return [a for a in alerts if a is not None]
+    alert = _from_alertmanager_alert(payload, "firing")
+    return [alert] if alert else []
+
+
+def _parse_proxy_message(text: str) -> List[AlertNotification]:
+    alerts = []
+    for block in text.split("\n---\n"):
+        header = _PROXY_HEADER_RE.search(block)
+        if not header:
+            continue
+        alertname = header.group("alertname").strip()
+        labels = {"alertname": alertname}
+        starts_at = None
+        for match in _PROXY_FIELD_RE.finditer(block):
+            key = match.group("key").strip().lower()
+            value = match.group("value")
+            if key in ("início", "inicio"):
+                starts_at = value
+            elif key in _PROXY_FIELDS and value.lower() not in ("unknown", "unknown instance"):
+                labels[_PROXY_FIELDS[key]] = value
+        # Label sets pasted verbatim into the description are the most precise source
+        labels.update({m.group("key"): m.group("value") for m in _LABEL_PAIR_RE.finditer(block)})
+        labels["alertname"] = alertname
+        alerts.append(AlertNotification(
+            alertname=alertname,
+            labels=labels,
+            status=header.group("status").lower(),
+            starts_at=starts_at,
+        ))
+    return alerts
+
+
+def _parse_label_set(text: str) -> List[AlertNotification]:
+    labels = {m.group("key"): m.group("value") for m in _LABEL_PAIR_RE.finditer(text)}
+    if "alertname" not in labels:
+        return []
+    status = "resolved" if re.search(r"\bresolved\b", text, re.IGNORECASE) else "firing"
+    return [AlertNotification(alertname=labels["alertname"], labels=labels, status=status)]
+
+
+def parse_alert_message(text: str) -> List[AlertNotification]:
+    """Extract the alerts carried by a message, if it is an alert notification.
+
+    Args:
+        text: Raw message content (Alertmanager JSON, Discord proxy text or a label set).
+
+    Returns:
+        The alerts found in the message; empty when the message is not an alert.
+    """
+    if not text:
+        return []
+    stripped = text.strip()
+    if stripped.startswith("{"):
+        alerts = _parse_json_payload(stripped)
+        if alerts:
+            return alerts
+    return _parse_proxy_message(stripped) or _parse_label_set(stripped)
+
+
+def notification_fingerprint(alerts: List[AlertNotification]) -> str:
+    """Return a fingerprint for a whole notification (one or many alerts)."""
+    return "+".join(sorted({a.fingerprint for a in alerts}))
+
+
+def matching_prometheus_alerts(alert: AlertNotification, prometheus_alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Select the alerts from a `get_alerts` response that belong to `alert`.
+
+    A Prometheus alert matches when it carries every identity label known from the notification.
+    """
+    wanted = alert.identity_labels
+    matches = []
+    for candidate in prometheus_alerts:
+        labels = candidate.get("labels") or {}
+        if all(labels.get(k) == v for k, v in wanted.items()):
+            matches.append(candidate)
+    return matches
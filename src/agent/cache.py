@@ -0,0 +1,101 @@
+"""In-memory cache of finished alert investigations.
+
+Alertmanager re-notifies a firing alert every `repeat_interval`. Entries are
+keyed by the notification fingerprint and remember the hash of the evidence
+snapshot taken from `get_alerts`, so a re-notification with unchanged
+evidence can reuse the previous report instead of re-running the agent.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Must outlive Alertmanager's repeat_interval (4h in cluster/resources/prometheus)
+DEFAULT_TTL_SECONDS = float(os.environ.get("INVESTIGATION_CACHE_TTL_SECONDS", 6 * 60 * 60))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("INVESTIGATION_CACHE_MAX_ENTRIES", 256))
+
+# Fields of a Prometheus alert that matter when deciding whether anything changed.
+# `value` is left out on purpose: it moves on every evaluation.
+MATERIAL_ALERT_FIELDS = ("labels", "state", "activeAt")
+
+
+def evidence_hash(prometheus_alerts: List[Dict[str, Any]]) -> str:
+    """Hash the material fields of the alerts returned by `get_alerts`."""
+    snapshot = sorted(
+        json.dumps({k: alert.get(k) for k in MATERIAL_ALERT_FIELDS}, sort_keys=True)
+        for alert in prometheus_alerts
+    )
+    return hashlib.sha256("\n".join(snapshot).encode()).hexdigest()[:16]
+
+
+@dataclass
+class CachedInvestigation:
+    """A finished investigation report and the evidence it was based on."""
+
+    report: str
+    evidence_hash: str
+    evidence: List[Dict[str, Any]] = field(default_factory=list)
+    starts_at: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+
+class InvestigationCache:
+    """Thread-safe TTL cache of investigations keyed by alert fingerprint."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, CachedInvestigation] = {}
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> Optional[CachedInvestigation]:
+        """Return the cached investigation for `fingerprint` unless it expired."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            if time.time() - entry.created_at > self.ttl_seconds:
+                logger.info(f"Investigation cache entry {fingerprint} expired")
+                del self._entries[fingerprint]
+                return None
+            return entry
+
+    def put(self, fingerprint: str, entry: CachedInvestigation) -> None:
+        """Store an investigation, dropping the oldest entry when full."""
+        with self._lock:
+            self._entries[fingerprint] = entry
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k].created_at)
+                del self._entries[oldest]
+
+    def evict(self, alert_fingerprint: str) -> int:
+        """Drop every entry whose notification contains `alert_fingerprint`.
+
+        Returns:
+            The number of entries removed.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if alert_fingerprint in k.split("+")]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+investigation_cache = InvestigationCache()
@@ -0,0 +1,256 @@
+"""In-run context compaction for long ReAct loops.
+
+Every tool result of a run is resent to the model on each later step, so a
+loop over large pod lists and logs grows its input with every call. Once the
+messages exceed `AGENT_CONTEXT_TOKEN_BUDGET`, `compact_context` (the agent's
+pre-model hook) replaces the oldest large tool results with a compact summary
+that keeps identifiers, states and error lines, plus a reference. The raw
+content goes to `tool_results`, a bounded in-memory side store, from which the
+model can page or grep it again with the `fetch_tool_result` tool.
+
+Results of the latest tool step are never compacted, and each result is
+summarized once, so the hook's own cost does not grow with the run.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.tools import tool
+
+from telemetry import tracing
+
+logger = logging.getLogger(__name__)
+
+AGENT_CONTEXT_COMPACTION = os.environ.get("AGENT_CONTEXT_COMPACTION", "true").lower() == "true"
+# Estimated input tokens (~4 characters each) above which old tool results are compacted
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("AGENT_CONTEXT_TOKEN_BUDGET", 24000))
+CONTEXT_STORE_MAX_BYTES = int(os.environ.get("AGENT_CONTEXT_STORE_MB", 64)) * 2**20
+CONTEXT_STORE_TTL_SECONDS = 6 * 3600
+# Smaller tool results are not worth a summary
+MIN_COMPACT_CHARS = 1000
+MAX_SUMMARY_CHARS = 1200
+MAX_SUMMARY_ITEMS = 12
+MAX_FETCH_CHARS = 6000
+CHARS_PER_TOKEN = 4
+
+# Fields kept from list items: what identifies an object and its state
+KEY_FIELDS = (
+    "name", "namespace", "cluster", "kind", "object", "pod", "node", "container", "app", "service",
+    "status", "phase", "state", "ready", "restarts", "reason", "type", "health", "sync_status",
+    "alertname", "severity", "metric", "value", "revision", "error",
+)
+_INTERESTING_LINE_RE = re.compile(r"error|exception|fail|fatal|panic|warn|timeout|refused|oom|killed", re.IGNORECASE)
+COMPACTED_MARKER = "[compacted tool result"
+_HEALTHY_VALUES = {"running", "ready", "succeeded", "true", "normal", "healthy", "synced", "active", "bound", "available"}
+
+
+class ToolResultStore:
+    """Thread-safe LRU store of raw tool results, bounded by size and age."""
+
+    def __init__(self, max_bytes: int = CONTEXT_STORE_MAX_BYTES, ttl_seconds: float = CONTEXT_STORE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, ref: str, name: str, content: str) -> None:
+        size = len(content)
+        with self._lock:
+            if ref in self._entries:
+                self._bytes -= len(self._entries.pop(ref)[2])
+            self._entries[ref] = (time.time(), name, content)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get(self, ref: str) -> Optional[tuple]:
+        """Return (tool name, raw content) for `ref`, or None if unknown or expired."""
+        with self._lock:
+            entry = self._entries.get(ref)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl_seconds:
+                self._bytes -= len(self._entries.pop(ref)[2])
+                return None
+            self._entries.move_to_end(ref)
+            return entry[1], entry[2]
+
+
+tool_results = ToolResultStore()
+
+
+def _text(content: Any) -> str:
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    chars = 0
+    for message in messages:
+        chars += len(_text(message.content))
+        for call in getattr(message, "tool_calls", None) or []:
+            chars += len(json.dumps(call.get("args") or {}, default=str))
+    return chars // CHARS_PER_TOKEN
+
+
+def _is_notable(item: Any) -> bool:
+    """Tell whether a list item reports a problem (error, restarts, unhealthy state)."""
+    if not isinstance(item, dict):
+        return False
+    if item.get("error") or str(item.get("restarts") or 0) != "0":
+        return True
+    ready = item.get("ready")
+    if isinstance(ready, str) and "/" in ready and len(set(ready.split("/"))) > 1:
+        return True
+    if item.get("type") == "Warning":
+        return True
+    return any(
+        isinstance(item.get(k), str) and item[k] and item[k].lower() not in _HEALTHY_VALUES
+        for k in ("status", "phase", "health")
+    )
+
+
+def _condense(value: Any, depth: int = 0) -> Any:
+    """Shrink a JSON value to its identifying fields, counts and a few list items."""
+    if isinstance(value, str):
+        return value if len(value) <= 160 else value[:160] + "..."
+    if isinstance(value, list):
+        if not value:
+            return value
+        if len(value) <= MAX_SUMMARY_ITEMS:
+            return [_condense(v, depth + 1) for v in value]
+        notable = [v for v in value if _is_notable(v)]
+        shown = (notable + [v for v in value if not _is_notable(v)])[:MAX_SUMMARY_ITEMS]
+        return {"count": len(value), "notable": len(notable), "items": [_condense(v, depth + 1) for v in shown]}
+    if isinstance(value, dict):
+        if depth == 0:
+            return {k: _condense(v, depth + 1) for k, v in value.items()}
+        kept = {k: _condense(v, depth + 1) for k, v in value.items() if k in KEY_FIELDS and v not in (None, "", [], {})}
+        return kept or {k: "..." for k in list(value)[:6]}
+    return value
+
+
+def _summarize_text(content: str) -> str:
+    lines = content.splitlines()
+    interesting = [line for line in lines if _INTERESTING_LINE_RE.search(line)]
+    parts = [f"{len(lines)} lines"]
+    if interesting:
+        parts.append(f"{len(interesting)} error/warning lines, first ones:\n" + "\n".join(line[:200] for line in interesting[:6]))
+    parts.append("last lines:\n" + "\n".join(line[:200] for line in lines[-4:]))
+    return "\n".join(parts)
+
+
+def summarize_tool_result(content: str) -> str:
+    """Return a compact summary of a tool result that keeps its IDs and key facts."""
+    try:
+        value = json.loads(content)
+    except ValueError:
+        summary = _summarize_text(content)
+    else:
+        summary = json.dumps(_condense(value), default=str, separators=(",", ":"))
+    if len(summary) > MAX_SUMMARY_CHARS:
+        summary = summary[:MAX_SUMMARY_CHARS] + "..."
+    return summary
+
+
+def _compacted(message: ToolMessage) -> ToolMessage:
+    raw = _text(message.content)
+    ref = message.tool_call_id
+    tool_results.put(ref, message.name or "", raw)
+    header = (
+        f"{COMPACTED_MARKER} {ref}: {len(raw)} chars summarized to save context; "
+        f'call fetch_tool_result(ref="{ref}") for the raw data, with `grep` to filter it]'
+    )
+    return ToolMessage(
+        content=f"{header}\n{summarize_tool_result(raw)}",
+        name=message.name,
+        tool_call_id=message.tool_call_id,
+        id=message.id,
+        status=message.status,
+    )
+
+
+def compact_messages(messages: Sequence[BaseMessage], budget: int = CONTEXT_TOKEN_BUDGET) -> List[ToolMessage]:
+    """Pick and compact the oldest large tool results until `messages` fit `budget`.
+
+    Returns:
+        The compacted replacements (same ids as the messages they replace).
+    """
+    total = estimate_tokens(messages)
+    if total <= budget:
+        return []
+    # Results of the latest tool step are what the model is about to read
+    last_step = max((i for i, m in enumerate(messages) if isinstance(m, AIMessage) and m.tool_calls), default=len(messages))
+    replacements = []
+    for message in messages[:last_step]:
+        if total <= budget:
+            break
+        if not isinstance(message, ToolMessage):
+            continue
+        content = _text(message.content)
+        if len(content) < MIN_COMPACT_CHARS or content.startswith(COMPACTED_MARKER):
+            continue
+        compacted = _compacted(message)
+        total -= (len(content) - len(compacted.content)) // CHARS_PER_TOKEN
+        replacements.append(compacted)
+    return replacements
+
+
+def compact_context(state: Any) -> Dict[str, Any]:
+    """Pre-model hook: compact old tool results once the context exceeds the budget."""
+    messages = state["messages"] if isinstance(state, dict) else state.messages
+    with tracing.span("agent.compact_context", {"context.messages": len(messages)}) as span:
+        replacements = compact_messages(messages)
+        span.set_attribute("context.compacted", len(replacements))
+    if not replacements:
+        return {}
+    logger.info(f"Compacted {len(replacements)} tool result(s) to stay under {CONTEXT_TOKEN_BUDGET} tokens")
+    # add_messages replaces messages with the same id
+    return {"messages": replacements}
+
+
+@tool(description="Fetch the raw data of a tool result that was compacted to save context. Pass the `ref` from the compacted message; use `grep` (a regex) to get only matching lines, and `offset` to page through long results.")
+async def fetch_tool_result(ref: str, grep: Optional[str] = None, offset: int = 0) -> Dict[str, Any]:
+    """
+    Re-fetch a compacted tool result from the side store.
+
+    Args:
+        ref: Reference of the compacted result (its tool call id).
+        grep: Optional regex; only the matching lines are returned.
+        offset: Character offset to start from, for paging.
+
+    Returns:
+        A dictionary with the tool name, a slice of the raw content and the offset of the next page.
+    """
+    entry = tool_results.get(ref)
+    if entry is None:
+        return {"error": f"No stored result for {ref!r}; it expired, call the original tool again."}
+    name, raw = entry
+    if grep:
+        try:
+            pattern = re.compile(grep, re.IGNORECASE)
+        except re.error as e:
+            return {"error": f"Invalid grep pattern: {e}"}
+        parts = raw.splitlines()
+        if len(parts) <= 1:
+            # JSON results are one line: match object by object instead
+            parts = re.split(r"(?<=\}),\s*(?=\{)", raw)
+        raw = "\n".join(part for part in parts if pattern.search(part))
+    chunk = raw[offset:offset + MAX_FETCH_CHARS]
+    next_offset = offset + len(chunk)
+    return {
+        "tool": name,
+        "content": chunk,
+        "total_chars": len(raw),
+        "next_offset": next_offset if next_offset < len(raw) else None,
+    }
@@ -0,0 +1,209 @@
+"""Deterministic evidence collection for alert investigations (MODE 1).
+
+Instead of letting the model discover step by step what to fetch, the standard
+evidence set for an alert is gathered concurrently through the regular tools
+and handed to the agent as one compact context message.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+from agent.alerts import AlertNotification
+from telemetry import metrics, tracing
+from tools.k8s import (
+    describe_deployment,
+    describe_pod,
+    get_events,
+    get_pod_logs,
+    list_pods,
+)
+from tools.prometheus import execute_query, get_alerts
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_TIMEOUT_SECONDS = float(os.environ.get("EVIDENCE_PREFETCH_TIMEOUT_SECONDS", 15))
+MAX_ITEMS_PER_SECTION = 15
+MAX_LOG_LINES = 40
+MAX_SECTION_CHARS = 3000
+
+# <deployment>-<replicaset hash>-<pod suffix>
+_DEPLOYMENT_POD_RE = re.compile(r"^(?P<deployment>.+)-[a-z0-9]{6,10}-[a-z0-9]{5}$")
+
+EvidenceCall = Tuple[str, BaseTool, Dict[str, Any]]
+
+
+def _deployment_from_pod(pod: str) -> Optional[str]:
+    match = _DEPLOYMENT_POD_RE.match(pod)
+    return match.group("deployment") if match else None
+
+
+def plan_evidence(alerts: List[AlertNotification], include_alerts: bool = True) -> List[EvidenceCall]:
+    """Decide which tool calls make up the evidence bundle for `alerts`.
+
+    Args:
+        alerts: Alerts parsed from the notification.
+        include_alerts: Whether to fetch `get_alerts` (skip when already fetched).
+
+    Returns:
+        A de-duplicated list of (section name, tool, tool arguments).
+    """
+    calls: Dict[str, EvidenceCall] = {}
+
+    def add(key: str, tool: BaseTool, args: Dict[str, Any]) -> None:
+        calls.setdefault(key, (key, tool, args))
+
+    if include_alerts:
+        add("alerts", get_alerts, {})
+
+    for alert in alerts:
+        labels = alert.labels
+        namespace = labels.get("namespace")
+        pod = labels.get("pod")
+        deployment = labels.get("deployment") or (pod and _deployment_from_pod(pod))
+        instance = labels.get("instance")
+
+        if namespace:
+            add(f"pods:{namespace}", list_pods, {"namespace": namespace})
+            add(f"events:{namespace}", get_events, {
+                "namespace": namespace,
+                "limit": MAX_ITEMS_PER_SECTION * 2,
+                "field_selector": "type=Warning",
+            })
+            add(f"restarts:{namespace}", execute_query, {
+                "query": f'sum by (pod) (increase(kube_pod_container_status_restarts_total{{namespace="{namespace}"}}[1h])) > 0',
+            })
+            add(f"cpu:{namespace}", execute_query, {
+                "query": f'topk(5, sum by (pod) (rate(container_cpu_usage_seconds_total{{namespace="{namespace}", container!=""}}[5m])))',
+            })
+            add(f"memory:{namespace}", execute_query, {
+                "query": f'topk(5, sum by (pod) (container_memory_working_set_bytes{{namespace="{namespace}", container!=""}}))',
+            })
+        if namespace and pod:
+            add(f"pod:{namespace}/{pod}", describe_pod, {"pod_name": pod, "namespace": namespace})
+            add(f"logs:{namespace}/{pod}", get_pod_logs, {
+                "pod_name": pod,
+                "namespace": namespace,
+                "tail_lines": MAX_LOG_LINES,
+            })
+        if namespace and deployment:
+            add(f"deployment:{namespace}/{deployment}", describe_deployment, {
+                "deployment_name": deployment,
+                "namespace": namespace,
+            })
+        if instance:
+            add(f"up:{instance}", execute_query, {"query": f'up{{instance="{instance}"}}'})
+
+    return list(calls.values())
+
+
+async def _call_tool(tool: BaseTool, args: Dict[str, Any]) -> Any:
+    # The tools are coroutines that block on their HTTP/Kubernetes clients, so
+    # each one gets its own worker thread and event loop to really overlap.
+    return await asyncio.wait_for(
+        asyncio.to_thread(asyncio.run, tool.ainvoke(args)),
+        timeout=PREFETCH_TIMEOUT_SECONDS,
+    )
+
+
+async def gather_evidence(calls: List[EvidenceCall]) -> Dict[str, Any]:
+    """Run the planned tool calls concurrently.
+
+    Failures and timeouts are recorded per section instead of aborting the bundle.
+    """
+    async def run(key: str, tool: BaseTool, args: Dict[str, Any]) -> Tuple[str, Any]:
+        start = time.perf_counter()
+        status = "success"
+        with tracing.span(f"tool {tool.name}", {"tool.name": tool.name, "evidence.section": key}) as tool_span:
+            try:
+                result = await _call_tool(tool, args)
+            except asyncio.TimeoutError:
+                status, result = "timeout", {"error": f"{tool.name} timed out after {PREFETCH_TIMEOUT_SECONDS:g}s"}
+            except Exception as e:
+                status, result = "error", {"error": f"{tool.name} failed: {e}"}
+            tool_span.set_attribute("tool.status", status)
+        metrics.record_tool_call(tool.name, time.perf_counter() - start, json.dumps(result, default=str), status)
+        return key, result
+
+    results = await asyncio.gather(*(run(*call) for call in calls))
+    return dict(results)
+
+
+def _compact_pods(result: Dict[str, Any]) -> Dict[str, Any]:
+    pods = result.get("pods", [])
+    unhealthy = [
+        p for p in pods
+        if p.get("status") != "Running" or p.get("restarts") or p.get("ready", "").split("/")[0] != p.get("ready", "").split("/")[-1]
+    ]
+    return {"total": len(pods), "unhealthy": unhealthy[:MAX_ITEMS_PER_SECTION]}
+
+
+def _compact_events(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {k: e.get(k) for k in ("type", "reason", "object", "message", "count", "last_timestamp")}
+        for e in result.get("events", [])[:MAX_ITEMS_PER_SECTION]
+    ]
+
+
+def _compact_query(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"metric": series.get("metric", {}), "value": (series.get("value") or [None, None])[1]}
+        for series in result.get("result", [])[:MAX_ITEMS_PER_SECTION]
+    ]
+
+
+def _compact_logs(result: Dict[str, Any]) -> str:
+    return "\n".join((result.get("logs") or "").splitlines()[-MAX_LOG_LINES:])
+
+
+def _compact_alerts(result: Any) -> List[Dict[str, Any]]:
+    alerts = result.get("result", []) if isinstance(result, dict) else result
+    return [
+        {k: a.get(k) for k in ("labels", "state", "activeAt", "value")}
+        for a in (alerts or [])[:MAX_ITEMS_PER_SECTION]
+    ]
+
+
+_COMPACTORS = {
+    "alerts": _compact_alerts,
+    "pods": _compact_pods,
+    "events": _compact_events,
+    "restarts": _compact_query,
+    "cpu": _compact_query,
+    "memory": _compact_query,
+    "up": _compact_query,
+    "logs": _compact_logs,
+}
+
+
+def compact_evidence(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim each section of the bundle down to what an investigation needs."""
+    compact = {}
+    for key, result in bundle.items():
+        if isinstance(result, dict) and "error" in result and len(result) <= 2:
+            compact[key] = {"error": result["error"]}
+            continue
+        compactor = _COMPACTORS.get(key.split(":", 1)[0])
+        value = compactor(result) if compactor else result
+        text = value if isinstance(value, str) else json.dumps(value, default=str)
+        if len(text) > MAX_SECTION_CHARS:
+            value = text[:MAX_SECTION_CHARS] + "... (truncated)"
+        compact[key] = value
+    return compact
+
+
+def format_evidence_message(bundle: Dict[str, Any]) -> str:
+    """Render the compacted bundle as the context message given to the agent."""
+    return (
+        "Pre-fetched evidence for this alert (collected with the regular tools before your first step). "
+        "Start your analysis from it and only call tools for data that is missing, failed or needs more depth.\n"
+        f"```json\n{json.dumps(compact_evidence(bundle), default=str, indent=1)}\n```"
+    )
@@ -1,47 +1,48 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
+import logging
+import operator
 import os
-from typing import Any, Dict, Sequence, TypedDict
-
-from langchain_core.messages import BaseMessage
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-
-# Import tools
-from tools.argocd import (
-    list_applications,
-    get_application_status,
-    get_application_logs,
-    get_application_events
-)
-
-from tools.k8s import (
-    list_pods,
-    describe_pod,
-    get_pod_logs,
-    list_deployments,
-    describe_deployment,
-    list_services,
-    get_events,
-    list_nodes
-)
-
-from tools.prometheus import (
-    execute_query,
-    execute_range_query,
-    get_alerts,
-    list_metric_label_values
-)
-
-from tools.backstage import (
-    list_entities,
-    get_entity_metadata,
-    search_entities_by_attribute,
-    search_catalog_entities,
-    list_entity_attributes,
-)
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Callable, Dict, List, Optional, Sequence, TypedDict
 
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode, create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from langgraph.store.base import BaseStore
+
+from tools.prometheus import make_prometheus_request, metric_catalog
+from tools.registry import TOOL_GROUPS
+
+from agent.alerts import matching_prometheus_alerts, notification_fingerprint, parse_alert_message
+from agent.cache import CachedInvestigation, evidence_hash, investigation_cache
 from agent.constants import SYSTEM_PROMPT
+from agent.context import AGENT_CONTEXT_COMPACTION, compact_context, fetch_tool_result
+from agent.evidence import format_evidence_message, gather_evidence, plan_evidence
+from agent.tool_router import AGENT_TOOL_ROUTING, ToolRouter, bind_tools
+from mcps.client import mcp_clients
+from telemetry import cassette, metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+# Tool execution limits for a single ReAct step
+TOOL_MAX_CONCURRENCY = int(os.environ.get("AGENT_TOOL_MAX_CONCURRENCY", 4))
+TOOL_TIMEOUT_SECONDS = float(os.environ.get("AGENT_TOOL_TIMEOUT_SECONDS", 45))
+
+# Model tiers: the fast model plans tool calls, the strong one (when set) writes the report
+FAST_MODEL = os.environ.get("AGENT_FAST_MODEL", "gpt-5-nano-2025-08-07")
+STRONG_MODEL = os.environ.get("AGENT_STRONG_MODEL", "")
+MAX_FAST_STEPS = int(os.environ.get("AGENT_MAX_FAST_STEPS", 8))
+
 
 class Context(TypedDict):
     """Context parameters for the agent.
@@ -60,49 +61,489 @@ class State(TypedDict):
     See: https://langchain-ai.github.io/langgraph/concepts/low_level/#state
     """
 
-    messages: Sequence[BaseMessage]
+    messages: Annotated[Sequence[BaseMessage], add_messages]
     memory: Dict[str, Any]
+    # Bookkeeping for the alert investigation cache (see agent.cache)
+    investigation: Dict[str, Any]
+    # Timing of every tool-execution step of the last run (see ConcurrentToolNode)
+    tool_steps: List[Dict[str, Any]]
+
+
+class SREAgentState(AgentState):
+    """ReAct agent state extended with per-step tool timings."""
+
+    tool_steps: Annotated[List[Dict[str, Any]], operator.add]
+
+
+class ConcurrentToolNode(ToolNode):
+    """Tool node that overlaps the tool calls of a ReAct step.
+
+    The tools are coroutines that block on synchronous HTTP/Kubernetes clients,
+    so awaiting them together still runs them one after the other. Each call
+    runs on the node's own pool of `max_concurrency` worker threads instead,
+    bounded by `timeout` seconds. A failing or slow call becomes an error
+    `ToolMessage` while the rest of the step's results are kept.
+
+    Timed-out calls cannot be cancelled: their thread finishes in the
+    background and the result is dropped. The thread keeps its pool slot until
+    then, so timeouts never push the number of running tool calls past
+    `max_concurrency`. The pool is shared by every step and run of the graph.
+    A call waits at most `timeout` for a free worker, and then at most
+    `timeout` to run.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Any],
+        *,
+        max_concurrency: int = TOOL_MAX_CONCURRENCY,
+        timeout: float = TOOL_TIMEOUT_SECONDS,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(tools, **kwargs)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="agent-tool")
+
+    def _run_one_in_thread(self, call: Dict[str, Any], input_type: str, config: RunnableConfig) -> ToolMessage:
+        return asyncio.run(self._arun_one(call, input_type, config))
+
+    async def _afunc(self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        timings: List[Dict[str, Any]] = []
+        loop = asyncio.get_running_loop()
+
+        def error(call: Dict[str, Any], content: str) -> ToolMessage:
+            return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"], status="error")
+
+        async def run(call: Dict[str, Any]) -> ToolMessage:
+            with tracing.span(f"tool {call['name']}", {"tool.name": call["name"]}) as tool_span:
+                start = time.perf_counter()
+                status = None
+                started = loop.create_future()
+
+                def work() -> ToolMessage:
+                    try:
+                        loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+                    except RuntimeError:
+                        pass  # the step gave up waiting and its loop is gone
+                    return self._run_one_in_thread(call, input_type, config)
+
+                # The worker thread gets a copy of the context, so backend spans nest under this one
+                future = loop.run_in_executor(self._executor, contextvars.copy_context().run, work)
+                try:
+                    await asyncio.wait_for(asyncio.shield(started), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    future.cancel()
+                    status = "timeout"
+                    output = error(call, f"Error: {call['name']} did not start within {self.timeout:g}s: all "
+                                         f"{self.max_concurrency} tool workers are busy with earlier calls.")
+                else:
+                    try:
+                        output = await asyncio.wait_for(future, timeout=self.timeout)
+                    except asyncio.TimeoutError:
+                        status = "timeout"
+                        output = error(call, f"Error: {call['name']} timed out after {self.timeout:g}s. "
+                                             "Results of the other tool calls in this step are still available.")
+                    except Exception as e:
+                        output = error(call, f"Error: {call['name']} failed: {e!r}")
+                seconds = time.perf_counter() - start
+                status = status or getattr(output, "status", "success")
+                timings.append({"name": call["name"], "seconds": round(seconds, 4), "status": status})
+                metrics.record_tool_call(call["name"], seconds, getattr(output, "content", None), status)
+                tool_span.set_attribute("tool.status", status)
+                return output
+
+        step_start = time.perf_counter()
+        with tracing.span("agent.tool_step", {"tool.calls": len(tool_calls), "tool.max_concurrency": self.max_concurrency}):
+            outputs = await asyncio.gather(*(run(call) for call in tool_calls))
+        wall = time.perf_counter() - step_start
+        total = sum(t["seconds"] for t in timings)
+        metrics.TOOL_STEP_LATENCY.observe(wall)
+        step = {
+            "calls": timings,
+            "wall_seconds": round(wall, 4),
+            "sum_seconds": round(total, 4),
+            "concurrency": self.max_concurrency,
+        }
+        logger.info(
+            f"Tool step with {len(tool_calls)} call(s) took {wall:.2f}s wall vs {total:.2f}s summed "
+            f"(max concurrency {self.max_concurrency})"
+        )
+
+        combined = self._combine_tool_outputs(outputs, input_type)
+        if isinstance(combined, dict):
+            combined["tool_steps"] = [step]
+        return combined
+
+
+ToolBinder = Callable[[BaseChatModel, Sequence[BaseMessage]], Runnable]
+
+
+def _tool_call_key(call: Dict[str, Any]) -> str:
+    return f"{call['name']}:{json.dumps(call.get('args') or {}, sort_keys=True, default=str)}"
+
+
+class TieredModel:
+    """Dynamic model for `create_react_agent` that picks a model tier per step.
+
+    Steps go to the fast model. The strong model redoes the step when:
+      - the fast model answers without tool calls, so the report is written by the strong model ("final");
+      - the fast model repeats a tool call already made in this run ("loop");
+      - the fast model call fails ("error");
+      - the run already took `max_fast_steps` model steps ("step_budget", no fast call at all).
+    Handing over the final answer costs one extra fast call, which is small next
+    to the tool steps that no longer go to the strong model.
+
+    Args:
+        fast: Small, fast chat model for the tool-planning steps.
+        strong: Stronger chat model for the final report and escalations.
+        bind_tools: Binds the step's tools to a model, given the step's messages.
+        max_fast_steps: Model steps per run after which every step goes to the strong model.
+    """
+
+    def __init__(self, fast: BaseChatModel, strong: BaseChatModel, bind_tools: ToolBinder,
+                 max_fast_steps: int = MAX_FAST_STEPS):
+        self.fast = fast
+        self.strong = strong
+        self.bind_tools = bind_tools
+        self.max_fast_steps = max_fast_steps
+
+    @staticmethod
+    def _start(tier: str, reason: Optional[str]) -> Any:
+        if reason:
+            metrics.LLM_ESCALATIONS.labels(reason).inc()
+            logger.info(f"Escalating agent step to the strong model ({reason})")
+        return tracing.span("llm.tier", {"llm.tier": tier, "llm.escalation": reason or ""})
+
+    @staticmethod
+    def _finish(tier: str, started: float, response: AIMessage) -> AIMessage:
+        metrics.record_llm_call(tier, time.perf_counter() - started, response)
+        response.response_metadata["model_tier"] = tier
+        return response
+
+    def __call__(self, state: Any, runtime: Optional[Any] = None) -> Runnable:
+        messages = list(state["messages"] if isinstance(state, dict) else state.messages)
+        start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+        run = [m for m in messages[start + 1:] if isinstance(m, AIMessage)]
+        seen = {_tool_call_key(call) for m in run for call in m.tool_calls}
+        budget_left = len(run) < self.max_fast_steps
+        fast = self.bind_tools(self.fast, messages)
+        strong = self.bind_tools(self.strong, messages)
+
+        def escalation(response: AIMessage) -> Optional[str]:
+            if not response.tool_calls:
+                return "final"
+            if any(_tool_call_key(call) in seen for call in response.tool_calls):
+                return "loop"
+            return None
+
+        def invoke(prompt: Any, config: RunnableConfig) -> AIMessage:
+            reason = "step_budget"
+            if budget_left:
+                try:
+                    with self._start("fast", None):
+                        started = time.perf_counter()
+                        response = self._finish("fast", started, fast.invoke(prompt, config))
+                    reason = escalation(response)
+                except Exception as e:
+                    logger.warning(f"Fast model failed: {e!r}")
+                    reason = "error"
+                if reason is None:
+                    return response
+            with self._start("strong", reason):
+                started = time.perf_counter()
+                return self._finish("strong", started, strong.invoke(prompt, config))
+
+        async def ainvoke(prompt: Any, config: RunnableConfig) -> AIMessage:
+            reason = "step_budget"
+            if budget_left:
+                try:
+                    with self._start("fast", None):
+                        started = time.perf_counter()
+                        response = self._finish("fast", started, await fast.ainvoke(prompt, config))
+                    reason = escalation(response)
+                except Exception as e:
+                    logger.warning(f"Fast model failed: {e!r}")
+                    reason = "error"
+                if reason is None:
+                    return response
+            with self._start("strong", reason):
+                started = time.perf_counter()
+                return self._finish("strong", started, await strong.ainvoke(prompt, config))
+
+        return RunnableLambda(invoke, afunc=ainvoke, name="tiered_model")
+
+
+def _latest_user_message(messages: Sequence[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return message.content if isinstance(message.content, str) else str(message.content)
+    return ""
 
 
-def create_sre_agent():
-    """Create and configure the SRE React Agent with all tools."""
+def _describe_evidence_delta(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[str]:
+    """Summarize how the alerts returned by `get_alerts` changed between two snapshots."""
+    def _key(alert: Dict[str, Any]) -> str:
+        return ",".join(f"{k}={v}" for k, v in sorted((alert.get("labels") or {}).items()))
 
-    model = ChatOpenAI(
-        model="gpt-5-nano-2025-08-07",
+    before = {_key(a): a for a in old}
+    after = {_key(a): a for a in new}
+    changes = []
+    for key in after.keys() - before.keys():
+        changes.append(f"new alert instance {{{key}}} state={after[key].get('state')}")
+    for key in before.keys() - after.keys():
+        changes.append(f"alert instance {{{key}}} is no longer active")
+    for key in after.keys() & before.keys():
+        for field_name in ("state", "activeAt"):
+            if before[key].get(field_name) != after[key].get(field_name):
+                changes.append(
+                    f"{{{key}}} {field_name}: {before[key].get(field_name)} -> {after[key].get(field_name)}"
+                )
+    return changes
+
+
+def check_investigation_cache(state: State) -> Dict[str, Any]:
+    """Short-circuit re-notified alerts whose evidence has not changed.
+
+    Resolved notifications evict the cached investigation. When the alert is
+    cached but the evidence moved, the previous report and the delta are handed
+    to the agent so that only what changed gets re-investigated. Notifications
+    with no matching alert in Prometheus are neither served from nor stored
+    in the cache.
+    """
+    alerts = parse_alert_message(_latest_user_message(state.get("messages", [])))
+    if not alerts:
+        return {"investigation": {}}
+
+    if all(alert.resolved for alert in alerts):
+        evicted = sum(investigation_cache.evict(alert.fingerprint) for alert in alerts)
+        logger.info(f"Alert resolved, evicted {evicted} cached investigation(s)")
+        return {"investigation": {}}
+
+    try:
+        prometheus_alerts = make_prometheus_request("alerts").get("alerts", [])
+    except Exception as e:
+        # Without an evidence snapshot we cannot tell whether anything changed
+        logger.warning(f"Skipping investigation cache, could not fetch alerts: {e}")
+        return {"investigation": {}}
+
+    evidence = [match for alert in alerts for match in matching_prometheus_alerts(alert, prometheus_alerts)]
+    if not evidence:
+        # An empty snapshot hashes the same every time, so it would vouch for a report it never checked
+        logger.info("No matching alerts in Prometheus, investigating without the cache")
+        metrics.record_cache("investigation", "miss")
+        return {"investigation": {"evidence": evidence}}
+    fingerprint = notification_fingerprint(alerts)
+    investigation = {
+        "fingerprint": fingerprint,
+        "evidence_hash": evidence_hash(evidence),
+        "evidence": evidence,
+        "starts_at": min((a.starts_at for a in alerts if a.starts_at), default=None),
+    }
+
+    cached = investigation_cache.get(fingerprint)
+    if cached is None:
+        metrics.record_cache("investigation", "miss")
+        return {"investigation": investigation}
+
+    since = cached.starts_at or investigation["starts_at"] or "desconhecido"
+    age_minutes = int((time.time() - cached.created_at) / 60)
+    if cached.evidence_hash == investigation["evidence_hash"]:
+        logger.info(f"Investigation cache hit for {fingerprint}")
+        metrics.record_cache("investigation", "hit")
+        note = (
+            f"🔁 **Alerta ainda disparando desde {since}.** Nenhuma mudança material nas evidências "
+            f"desde a última investigação (há {age_minutes} min); reaproveitando o relatório anterior."
+        )
+        return {
+            "messages": [AIMessage(content=f"{note}\n\n{cached.report}")],
+            "investigation": {**investigation, "cached": True},
+        }
+
+    logger.info(f"Investigation cache stale for {fingerprint}, re-investigating the delta")
+    metrics.record_cache("investigation", "stale")
+    changes = _describe_evidence_delta(cached.evidence, evidence) or ["alert evidence changed"]
+    delta = (
+        f"This alert was already investigated {age_minutes} minutes ago and is still firing since {since}.\n"
+        "Changes in `get_alerts` evidence since then:\n"
+        + "\n".join(f"- {change}" for change in changes)
+        + "\n\nPrevious report:\n"
+        + cached.report
+        + "\n\nOnly re-investigate what changed and deliver an updated report in the usual format."
+    )
+    return {"messages": [SystemMessage(content=delta)], "investigation": investigation}
+
+
+def record_run_metrics(state: State) -> Dict[str, Any]:
+    """Record model steps and token usage of the agent run that just finished."""
+    messages = list(state.get("messages", []))
+    last_user = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+    usage = metrics.record_llm_usage([m for m in messages[last_user + 1:] if isinstance(m, AIMessage)])
+    logger.info(f"Agent run used {usage['input']} input / {usage['output']} output tokens")
+    return {}
+
+
+def store_investigation(state: State) -> Dict[str, Any]:
+    """Remember the agent's report for the alert being investigated."""
+    investigation = state.get("investigation") or {}
+    messages = state.get("messages", [])
+    if not investigation.get("fingerprint") or investigation.get("cached") or not messages:
+        return {}
+    last = messages[-1]
+    if isinstance(last, AIMessage) and isinstance(last.content, str) and last.content:
+        investigation_cache.put(investigation["fingerprint"], CachedInvestigation(
+            report=last.content,
+            evidence_hash=investigation["evidence_hash"],
+            evidence=investigation.get("evidence", []),
+            starts_at=investigation.get("starts_at"),
+        ))
+    return {}
+
+
+async def prefetch_evidence(state: State) -> Dict[str, Any]:
+    """Gather the standard evidence set for an alert before the agent starts.
+
+    Only runs for alert notifications (MODE 1); questions go straight to the agent.
+    """
+    alerts = parse_alert_message(_latest_user_message(state.get("messages", [])))
+    if not alerts or all(alert.resolved for alert in alerts):
+        return {}
+
+    investigation = state.get("investigation") or {}
+    calls = plan_evidence(alerts, include_alerts="evidence" not in investigation)
+    start = time.time()
+    with tracing.span("agent.prefetch_evidence", {"evidence.sections": len(calls)}):
+        bundle = await gather_evidence(calls)
+    if "evidence" in investigation:
+        bundle["alerts"] = investigation["evidence"]
+    logger.info(f"Pre-fetched {len(calls)} evidence sections in {time.time() - start:.2f}s")
+    return {"messages": [SystemMessage(content=format_evidence_message(bundle))]}
+
+
+def _route_after_cache(state: State) -> str:
+    return END if (state.get("investigation") or {}).get("cached") else "prefetch_evidence"
+
+
+def _chat_model(name: str) -> BaseChatModel:
+    # Deferred: the OpenAI SDK is the slowest import of the agent
+    from langchain_openai import ChatOpenAI
+
+    # Under a cassette, chat completions are recorded or replayed by the HTTP transport
+    tape = cassette.active
+    return ChatOpenAI(
+        model=name,
         temperature=0.1,  # Low temperature for consistent technical responses
-        api_key=os.getenv("OPENAI_API_KEY")
+        api_key=os.getenv("OPENAI_API_KEY"),
+        callbacks=[tracing.TracingCallbackHandler()],
+        **(tape.httpx_clients() if tape is not None else {}),
     )
-    
-    tools = [
-        # Kubernetes tools
-        list_pods,
-        describe_pod,
-        get_pod_logs,
-        list_deployments,
-        describe_deployment,
-        list_services,
-        get_events,
-        list_nodes,
-        # Prometheus tools
-        execute_query,
-        execute_range_query,
-        list_metric_label_values,
-        get_alerts,
-
-        # Backstage tools
-        list_entities,
-        get_entity_metadata,
-        search_entities_by_attribute,
-        search_catalog_entities,
-        list_entity_attributes,
-    ]
 
+
+def create_sre_agent(
+    max_tool_concurrency: int = TOOL_MAX_CONCURRENCY,
+    tool_timeout: float = TOOL_TIMEOUT_SECONDS,
+    tool_routing: bool = AGENT_TOOL_ROUTING,
+    context_compaction: bool = AGENT_CONTEXT_COMPACTION,
+    model: Optional[BaseChatModel] = None,
+    strong_model: Optional[BaseChatModel] = None,
+):
+    """Create and configure the SRE React Agent with all tools.
+
+    Args:
+        max_tool_concurrency: Maximum number of tool calls of one step run at the same time.
+        tool_timeout: Seconds after which a single tool call is reported as timed out.
+        tool_routing: Bind only the tool groups each request needs (see agent.tool_router).
+        context_compaction: Compact old tool results once the context exceeds its budget (see agent.context).
+        model: Chat model for every step, or the fast tier when a strong model is set
+            (AGENT_FAST_MODEL by default).
+        strong_model: Chat model for final reports and escalations (AGENT_STRONG_MODEL
+            by default); without one every step uses `model`.
+    """
+    if model is None:
+        model = _chat_model(FAST_MODEL)
+    if strong_model is None and STRONG_MODEL:
+        strong_model = _chat_model(STRONG_MODEL)
+
+    groups = dict(TOOL_GROUPS)
+    if mcp_clients.configured:
+        # Sessions and tool lists are kept by the shared manager, so rebuilding
+        # the agent does not reconnect; local tools win on name clashes.
+        local = {t.name for group in groups.values() for t in group}
+        groups["mcp"] = [t for t in mcp_clients.get_tools() if t.name not in local]
+    tools = [t for group in groups.values() for t in group]
+    # Lets the model re-read tool results compacted by the pre-model hook
+    helpers = [fetch_tool_result] if context_compaction else []
+    tools += helpers
+
+    agent_model: Any = model
+    if tool_routing:
+        # Each model call only sees the tool groups its request needs
+        router = ToolRouter(groups, always=helpers)
+        tools.append(router.request_tool)
+        agent_model = router.bind(model)
+        binder: ToolBinder = router.bind_tools
+    else:
+        bound: Dict[int, Runnable] = {}
+
+        def binder(chat_model: BaseChatModel, messages: Sequence[BaseMessage]) -> Runnable:
+            # Without routing every step gets all tools: bind once per model
+            if id(chat_model) not in bound:
+                bound[id(chat_model)] = bind_tools(chat_model, tools)
+            return bound[id(chat_model)]
+    if strong_model is not None:
+        agent_model = TieredModel(model, strong_model, binder)
+
+    # version="v1" hands all tool calls of a step to a single tool node run,
+    # which is what lets ConcurrentToolNode bound and time the whole step.
     agent = create_react_agent(
-        model=model,
-        tools=tools,
-        prompt=SYSTEM_PROMPT
+        model=agent_model,
+        tools=ConcurrentToolNode(tools, max_concurrency=max_tool_concurrency, timeout=tool_timeout),
+        prompt=SYSTEM_PROMPT,
+        pre_model_hook=compact_context if context_compaction else None,
+        state_schema=SREAgentState,
+        version="v1",
     )
-    
-    return agent
 
-graph = create_sre_agent()
+    builder = StateGraph(State)
+    builder.add_node("check_investigation_cache", check_investigation_cache)
+    builder.add_node("prefetch_evidence", prefetch_evidence)
+    builder.add_node("agent", agent)
+    builder.add_node("record_run_metrics", record_run_metrics)
+    builder.add_node("store_investigation", store_investigation)
+    builder.add_edge(START, "check_investigation_cache")
+    builder.add_conditional_edges("check_investigation_cache", _route_after_cache, ["prefetch_evidence", END])
+    builder.add_edge("prefetch_evidence", "agent")
+    builder.add_edge("agent", "record_run_metrics")
+    builder.add_edge("record_run_metrics", "store_investigation")
+    builder.add_edge("store_investigation", END)
+
+    return builder.compile()
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph(config: Optional[RunnableConfig] = None):
+    """Return the shared agent graph, building it on first use.
+
+    Also serves as the LangGraph server graph factory (see langgraph.json);
+    `config` is accepted for that signature and otherwise unused. The first
+    call also starts loading the metric catalog in the background.
+    """
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            metric_catalog.warm()
+            start = time.perf_counter()
+            _graph = create_sre_agent()
+            logger.info(f"Agent graph built in {time.perf_counter() - start:.2f}s")
+        return _graph
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from agent.graph import graph` working without building at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
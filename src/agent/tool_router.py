@@ -0,0 +1,159 @@
+"""Per-request tool subsets for the ReAct agent.
+
+Binding every tool schema to every model call costs thousands of input tokens
+per step. The router picks the tool groups a request needs and binds only
+those:
+
+- alert notifications (MODE 1) get the investigation groups, ALERT_GROUPS;
+- questions (MODE 2) get the groups whose keywords appear in the latest user
+  message, or DEFAULT_GROUPS when none match;
+- groups of tools already called during the run stay bound.
+
+The model can widen its toolset with the `request_tools` escape hatch; groups
+it asked for are bound from the next step on. All tools stay registered in
+the tool node, so the routing only changes what the model is shown.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Set, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool, StructuredTool
+
+from agent.alerts import parse_alert_message
+
+logger = logging.getLogger(__name__)
+
+AGENT_TOOL_ROUTING = os.environ.get("AGENT_TOOL_ROUTING", "true").lower() == "true"
+
+REQUEST_TOOLS_NAME = "request_tools"
+ALL_GROUPS = "all"
+ALERT_GROUPS = ("kubernetes", "prometheus", "argocd", "timeline")
+DEFAULT_GROUPS = ("kubernetes", "prometheus")
+
+# Keywords (English and Portuguese) that bring a group into a MODE 2 request
+GROUP_KEYWORDS: Dict[str, Pattern[str]] = {
+    name: re.compile(pattern, re.IGNORECASE)
+    for name, pattern in {
+        "kubernetes": r"\b(pods?|nodes?|nó|namespaces?|containers?|deploy(ment)?s?|replicas?|services?|"
+                      r"cluster|kube\w*|k8s|logs?|events?|eventos?|crash\w*|oom\w*|restart\w*|reinici\w*|"
+                      r"capacity|capacidade|requests?|limits?|pending|evict\w*)\b",
+        "prometheus": r"\b(m[ée]tricas?|metrics?|prometheus|promql|queries|query|cpu|mem[óo]ria|memory|lat[êe]ncia|latency|"
+                      r"alert\w*|5xx|errors?|erros?|rate|throughput|satura\w*|disco|disk|anomal\w*|p99|slo)\b",
+        "argocd": r"\b(argo\w*|sync\w*|sincroniz\w*|deploys?|rollouts?|releases?|revis\w*|gitops|rollback|vers[ãa]o|version)\b",
+        "timeline": r"\b(timeline|linha do tempo|o que aconteceu|what happened|quando|when|hist[óo]ri\w*|history|mudan[çc]as?|changes?)\b",
+        "backstage": r"\b(backstage|cat[áa]log\w*|owners?|dono|respons[áa]vel|teams?|equipes?|squads?|"
+                     r"sistemas?|systems?|componentes?|components?|lifecycle|apis?)\b",
+    }.items()
+}
+
+
+def bind_tools(model: BaseChatModel, tools: Sequence[BaseTool]) -> Runnable:
+    """Bind `tools` to `model`; models without tool calling (offline fakes) are used as they are."""
+    try:
+        return model.bind_tools(tools)
+    except NotImplementedError:
+        return model
+
+
+def _latest_human_index(messages: Sequence[BaseMessage]) -> int:
+    return max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+class ToolRouter:
+    """Choose and bind the tool groups each model call gets to see.
+
+    Args:
+        groups: Tool groups by name; every tool of the agent must be in one.
+        always: Tools bound on every step whatever the groups (agent-level helpers).
+    """
+
+    def __init__(self, groups: Dict[str, List[BaseTool]], always: Sequence[BaseTool] = ()):
+        self.groups = {name: list(tools) for name, tools in groups.items() if tools}
+        self.always = list(always)
+        self._group_of = {tool.name: name for name, tools in self.groups.items() for tool in tools}
+        self.request_tool = self._build_request_tool()
+        self._bound: Dict[Tuple[int, Tuple[str, ...]], Runnable] = {}
+        self._lock = threading.Lock()
+
+    def _build_request_tool(self) -> BaseTool:
+        catalog = "; ".join(f"{name}: {', '.join(t.name for t in tools)}" for name, tools in self.groups.items())
+
+        async def request_tools(groups: List[str], reason: str = "") -> Dict[str, Any]:
+            wanted = list(self.groups) if ALL_GROUPS in groups else groups
+            return {
+                "enabled": {name: [t.name for t in self.groups[name]] for name in wanted if name in self.groups},
+                "unknown": [name for name in wanted if name not in self.groups],
+                "note": "The enabled tools are available from your next step on.",
+            }
+
+        return StructuredTool.from_function(
+            coroutine=request_tools,
+            name=REQUEST_TOOLS_NAME,
+            description=(
+                "Enable more tool groups when the tools you have are not enough for the task. "
+                f"Groups: {catalog}. Pass group names (or 'all') and a short reason."
+            ),
+        )
+
+    def select_groups(self, messages: Sequence[BaseMessage]) -> Set[str]:
+        """Return the tool groups to bind for the current step of the run."""
+        start = _latest_human_index(messages)
+        request = _text(messages[start]) if start >= 0 else ""
+        if parse_alert_message(request):
+            selected = set(ALERT_GROUPS)
+        else:
+            selected = {name for name, pattern in GROUP_KEYWORDS.items() if pattern.search(request)}
+            selected = selected or set(DEFAULT_GROUPS)
+
+        for message in messages[start + 1:]:
+            if not isinstance(message, AIMessage):
+                continue
+            for call in message.tool_calls:
+                if call["name"] == REQUEST_TOOLS_NAME:
+                    requested = call["args"].get("groups") or []
+                    selected.update(self.groups if ALL_GROUPS in requested else requested)
+                elif call["name"] in self._group_of:
+                    selected.add(self._group_of[call["name"]])
+        return selected & self.groups.keys()
+
+    def select_tools(self, messages: Sequence[BaseMessage]) -> List[BaseTool]:
+        """Return the tools of the selected groups plus the escape hatch, in registry order."""
+        selected = self.select_groups(messages)
+        tools = [tool for name, group in self.groups.items() if name in selected for tool in group] + self.always
+        if len(selected) < len(self.groups):
+            tools.append(self.request_tool)
+        return tools
+
+    def bind_tools(self, model: BaseChatModel, messages: Sequence[BaseMessage]) -> Runnable:
+        """Return `model` bound to the tools selected for `messages`.
+
+        Bound models are cached per model and tool subset, so the schemas of a
+        subset are converted once per process.
+        """
+        tools = self.select_tools(messages)
+        key = (id(model), tuple(tool.name for tool in tools))
+        with self._lock:
+            bound = self._bound.get(key)
+            if bound is None:
+                bound = self._bound[key] = bind_tools(model, tools)
+        logger.debug(f"Binding {len(tools)} tools: {', '.join(key[1])}")
+        return bound
+
+    def bind(self, model: BaseChatModel):
+        """Return a dynamic model callable for `create_react_agent`."""
+        def select_model(state: Any, runtime: Optional[Any] = None) -> Runnable:
+            return self.bind_tools(model, state["messages"] if isinstance(state, dict) else state.messages)
+
+        return select_model
@@ -0,0 +1,274 @@
+"""Persistent MCP client sessions for the agent.
+
+`MCPClientManager` keeps one session open per configured MCP server instead
+of connecting (or spawning a stdio server) for every tool listing or call.
+The sessions live on a background event loop thread:
+
+- each server is pinged every `MCP_HEALTH_CHECK_SECONDS` and reconnected with
+  exponential backoff when the ping or the connection fails;
+- the server's `list_tools` result is cached, and fetched again only after a
+  (re)connect or a `notifications/tools/list_changed` from the server;
+- at most `MCP_CLIENT_MAX_CONCURRENCY` calls are in flight per server.
+
+The LangChain tools it hands out call through whichever session is current,
+so a reconnect does not invalidate tools already bound to the agent.
+
+Servers are read from `MCP_SERVERS_FILE`, a JSON object of server name to
+connection in the `MultiServerMCPClient` format (see
+servers_declaration_example.py).
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from telemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+MCP_SERVERS_FILE = os.environ.get("MCP_SERVERS_FILE", "")
+MCP_CLIENT_MAX_CONCURRENCY = int(os.environ.get("MCP_CLIENT_MAX_CONCURRENCY", 8))
+MCP_HEALTH_CHECK_SECONDS = float(os.environ.get("MCP_HEALTH_CHECK_SECONDS", 30))
+MCP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("MCP_CONNECT_TIMEOUT_SECONDS", 10))
+MCP_CALL_TIMEOUT_SECONDS = float(os.environ.get("MCP_CALL_TIMEOUT_SECONDS", 45))
+PING_TIMEOUT_SECONDS = 5
+MAX_RECONNECT_DELAY_SECONDS = 60
+
+
+def _expand(value: Any) -> Any:
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    return value
+
+
+def load_server_connections(path: str = MCP_SERVERS_FILE) -> Dict[str, Dict[str, Any]]:
+    """Read the MCP server connections from a JSON file; empty when unset or unreadable."""
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            connections = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load MCP servers from {path}: {e}")
+        return {}
+    # ${VAR} placeholders keep tokens out of the file
+    return _expand(connections)
+
+
+def _describe(error: BaseException) -> str:
+    # The transports fail with exception groups; report the first real cause
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+@dataclass
+class _Server:
+    name: str
+    connection: Dict[str, Any]
+    semaphore: asyncio.Semaphore
+    session: Any = None
+    tools: List[BaseTool] = field(default_factory=list)
+    error: Optional[str] = None
+    tools_stale: bool = True
+    # Set from any thread once the first connection attempt finished
+    ready: threading.Event = field(default_factory=threading.Event)
+    # Wakes the health-check loop early (tool list changed, failed call)
+    wakeup: Optional[asyncio.Event] = None
+
+
+class MCPClientManager:
+    """Long-lived sessions, cached tool lists and per-server limits for MCP servers.
+
+    Thread-safe: tools may be invoked from any thread or event loop.
+    """
+
+    def __init__(
+        self,
+        connections: Dict[str, Dict[str, Any]],
+        max_concurrency: int = MCP_CLIENT_MAX_CONCURRENCY,
+        health_check_seconds: float = MCP_HEALTH_CHECK_SECONDS,
+        call_timeout: float = MCP_CALL_TIMEOUT_SECONDS,
+    ):
+        self.connections = connections
+        self.max_concurrency = max(1, max_concurrency)
+        self.health_check_seconds = health_check_seconds
+        self.call_timeout = call_timeout
+        self._servers: Dict[str, _Server] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.connections)
+
+    def start(self) -> None:
+        """Start the background loop and connect to every server (idempotent)."""
+        with self._lock:
+            if self._loop is not None or not self.connections:
+                return
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="mcp-clients", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self._start_servers(), self._loop).result()
+            atexit.register(self.close)
+
+    async def _start_servers(self) -> None:
+        for name, connection in self.connections.items():
+            server = _Server(name, connection, asyncio.Semaphore(self.max_concurrency), wakeup=asyncio.Event())
+            self._servers[name] = server
+            self._tasks.append(asyncio.create_task(self._run(server), name=f"mcp-{name}"))
+
+    async def _run(self, server: _Server) -> None:
+        from langchain_mcp_adapters.sessions import create_session
+
+        async def on_message(message: Any) -> None:
+            from mcp.types import ServerNotification, ToolListChangedNotification
+
+            if isinstance(message, ServerNotification) and isinstance(message.root, ToolListChangedNotification):
+                logger.info(f"MCP server {server.name} changed its tool list")
+                server.tools_stale = True
+                server.wakeup.set()
+
+        connection = dict(server.connection)
+        connection["session_kwargs"] = {**(connection.get("session_kwargs") or {}), "message_handler": on_message}
+        delay = 1.0
+        while True:
+            try:
+                async with create_session(connection) as session:
+                    started = time.perf_counter()
+                    await asyncio.wait_for(session.initialize(), timeout=MCP_CONNECT_TIMEOUT_SECONDS)
+                    server.session, server.error, server.tools_stale = session, None, True
+                    await self._refresh_tools(server)
+                    logger.info(f"Connected to MCP server {server.name} in {time.perf_counter() - started:.2f}s "
+                                f"({len(server.tools)} tools)")
+                    metrics.MCP_SERVER_UP.labels(server.name).set(1)
+                    server.ready.set()
+                    delay = 1.0
+                    while True:
+                        try:
+                            await asyncio.wait_for(server.wakeup.wait(), timeout=self.health_check_seconds)
+                        except asyncio.TimeoutError:
+                            pass
+                        server.wakeup.clear()
+                        await asyncio.wait_for(session.send_ping(), timeout=PING_TIMEOUT_SECONDS)
+                        if server.tools_stale:
+                            await self._refresh_tools(server)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                server.error = _describe(e)
+                logger.warning(f"MCP server {server.name} unavailable, reconnecting in {delay:g}s: {server.error}")
+            server.session = None
+            metrics.MCP_SERVER_UP.labels(server.name).set(0)
+            server.ready.set()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    async def _refresh_tools(self, server: _Server) -> None:
+        server.tools_stale = False
+        listed, cursor = [], None
+        while True:
+            page = await server.session.list_tools(cursor=cursor)
+            listed.extend(page.tools)
+            cursor = page.nextCursor
+            if not cursor:
+                break
+        server.tools = [self._langchain_tool(server.name, mcp_tool) for mcp_tool in listed]
+
+    def _langchain_tool(self, server_name: str, mcp_tool: Any) -> BaseTool:
+        async def call(**kwargs: Any) -> Any:
+            return await self.call_tool(server_name, mcp_tool.name, kwargs)
+
+        return StructuredTool(
+            name=mcp_tool.name,
+            description=mcp_tool.description or "",
+            args_schema=mcp_tool.inputSchema,
+            coroutine=call,
+            metadata={"mcp_server": server_name},
+        )
+
+    async def _call(self, server: _Server, name: str, arguments: Dict[str, Any]) -> Any:
+        async with server.semaphore:
+            if server.session is None:
+                return {"error": f"MCP server {server.name} is not connected: {server.error}"}
+            try:
+                result = await asyncio.wait_for(server.session.call_tool(name, arguments), timeout=self.call_timeout)
+            except asyncio.TimeoutError:
+                return {"error": f"{name} timed out after {self.call_timeout:g}s on MCP server {server.name}"}
+            except Exception as e:
+                # Check the session right away instead of at the next health check
+                server.wakeup.set()
+                return {"error": f"{name} failed on MCP server {server.name}: {_describe(e)}"}
+        text = "\n".join(getattr(content, "text", "") for content in result.content if getattr(content, "type", "") == "text")
+        if result.isError:
+            return {"error": text or f"{name} failed on MCP server {server.name}"}
+        return text
+
+    async def call_tool(self, server: str, name: str, arguments: Dict[str, Any]) -> Any:
+        """Call `name` on `server` from any event loop.
+
+        Returns:
+            The tool's text output, or an `error` dictionary.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._call(self._servers[server], name, arguments), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def get_tools(self, timeout: float = MCP_CONNECT_TIMEOUT_SECONDS) -> List[BaseTool]:
+        """Return the cached tools of every connected server.
+
+        Connects on first use, waiting up to `timeout` seconds for the servers'
+        first handshake; servers still connecting are skipped. A name exposed
+        by several servers is taken from the first one.
+        """
+        self.start()
+        deadline = time.monotonic() + timeout
+        tools: Dict[str, BaseTool] = {}
+        for server in list(self._servers.values()):
+            if not server.ready.wait(max(0.0, deadline - time.monotonic())):
+                logger.warning(f"MCP server {server.name} is still connecting, its tools are not loaded")
+            for mcp_tool in server.tools:
+                tools.setdefault(mcp_tool.name, mcp_tool)
+        return list(tools.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Connection state and tool count per server."""
+        return {
+            name: {"connected": server.session is not None, "tools": len(server.tools), "error": server.error}
+            for name, server in self._servers.items()
+        }
+
+    def close(self, timeout: float = 5) -> None:
+        """Close every session and stop the background loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        async def cancel() -> None:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"MCP sessions did not close cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._tasks, self._servers = [], {}
+
+
+mcp_clients = MCPClientManager(load_server_connections())
@@ -0,0 +1,145 @@
+"""Long-lived MCP server exposing the SRE tools over streamable HTTP and SSE.
+
+One process serves every tool of `tools.registry.SRE_TOOLS` to any number of
+MCP clients (LangGraph agents, IDEs, other assistants), so the
+backend connection pools, Kubernetes API clients, metric catalog and deploy
+index stay warm between calls and are shared by all of them:
+
+    PYTHONPATH=src python -m mcps.server          # or: make mcp-server
+
+Streamable HTTP is served on `/mcp` and the legacy SSE transport on `/sse`
+(`/messages/`) from the same port. The tools block on synchronous clients,
+so each call runs on a worker thread (at most `MCP_TOOL_WORKERS` at once) and
+the event loop keeps accepting requests meanwhile.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from langchain_core.tools import BaseTool
+from mcp.server.fastmcp import FastMCP
+
+from telemetry import metrics, tracing
+from tools.registry import SRE_TOOLS
+
+logger = logging.getLogger(__name__)
+
+MCP_HOST = os.environ.get("MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.environ.get("MCP_PORT", 8765))
+MCP_TOOL_WORKERS = int(os.environ.get("MCP_TOOL_WORKERS", 32))
+MCP_TOOL_TIMEOUT_SECONDS = float(os.environ.get("MCP_TOOL_TIMEOUT_SECONDS", 45))
+# Stateless servers keep no per-client session, so they can sit behind a load balancer
+MCP_STATELESS_HTTP = os.environ.get("MCP_STATELESS_HTTP", "false").lower() == "true"
+
+INSTRUCTIONS = (
+    "Read-only SRE tools over Kubernetes, Prometheus, ArgoCD and the Backstage catalog. "
+    "Results are JSON; failed calls return an object with an `error` key."
+)
+
+_executor = ThreadPoolExecutor(max_workers=MCP_TOOL_WORKERS, thread_name_prefix="mcp-tool")
+
+
+def _run_tool(tool: BaseTool, args: Dict[str, Any]) -> Any:
+    # Each worker thread runs the tool coroutine on its own short-lived loop
+    return asyncio.run(tool.ainvoke(args))
+
+
+def _threaded(tool: BaseTool) -> Callable[..., Any]:
+    """Wrap a LangChain tool as an MCP tool function running on the worker pool.
+
+    The wrapper keeps the tool coroutine's signature, from which FastMCP builds
+    the input schema, and returns the result as compact JSON.
+    """
+    @functools.wraps(tool.coroutine)
+    async def call(**kwargs: Any) -> str:
+        start = time.perf_counter()
+        status = "success"
+        with tracing.span(f"tool {tool.name}", {"tool.name": tool.name, "tool.transport": "mcp"}) as tool_span:
+            # Copy the context so backend spans nest under the tool span
+            context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(_executor, context.run, _run_tool, tool, kwargs)
+            try:
+                result = await asyncio.wait_for(future, timeout=MCP_TOOL_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                status, result = "timeout", {"error": f"{tool.name} timed out after {MCP_TOOL_TIMEOUT_SECONDS:g}s"}
+            except Exception as e:
+                status, result = "error", {"error": f"{tool.name} failed: {e}"}
+            tool_span.set_attribute("tool.status", status)
+        output = result if isinstance(result, str) else json.dumps(result, default=str, separators=(",", ":"))
+        metrics.record_tool_call(tool.name, time.perf_counter() - start, output, status)
+        return output
+
+    return call
+
+
+def create_server(host: str = MCP_HOST, port: int = MCP_PORT) -> FastMCP:
+    """Build the FastMCP server with every tool of the registry."""
+    server = FastMCP(
+        "vibedebugger-sre",
+        instructions=INSTRUCTIONS,
+        host=host,
+        port=port,
+        json_response=True,
+        stateless_http=MCP_STATELESS_HTTP,
+    )
+    for tool in SRE_TOOLS:
+        server.add_tool(_threaded(tool), name=tool.name, description=tool.description, structured_output=False)
+    return server
+
+
+def warm_up() -> None:
+    """Create the backend clients and load the shared indexes ahead of the first call."""
+    from tools.argocd import deploy_index
+    from tools.k8s import clusters
+    from tools.prometheus import metric_catalog
+
+    steps = {
+        "kubernetes clients": lambda: [clusters.api_client(name) for name in clusters.names],
+        "metric catalog": metric_catalog.ensure_fresh,
+        "deploy index": deploy_index.ensure_fresh,
+    }
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Warm-up of the {name} failed, it will load on first use: {e}")
+            continue
+        logger.info(f"Warmed up the {name} in {time.perf_counter() - start:.2f}s")
+
+
+def create_app(server: FastMCP):
+    """Serve streamable HTTP on /mcp and SSE on /sse from one ASGI app."""
+    app = server.streamable_http_app()
+    app.router.routes.extend(server.sse_app().routes)
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    # The MCP SDK logs every request at INFO
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+    metrics.start_metrics_server()
+    server = create_server()
+    # Warm up in the background so clients can connect right away
+    threading.Thread(target=warm_up, name="mcp-warm-up", daemon=True).start()
+    logger.info(f"Serving {len(SRE_TOOLS)} tools on http://{MCP_HOST}:{MCP_PORT}/mcp (SSE on /sse)")
+    uvicorn.run(create_app(server), host=MCP_HOST, port=MCP_PORT, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
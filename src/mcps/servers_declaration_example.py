@@ -1,8 +1,9 @@
 # This is an example of how to declare MCP clients for the ReAct Agent
-# You can use this to declare MCP clients for the ReAct Agent in src/agent/graph.py
+# The agent connects to the servers listed in the JSON file named by MCP_SERVERS_FILE
+# (same connection format as below, ${VAR} placeholders are expanded), see src/mcps/client.py
 
 import os
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcps.client import MCPClientManager
 
 prometheusMCPClient = {
             "command": "docker",
@@ -49,10 +50,21 @@ backstageMCPClient = {
             }
         }
 
-MCP_CLIENTS = MultiServerMCPClient({
+# The tools of src/tools served by `make mcp-server` (see src/mcps/server.py)
+sreToolsMCPClient = {
+            "url": os.getenv("MCP_SERVER_URL", "http://localhost:8765/mcp"),
+            "transport": "streamable_http",
+        }
+
+# Keeps one session per server open, with cached tool lists and health checks
+MCP_CLIENTS = MCPClientManager({
+    "sre-tools": sreToolsMCPClient,
     "prometheus": prometheusMCPClient,
     "argocd": argocdMCPClient,
     "software-catalog": backstageMCPClient
 })
 
-MCP_CLIENTS.get_tools()
+if __name__ == "__main__":
+    # Connecting spawns the stdio servers, so only do it when run directly
+    tools = MCP_CLIENTS.get_tools()
+    MCP_CLIENTS.close()
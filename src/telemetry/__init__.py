@@ -0,0 +1 @@
+"""Instrumentation shared by the agent, the tools and the entry points."""
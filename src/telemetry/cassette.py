@@ -0,0 +1,412 @@
+"""Record and replay the backend and LLM traffic of agent runs.
+
+With a cassette in record mode, every response the agent gets is appended to
+a gzipped JSONL file:
+- Prometheus, ArgoCD and Backstage responses (via `tools.http`);
+- Kubernetes API responses (via `tools.k8s.TracedApiClient`);
+- OpenAI chat completions (via the httpx transport of `agent.graph`'s models).
+
+In replay mode the same requests are answered from the file without touching
+the network, so end-to-end runs can be timed offline and repeated with the
+same data. The `latency_scale` factor sleeps for that fraction of the recorded
+response time: 0 measures pure orchestration overhead, 1 replays the
+recorded backend and model latency.
+
+Requests are matched on method, path, query and body, with time parameters
+(`start`, `end`, `time`) ignored. Chat completions are matched on the model,
+the first user message and the conversation length. A request without an
+exact match gets the next unused response recorded for the same method and
+path, so runs whose tool arguments changed still replay. Request headers
+(credentials) are never written.
+
+Enable it with AGENT_CASSETTE=path and AGENT_CASSETTE_MODE=record|replay
+(see `install_from_env`), or with `scripts/agent_cli.py --record/--replay`.
+"""
+
+import asyncio
+import atexit
+import base64
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+import requests
+import urllib3
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+AGENT_CASSETTE = os.environ.get("AGENT_CASSETTE", "")
+AGENT_CASSETTE_MODE = os.environ.get("AGENT_CASSETTE_MODE", "replay").lower()
+# Fraction of the recorded response time slept on replay
+AGENT_CASSETTE_LATENCY = float(os.environ.get("AGENT_CASSETTE_LATENCY", 0))
+
+RECORD = "record"
+REPLAY = "replay"
+CASSETTE_VERSION = 1
+# Query parameters that change with the wall clock between runs
+VOLATILE_PARAMS = frozenset({"start", "end", "time", "since", "_"})
+# The only response header kept: how to decode the body
+KEPT_HEADERS = ("content-type",)
+
+
+class CassetteMiss(Exception):
+    """Raised on replay for a request that has no recorded response."""
+
+
+def _digest(data: Any) -> str:
+    if data is None:
+        data = b""
+    elif isinstance(data, str):
+        data = data.encode()
+    elif not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def _chat_body_key(body: bytes) -> str:
+    """Key of a chat completion request that survives changing tool outputs."""
+    try:
+        payload = json.loads(body)
+        messages = payload.get("messages") or []
+        first_user = next((m.get("content") for m in messages if m.get("role") == "user"), None)
+        return _digest([payload.get("model"), first_user, len(messages)])
+    except (ValueError, AttributeError):
+        return _digest(body)
+
+
+def request_keys(service: str, method: str, url: str, body: Any = None) -> Tuple[str, str]:
+    """Return the (exact, loose) match keys of a request.
+
+    The host is left out so a cassette recorded against one cluster or
+    Prometheus URL replays against any other.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS))
+    loose = f"{service} {method.upper()} {parts.path}"
+    body_key = _chat_body_key(body or b"") if service == "llm" else _digest(body)
+    return f"{loose}?{query} {body_key}", loose
+
+
+class Interaction:
+    __slots__ = ("status", "reason", "headers", "content", "elapsed")
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], content: bytes, elapsed: float):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+
+class Cassette:
+    """One cassette file, either being recorded or replayed.
+
+    Args:
+        path: The cassette file; gzip-compressed when it ends with `.gz`.
+        mode: RECORD (truncates the file) or REPLAY.
+        latency_scale: On replay, fraction of the recorded response time to sleep.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY, latency_scale: float = AGENT_CASSETTE_LATENCY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected {RECORD!r} or {REPLAY!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.recorded = self.replayed = self.missed = 0
+        self._lock = threading.Lock()
+        self._interactions: List[Interaction] = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_loose: Dict[str, List[int]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._used = set()
+        self._bodies: Dict[str, bytes] = {}
+        self._file = None
+        if mode == RECORD:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = self._open("wt")
+            self._file.write(json.dumps({"version": CASSETTE_VERSION, "recorded_at": time.time()}) + "\n")
+        else:
+            self._load()
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode, encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self) -> None:
+        with self._open("rt") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"{self.path} is not a version {CASSETTE_VERSION} cassette")
+            for line in f:
+                entry = json.loads(line)
+                if "body_b64" in entry:
+                    self._bodies[entry["body_sha"]] = base64.b64decode(entry["body_b64"])
+                elif "body" in entry:
+                    self._bodies[entry["body_sha"]] = entry["body"].encode()
+                index = len(self._interactions)
+                self._interactions.append(Interaction(
+                    entry["status"], entry.get("reason", ""), entry.get("headers", {}),
+                    self._bodies[entry["body_sha"]], entry.get("elapsed", 0.0),
+                ))
+                self._by_key.setdefault(entry["key"], []).append(index)
+                self._by_loose.setdefault(entry["loose"], []).append(index)
+        logger.info(f"Loaded {len(self._interactions)} recorded responses from {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Recorded {self.recorded} responses to {self.path}")
+            elif self.mode == REPLAY:
+                logger.info(f"Replayed {self.replayed} responses from {self.path}, {self.missed} request(s) without a recording")
+
+    def record(self, service: str, method: str, url: str, body: Any, interaction: Interaction) -> None:
+        key, loose = request_keys(service, method, url, body)
+        sha = _digest(interaction.content)
+        entry = {
+            "service": service,
+            "method": method.upper(),
+            "url": url,
+            "key": key,
+            "loose": loose,
+            "status": interaction.status,
+            "reason": interaction.reason,
+            "headers": interaction.headers,
+            "elapsed": round(interaction.elapsed, 4),
+            "body_sha": sha,
+        }
+        with self._lock:
+            if self._file is None:
+                return
+            # Identical bodies (the same list fetched by several tools) are stored once
+            if sha not in self._bodies:
+                self._bodies[sha] = b""
+                try:
+                    entry["body"] = interaction.content.decode()
+                except UnicodeDecodeError:
+                    entry["body_b64"] = base64.b64encode(interaction.content).decode()
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.recorded += 1
+
+    def _next(self, candidates: List[int], key: str) -> int:
+        # The first response not served yet, else the last one again
+        cursor = self._cursors.get(key, 0)
+        while cursor < len(candidates) and candidates[cursor] in self._used:
+            cursor += 1
+        self._cursors[key] = cursor
+        return candidates[cursor] if cursor < len(candidates) else candidates[-1]
+
+    def match(self, service: str, method: str, url: str, body: Any = None) -> Interaction:
+        """Return the recorded response of a request; raises CassetteMiss without one."""
+        key, loose = request_keys(service, method, url, body)
+        with self._lock:
+            if key in self._by_key:
+                index = self._next(self._by_key[key], key)
+            elif loose in self._by_loose:
+                index = self._next(self._by_loose[loose], loose)
+            else:
+                self.missed += 1
+                raise CassetteMiss(f"No recorded response for {method.upper()} {urlsplit(url).path} in {self.path}")
+            self._used.add(index)
+            self.replayed += 1
+            return self._interactions[index]
+
+    def delay(self, interaction: Interaction) -> float:
+        return interaction.elapsed * self.latency_scale
+
+    # requests (Prometheus, ArgoCD, Backstage)
+
+    def send_requests(self, adapter: Any, request: requests.PreparedRequest,
+                      send: Callable[[], requests.Response]) -> requests.Response:
+        """Serve or record one `requests` round trip; `send` performs the real one."""
+        if self.mode == RECORD:
+            start = time.perf_counter()
+            response = send()
+            content = response.content
+            self.record("http", request.method, request.url, request.body, Interaction(
+                response.status_code, response.reason or "", _kept_headers(response.headers),
+                content, time.perf_counter() - start,
+            ))
+            return response
+        try:
+            interaction = self.match("http", request.method, request.url, request.body)
+        except CassetteMiss as e:
+            raise requests.ConnectionError(str(e), request=request)
+        time.sleep(self.delay(interaction))
+        response = requests.Response()
+        response.status_code = interaction.status
+        response.reason = interaction.reason
+        response.headers = CaseInsensitiveDict(interaction.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = interaction.content
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        response.elapsed = timedelta(seconds=interaction.elapsed)
+        return response
+
+    # Kubernetes API client
+
+    def send_kubernetes(self, send: Callable[..., Any], method: str, url: str, query_params: Any = None,
+                        body: Any = None, _preload_content: bool = True, **kwargs: Any) -> Any:
+        """Serve or record one Kubernetes ApiClient request; `send` performs the real one."""
+        from kubernetes.client.rest import ApiException, RESTResponse
+
+        full_url = f"{url}?{urlencode(query_params)}" if query_params else url
+        if self.mode == RECORD:
+            start = time.perf_counter()
+            try:
+                response = send(method, url, query_params=query_params, body=body,
+                                _preload_content=_preload_content, **kwargs)
+            except ApiException as e:
+                if e.status:
+                    self.record("k8s", method, full_url, body, Interaction(
+                        e.status, e.reason or "", _kept_headers(e.headers or {}),
+                        (e.body or "").encode() if isinstance(e.body, str) else e.body or b"",
+                        time.perf_counter() - start,
+                    ))
+                raise
+            if _preload_content:
+                content, headers = response.data.encode(), response.getheaders()
+            else:
+                try:
+                    content, headers = response.data, response.headers
+                finally:
+                    response.release_conn()
+            interaction = Interaction(response.status, response.reason or "", _kept_headers(headers),
+                                      content, time.perf_counter() - start)
+            self.record("k8s", method, full_url, body, interaction)
+            if _preload_content:
+                return response
+        else:
+            try:
+                interaction = self.match("k8s", method, full_url, body)
+            except CassetteMiss as e:
+                raise ApiException(status=0, reason=str(e))
+            time.sleep(self.delay(interaction))
+
+        # The raw urllib3 response the API client expects, read back from the recorded body
+        response = urllib3.HTTPResponse(
+            body=io.BytesIO(interaction.content), headers=interaction.headers, status=interaction.status,
+            reason=interaction.reason, preload_content=_preload_content,
+        )
+        if _preload_content:
+            response = RESTResponse(response)
+            response.data = response.data.decode("utf8")
+        if not 200 <= interaction.status <= 299:
+            raise ApiException(http_resp=response)
+        return response
+
+    # httpx (OpenAI chat completions)
+
+    def httpx_clients(self) -> Dict[str, Any]:
+        """Return `http_client` / `http_async_client` keyword arguments for ChatOpenAI."""
+        return {
+            "http_client": httpx.Client(transport=CassetteTransport(self, httpx.HTTPTransport())),
+            "http_async_client": httpx.AsyncClient(transport=AsyncCassetteTransport(self, httpx.AsyncHTTPTransport())),
+        }
+
+    def _httpx_response(self, request: httpx.Request, interaction: Interaction) -> httpx.Response:
+        return httpx.Response(interaction.status, headers=interaction.headers, content=interaction.content, request=request)
+
+    def _httpx_match(self, request: httpx.Request) -> Interaction:
+        try:
+            return self.match("llm", request.method, str(request.url), request.content)
+        except CassetteMiss as e:
+            raise httpx.ConnectError(str(e), request=request)
+
+    def _httpx_record(self, request: httpx.Request, response: httpx.Response, elapsed: float) -> None:
+        self.record("llm", request.method, str(request.url), request.content, Interaction(
+            response.status_code, response.reason_phrase, _kept_headers(response.headers), response.content, elapsed,
+        ))
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport recording to or replaying from a cassette."""
+
+    def __init__(self, cassette: Cassette, transport: httpx.BaseTransport):
+        self.cassette = cassette
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.mode == RECORD:
+            start = time.perf_counter()
+            response = self.transport.handle_request(request)
+            response.read()
+            self.cassette._httpx_record(request, response, time.perf_counter() - start)
+            return response
+        interaction = self.cassette._httpx_match(request)
+        time.sleep(self.cassette.delay(interaction))
+        return self.cassette._httpx_response(request, interaction)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async httpx transport recording to or replaying from a cassette."""
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport):
+        self.cassette = cassette
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.mode == RECORD:
+            start = time.perf_counter()
+            response = await self.transport.handle_async_request(request)
+            await response.aread()
+            self.cassette._httpx_record(request, response, time.perf_counter() - start)
+            return response
+        interaction = self.cassette._httpx_match(request)
+        await asyncio.sleep(self.cassette.delay(interaction))
+        return self.cassette._httpx_response(request, interaction)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _kept_headers(headers: Any) -> Dict[str, str]:
+    lowered = {str(k).lower(): str(v) for k, v in dict(headers).items()}
+    return {k: lowered[k] for k in KEPT_HEADERS if k in lowered}
+
+
+# The cassette the clients go through, if any
+active: Optional[Cassette] = None
+
+
+def install(path: str, mode: str = REPLAY, latency_scale: float = AGENT_CASSETTE_LATENCY) -> Cassette:
+    """Route the backend and LLM clients through a cassette for the rest of the process.
+
+    Must run before the agent graph is built: chat models pick their
+    transport when they are created.
+    """
+    global active
+    if active is not None:
+        active.close()
+    active = Cassette(path, mode, latency_scale)
+    atexit.register(active.close)
+    logger.info(f"Cassette {mode}: {path}" + (f" (latency x{latency_scale:g})" if mode == REPLAY else ""))
+    return active
+
+
+def install_from_env() -> Optional[Cassette]:
+    """Install the cassette configured by AGENT_CASSETTE / AGENT_CASSETTE_MODE, if any."""
+    if not AGENT_CASSETTE:
+        return None
+    return install(AGENT_CASSETTE, AGENT_CASSETTE_MODE, AGENT_CASSETTE_LATENCY)
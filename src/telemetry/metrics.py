@@ -0,0 +1,173 @@
+"""Prometheus metrics for the agent, its tools and the Discord bot.
+
+Metrics are recorded where tools are executed (the agent's tool node and the
+evidence prefetch) so every tool in `src/tools/` is covered without touching
+the tool functions. `start_metrics_server` exposes them on `/metrics`.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional, Sequence
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9464))
+NAMESPACE = "vibedebugger"
+
+TOOL_LATENCY = Histogram(
+    "tool_call_duration_seconds",
+    "Wall time of a single tool call.",
+    ["tool"],
+    namespace=NAMESPACE,
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+TOOL_RESPONSE_BYTES = Histogram(
+    "tool_response_bytes",
+    "Size of the tool result handed to the model.",
+    ["tool"],
+    namespace=NAMESPACE,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+TOOL_CALLS = Counter("tool_calls_total", "Tool calls.", ["tool"], namespace=NAMESPACE)
+TOOL_ERRORS = Counter(
+    "tool_errors_total",
+    "Tool calls that failed, by kind (error or timeout).",
+    ["tool", "kind"],
+    namespace=NAMESPACE,
+)
+CACHE_EVENTS = Counter(
+    "cache_events_total",
+    "Cache lookups by cache and result (hit, miss, stale).",
+    ["cache", "result"],
+    namespace=NAMESPACE,
+)
+PROMQL_GUARD_DECISIONS = Counter(
+    "promql_guard_decisions_total",
+    "PromQL cost guard decisions (allowed, rewritten, rejected).",
+    ["decision"],
+    namespace=NAMESPACE,
+)
+TOOL_STEP_LATENCY = Histogram(
+    "tool_step_duration_seconds",
+    "Wall time of a whole ReAct tool step (all of its tool calls).",
+    namespace=NAMESPACE,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+LLM_STEPS = Histogram(
+    "llm_steps_per_investigation",
+    "Model calls made by the agent in one run.",
+    namespace=NAMESPACE,
+    buckets=(1, 2, 3, 5, 8, 12, 20, 30),
+)
+LLM_TOKENS = Histogram(
+    "llm_tokens_per_investigation",
+    "Tokens used by the agent in one run, by direction (input or output).",
+    ["direction"],
+    namespace=NAMESPACE,
+    buckets=(500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000),
+)
+LLM_TOKENS_TOTAL = Counter(
+    "llm_tokens_total",
+    "Tokens used by the agent, by direction (input or output).",
+    ["direction"],
+    namespace=NAMESPACE,
+)
+LLM_CALL_LATENCY = Histogram(
+    "llm_call_duration_seconds",
+    "Wall time of one model call, by model tier (fast or strong).",
+    ["tier"],
+    namespace=NAMESPACE,
+    buckets=(0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+LLM_TIER_TOKENS = Counter(
+    "llm_tier_tokens_total",
+    "Tokens used by the agent, by model tier and direction (input or output).",
+    ["tier", "direction"],
+    namespace=NAMESPACE,
+)
+LLM_ESCALATIONS = Counter(
+    "llm_escalations_total",
+    "Agent steps handed from the fast to the strong model, by reason (final, loop, error, step_budget).",
+    ["reason"],
+    namespace=NAMESPACE,
+)
+MCP_SERVER_UP = Gauge(
+    "mcp_server_up",
+    "Whether the agent's session to an MCP server is connected (1) or not (0).",
+    ["server"],
+    namespace=NAMESPACE,
+)
+DISCORD_QUEUE_DEPTH = Gauge(
+    "discord_queue_depth",
+    "Discord messages received and still being answered.",
+    namespace=NAMESPACE,
+)
+
+
+def record_tool_call(tool: str, seconds: float, output: Any = None, status: str = "success") -> None:
+    """Record one tool call.
+
+    Args:
+        tool: Tool name.
+        seconds: Wall time of the call.
+        output: Result handed to the model; its size feeds the response bytes histogram.
+        status: "success", "error" or "timeout".
+    """
+    TOOL_CALLS.labels(tool).inc()
+    TOOL_LATENCY.labels(tool).observe(seconds)
+    if output is not None:
+        size = len(output.encode()) if isinstance(output, str) else len(str(output).encode())
+        TOOL_RESPONSE_BYTES.labels(tool).observe(size)
+    if status != "success":
+        TOOL_ERRORS.labels(tool, status).inc()
+
+
+def record_cache(cache: str, result: str) -> None:
+    """Record a cache lookup outcome ("hit", "miss" or "stale")."""
+    CACHE_EVENTS.labels(cache, result).inc()
+
+
+def record_llm_usage(ai_messages: Sequence[Any]) -> Dict[str, int]:
+    """Record model steps and token usage of one agent run.
+
+    Returns:
+        The aggregated token usage.
+    """
+    usage = {"input": 0, "output": 0}
+    for message in ai_messages:
+        metadata = getattr(message, "usage_metadata", None) or {}
+        usage["input"] += metadata.get("input_tokens", 0)
+        usage["output"] += metadata.get("output_tokens", 0)
+    LLM_STEPS.observe(len(ai_messages))
+    for direction, tokens in usage.items():
+        LLM_TOKENS.labels(direction).observe(tokens)
+        LLM_TOKENS_TOTAL.labels(direction).inc(tokens)
+    return usage
+
+
+def record_llm_call(tier: str, seconds: float, message: Any = None) -> None:
+    """Record one model call of the given tier and the tokens it used."""
+    LLM_CALL_LATENCY.labels(tier).observe(seconds)
+    usage = getattr(message, "usage_metadata", None) or {}
+    LLM_TIER_TOKENS.labels(tier, "input").inc(usage.get("input_tokens", 0))
+    LLM_TIER_TOKENS.labels(tier, "output").inc(usage.get("output_tokens", 0))
+
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[int]:
+    """Serve `/metrics` on `port` (METRICS_PORT by default); 0 disables it.
+
+    Returns:
+        The port being served, or None when disabled or the port is taken.
+    """
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    try:
+        start_http_server(port)
+    except OSError as e:
+        logger.warning(f"Could not start metrics server on port {port}: {e}")
+        return None
+    logger.info(f"Serving Prometheus metrics on :{port}/metrics")
+    return port
@@ -0,0 +1,186 @@
+"""OpenTelemetry tracing for agent runs, tool calls and backend requests.
+
+One trace covers a Discord message or CLI prompt: model calls and tool steps
+are its children, tool calls hang below their step and the HTTP / Kubernetes
+API requests (and their JSON parsing) below the tool call that made them.
+
+Tracing is off unless TRACING_EXPORTER is set:
+    otlp  OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (or ..._TRACES_ENDPOINT)
+    file  one JSON span per line appended to TRACING_FILE
+
+Sampling is decided once per trace (TRACING_SAMPLE_RATIO), so unsampled
+requests only pay for non-recording spans.
+
+Spans use their own tracer provider and context variable instead of the
+global OpenTelemetry ones, so they never get mixed into the Langfuse traces.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span, Status, StatusCode
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "").lower()
+TRACING_FILE = os.environ.get("TRACING_FILE", "traces.jsonl")
+TRACING_SAMPLE_RATIO = float(os.environ.get("TRACING_SAMPLE_RATIO", 0.1))
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "vibedebugger-agent")
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("vibedebugger_current_span", default=None)
+_tracer: Optional[trace.Tracer] = None
+_tracer_lock = threading.Lock()
+_configured = False
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning(f"Could not write spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _build_exporter(name: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter()
+    if name == "file":
+        return JsonFileSpanExporter(TRACING_FILE)
+    logger.warning(f"Unknown TRACING_EXPORTER {name!r}, tracing disabled")
+    return None
+
+
+def get_tracer() -> Optional[trace.Tracer]:
+    """Return the agent tracer, configuring it on first use; None when tracing is off."""
+    global _tracer, _configured
+    if _configured:
+        return _tracer
+    with _tracer_lock:
+        if not _configured:
+            exporter = _build_exporter(TRACING_EXPORTER) if TRACING_EXPORTER else None
+            if exporter is not None:
+                provider = TracerProvider(
+                    resource=Resource.create({"service.name": SERVICE_NAME}),
+                    sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO)),
+                )
+                provider.add_span_processor(BatchSpanProcessor(exporter))
+                _tracer = provider.get_tracer(__name__)
+                logger.info(f"Tracing enabled ({TRACING_EXPORTER}, sample ratio {TRACING_SAMPLE_RATIO:g})")
+            _configured = True
+    return _tracer
+
+
+def _start_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+    tracer = get_tracer()
+    if tracer is None:
+        return trace.INVALID_SPAN
+    parent = _current_span.get()
+    context = trace.set_span_in_context(parent) if parent is not None else Context()
+    return tracer.start_span(name, context=context, attributes=attributes)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+    """Run the block inside a child span of the current agent span.
+
+    Exceptions are recorded on the span and re-raised. When tracing is off the
+    yielded span is a no-op, so callers can always set attributes on it.
+    """
+    current = _start_span(name, attributes)
+    if current is trace.INVALID_SPAN:
+        yield current
+        return
+    # Unsampled spans are still made current so their children stay unsampled
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        current.set_status(Status(StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """A ThreadPoolExecutor that runs each call in a copy of the submitting thread's context.
+
+    Worker threads do not inherit context variables, so spans started by
+    pooled calls would otherwise have no parent and each begin a trace of
+    their own.
+    """
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        # One copy per call: a context cannot be entered by two threads at once
+        return super().submit(copy_context().run, fn, *args, **kwargs)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Open a span around every chat model call of the agent."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("metadata") or {}).get("ls_model_name")
+        llm_span = _start_span("llm.chat", {"gen_ai.request.model": model or "unknown", "llm.messages": sum(len(m) for m in messages)})
+        if llm_span.is_recording():
+            self._spans[run_id] = llm_span
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        llm_span = self._spans.pop(run_id, None)
+        if llm_span is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                llm_span.set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens", 0))
+                llm_span.set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens", 0))
+                llm_span.set_attribute("llm.tool_calls", [c["name"] for c in getattr(message, "tool_calls", None) or []])
+        llm_span.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        llm_span = self._spans.pop(run_id, None)
+        if llm_span is None:
+            return
+        llm_span.record_exception(error)
+        llm_span.set_status(Status(StatusCode.ERROR, str(error)))
+        llm_span.end()
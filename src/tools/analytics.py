@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+"""Analytics tools that summarise many Prometheus series in one call.
+
+Range results are decoded into NumPy matrices (one row per series, one column
+per step) so scores are computed for every series at once and only the
+interesting few are handed back to the model.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.tools import tool
+
+from telemetry import tracing
+from tools.prometheus import make_prometheus_request, range_query
+from tools.timeutil import format_duration, parse_duration, parse_time
+
+logger = logging.getLogger(__name__)
+
+# Points per window when no step is given
+DEFAULT_POINTS_PER_WINDOW = 60
+MIN_STEP_SECONDS = 15
+MAX_TOP_K = 50
+# MAD of a normal distribution is 0.6745 sigma
+MAD_TO_SIGMA = 1.4826
+# Flat baselines would give infinite z-scores; floor the spread at 1% of the level
+MIN_RELATIVE_SPREAD = 0.01
+
+
+def _series_key(labels: Dict[str, str]) -> str:
+    return json.dumps(labels, sort_keys=True)
+
+
+def decode_matrix(result: List[Dict[str, Any]], start: float, step: float, points: int) -> Tuple[List[Dict[str, str]], np.ndarray]:
+    """Decode a Prometheus matrix into (labels, values[series, step]), NaN where a step has no sample."""
+    labels = [series.get("metric", {}) for series in result]
+    matrix = np.full((len(result), points), np.nan)
+    lengths = [len(series.get("values", ())) for series in result]
+    if not sum(lengths):
+        return labels, matrix
+    samples = np.array([sample for series in result for sample in series.get("values", ())], dtype=object)
+    timestamps = samples[:, 0].astype(float)
+    # Values are strings ("1.5", "NaN", "+Inf"); float conversion handles all of them
+    values = samples[:, 1].astype(float)
+    rows = np.repeat(np.arange(len(result)), lengths)
+    columns = np.rint((timestamps - start) / step).astype(int)
+    inside = (columns >= 0) & (columns < points)
+    matrix[rows[inside], columns[inside]] = values[inside]
+    return labels, matrix
+
+
+def _fetch_window(query: str, start: float, end: float, step: float) -> Tuple[Dict[str, Any], float, List[Dict[str, str]], np.ndarray]:
+    response = range_query(query, f"{start:.3f}", f"{end:.3f}", f"{step:g}")
+    if "error" in response:
+        return response, step, [], np.empty((0, 0))
+    # The cost guard may have coarsened the step
+    step = parse_duration(response.get("step") or step)
+    points = int((end - start) // step) + 1
+    labels, matrix = decode_matrix(response["result"], start, step, points)
+    return response, step, labels, matrix
+
+
+def _round(values: np.ndarray, digits: int = 4) -> List[Optional[float]]:
+    return [None if not np.isfinite(v) else round(float(v), digits) for v in values]
+
+
+@tool(description="Find which series of a PromQL query look abnormal: compares the current window with a baseline window (by default the same time yesterday) for all series at once using robust z-scores (median/MAD) and percentage change, and returns only the top-k most anomalous series. Use it to answer 'what changed around this alert?' instead of pulling range data series by series.")
+async def score_anomalies(
+    query: str,
+    window: str = "30m",
+    baseline: str = "1d",
+    top_k: int = 10,
+    end: Optional[str] = None,
+    step: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Score every series returned by `query` against its own baseline.
+
+    Args:
+        query: PromQL returning the series to compare (e.g. 'sum by (pod) (rate(container_cpu_usage_seconds_total{namespace="apps"}[5m]))').
+        window: Length of the current window ending at `end` (e.g. '30m').
+        baseline: How far back the baseline window is (e.g. '1d' for the same time yesterday, '1w' for last week).
+        top_k: Number of series to return.
+        end: End of the current window (RFC3339 or Unix timestamp); defaults to now.
+        step: Resolution of both windows; defaults to window / 60.
+
+    Returns:
+        The top-k series by absolute robust z-score with their percentage change,
+        plus series that only exist in one of the windows.
+    """
+    logger.info(f"Scoring anomalies for {query} (window {window}, baseline {baseline} ago)")
+    started = time.perf_counter()
+    window_seconds = parse_duration(window)
+    offset_seconds = parse_duration(baseline)
+    end_ts = parse_time(end)
+    step_seconds = parse_duration(step) if step else max(MIN_STEP_SECONDS, window_seconds / DEFAULT_POINTS_PER_WINDOW)
+    top_k = max(1, min(top_k, MAX_TOP_K))
+
+    # Both windows are fetched at once; they only need matching rows, not matching columns
+    with tracing.ContextThreadPoolExecutor(max_workers=2) as pool:
+        current_future = pool.submit(_fetch_window, query, end_ts - window_seconds, end_ts, step_seconds)
+        baseline_future = pool.submit(
+            _fetch_window, query, end_ts - offset_seconds - window_seconds, end_ts - offset_seconds, step_seconds,
+        )
+        current_response, step_seconds, current_labels, current = current_future.result()
+        baseline_response, _, baseline_labels, base = baseline_future.result()
+    for response in (current_response, baseline_response):
+        if "error" in response:
+            return response
+    fetched = time.perf_counter()
+
+    # Line the baseline rows up with the current rows by label set
+    baseline_rows = {_series_key(labels): i for i, labels in enumerate(baseline_labels)}
+    current_keys = [_series_key(labels) for labels in current_labels]
+    matched = np.array([baseline_rows.get(key, -1) for key in current_keys], dtype=int)
+    has_baseline = matched >= 0
+    aligned = np.full((len(current_labels), base.shape[1]), np.nan)
+    aligned[has_baseline] = base[matched[has_baseline]]
+
+    with np.errstate(all="ignore"):
+        current_median = np.nanmedian(current, axis=1)
+        finite = np.isfinite(current)
+        last_column = current.shape[1] - 1 - np.argmax(finite[:, ::-1], axis=1)
+        current_last = np.where(finite.any(axis=1), current[np.arange(len(current)), last_column], np.nan)
+        current_max = np.nanmax(current, axis=1)
+        baseline_median = np.nanmedian(aligned, axis=1)
+        mad = np.nanmedian(np.abs(aligned - baseline_median[:, None]), axis=1) * MAD_TO_SIGMA
+        spread = np.maximum(mad, np.maximum(np.abs(baseline_median) * MIN_RELATIVE_SPREAD, 1e-9))
+        z_scores = (current_median - baseline_median) / spread
+        pct_change = np.where(baseline_median != 0, (current_median - baseline_median) / np.abs(baseline_median) * 100, np.nan)
+
+    scorable = np.isfinite(z_scores)
+    order = np.argsort(-np.abs(np.where(scorable, z_scores, 0)), kind="stable")
+    top = [i for i in order[:top_k] if scorable[i]]
+
+    current_keys_set = set(current_keys)
+    new_series = [current_labels[i] for i in np.flatnonzero(~has_baseline)]
+    missing_series = [labels for labels in baseline_labels if _series_key(labels) not in current_keys_set]
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Scored {len(current_labels)} series against {len(baseline_labels)} baseline series in {elapsed:.3f}s "
+        f"({time.perf_counter() - fetched:.3f}s after fetching)"
+    )
+    response = {
+        "query": query,
+        "window": window,
+        "baseline": f"{baseline} earlier",
+        "step": format_duration(step_seconds),
+        "series": len(current_labels),
+        "scored": int(scorable.sum()),
+        "top": [
+            {
+                "metric": current_labels[i],
+                "robust_z": round(float(z_scores[i]), 2),
+                "pct_change": _round(pct_change[i:i + 1], 1)[0],
+                "current": dict(zip(("median", "last", "max"), _round(np.array([current_median[i], current_last[i], current_max[i]])))),
+                "baseline": dict(zip(("median", "mad"), _round(np.array([baseline_median[i], mad[i]])))),
+            }
+            for i in top
+        ],
+        "new_series": {"count": len(new_series), "examples": new_series[:5]},
+        "missing_series": {"count": len(missing_series), "examples": missing_series[:5]},
+        "seconds": round(elapsed, 3),
+    }
+    notes = [r["cost_guard"] for r in (current_response, baseline_response) if "cost_guard" in r]
+    if notes:
+        response["cost_guard"] = notes[0]
+    return response
+
+
+# -- Change points around an alert -----------------------------------------
+
+# "$namespace" expands to a namespace regex; override with GOLDEN_SIGNALS_FILE (JSON name -> PromQL)
+DEFAULT_GOLDEN_SIGNALS = {
+    "cpu": 'sum by (namespace, pod) (rate(container_cpu_usage_seconds_total{namespace=~"$namespace", container!=""}[5m]))',
+    "memory": 'sum by (namespace, pod) (container_memory_working_set_bytes{namespace=~"$namespace", container!=""})',
+    "restarts": 'sum by (namespace, pod) (increase(kube_pod_container_status_restarts_total{namespace=~"$namespace"}[5m]))',
+    "error_rate": 'sum by (namespace, pod) (rate(http_requests_total{namespace=~"$namespace", code=~"5.."}[5m]))',
+    "latency_p99": 'histogram_quantile(0.99, sum by (namespace, pod, le) (rate(http_request_duration_seconds_bucket{namespace=~"$namespace"}[5m])))',
+}
+CHANGE_POINT_POINTS = 120
+# Changes further than this from the alert start weigh half as much (exponential decay)
+PROXIMITY_HALF_LIFE_SECONDS = 600
+# Changes after the alert started are more likely effects than causes
+AFTER_ALERT_WEIGHT = 0.3
+# Shift in pooled standard deviations; a straight ramp split in half scores ~3.5
+MIN_SHIFT_STRENGTH = 5.0
+# Without a namespace, the signals are scoped to those of the alerts active around the start
+MAX_ALERT_NAMESPACES = 3
+
+
+def load_golden_signals() -> Dict[str, str]:
+    """Return the golden signal queries, from GOLDEN_SIGNALS_FILE when set."""
+    path = os.environ.get("GOLDEN_SIGNALS_FILE")
+    if not path:
+        return dict(DEFAULT_GOLDEN_SIGNALS)
+    with open(path, encoding="utf-8") as f:
+        return {str(name): str(query) for name, query in json.load(f).items()}
+
+
+def detect_change_points(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Find the single strongest mean shift of every row at once.
+
+    The split is chosen with a CUSUM-style statistic: for every split k the
+    difference between the mean after and before k, scaled by
+    sqrt(k (n - k) / n), computed from cumulative sums for all rows and splits
+    in one pass. Its strength is the shift divided by the pooled standard
+    deviation of the two segments, so slow trends and seasonality (which
+    widen the segments) score low while level shifts score high.
+
+    Returns:
+        (split index, strength, mean before, mean after) per row; strength is NaN
+        for rows without enough data.
+    """
+    rows, n = matrix.shape
+    if n < 4:
+        empty = np.full(rows, np.nan)
+        return np.zeros(rows, dtype=int), empty, empty, empty
+    with np.errstate(all="ignore"):
+        # Gaps would read as shifts; fill them with the row median
+        filled = np.where(np.isfinite(matrix), matrix, np.nanmedian(matrix, axis=1)[:, None])
+        usable = np.isfinite(matrix).mean(axis=1) >= 0.5
+
+        cumulative = np.cumsum(filled, axis=1)
+        cumulative_sq = np.cumsum(filled * filled, axis=1)
+        k = np.arange(1, n)
+        before = cumulative[:, :-1] / k
+        after = (cumulative[:, -1:] - cumulative[:, :-1]) / (n - k)
+        split = np.argmax(np.abs(after - before) * np.sqrt(k * (n - k) / n), axis=1)
+
+        picked = np.arange(rows)
+        k_picked = k[split]
+        mean_before, mean_after = before[picked, split], after[picked, split]
+        var_before = cumulative_sq[picked, split] / k_picked - mean_before ** 2
+        var_after = (cumulative_sq[:, -1] - cumulative_sq[picked, split]) / (n - k_picked) - mean_after ** 2
+        pooled = np.sqrt(np.maximum((var_before * k_picked + var_after * (n - k_picked)) / n, 0))
+        level = np.abs(np.median(filled, axis=1))
+        pooled = np.maximum(pooled, np.maximum(level * MIN_RELATIVE_SPREAD, 1e-9))
+        strength = np.where(usable, np.abs(mean_after - mean_before) / pooled, np.nan)
+    return k_picked, strength, mean_before, mean_after
+
+
+def alert_namespaces(start_ts: float, end_ts: float, alert_ts: float) -> List[str]:
+    """Return the namespaces of alerts that became active in [start_ts, end_ts], closest to alert_ts first."""
+    closest: Dict[str, float] = {}
+    for alert in make_prometheus_request("alerts").get("alerts", []):
+        namespace = (alert.get("labels") or {}).get("namespace")
+        try:
+            active = parse_time(alert.get("activeAt") or "")
+        except ValueError:
+            continue
+        if namespace and start_ts <= active <= end_ts:
+            distance = abs(active - alert_ts)
+            closest[namespace] = min(distance, closest.get(namespace, distance))
+    return sorted(closest, key=lambda name: (closest[name], name))[:MAX_ALERT_NAMESPACES]
+
+
+def _fetch_signal(name: str, query: str, start: float, end: float, step: float) -> Tuple[str, Dict[str, Any], float, List[Dict[str, str]], np.ndarray]:
+    try:
+        return (name, *_fetch_window(query, start, end, step))
+    except Exception as e:
+        return name, {"error": f"{name} query failed: {e}"}, step, [], np.empty((0, 0))
+
+
+@tool(description="Rank candidate causes of an alert: scans golden-signal metrics (CPU, memory, restarts, error rate, p99 latency) in a window around the alert's startsAt/activeAt, detects the strongest level shift of every series and returns the series that shifted closest to, and preferably before, the alert start. Use right after get_alerts instead of querying each signal by hand. Pass the alert's namespace: without one, only the namespaces of alerts that became active in the window are scanned (at most 3), and the call fails if there are none, because scanning every namespace exceeds the PromQL series budget on large clusters.")
+async def correlate_change_points(
+    starts_at: str,
+    namespace: Optional[str] = None,
+    before: str = "1h",
+    after: str = "15m",
+    signals: Optional[List[str]] = None,
+    top_k: int = 10,
+) -> Dict[str, Any]:
+    """
+    Find which golden-signal series changed around an alert's start.
+
+    Args:
+        starts_at: Alert start (startsAt / activeAt from get_alerts, RFC3339 or Unix timestamp).
+        namespace: Namespace to scan. Defaults to the namespaces of the alerts active in the window.
+        before: How far before the alert start to look.
+        after: How far after the alert start to look.
+        signals: Signal names to scan (default: all configured signals).
+        top_k: Number of candidate series to return.
+
+    Returns:
+        Candidate causes ranked by shift strength weighted by proximity to the alert start.
+    """
+    logger.info(f"Correlating change points around {starts_at} (namespace {namespace or 'all'})")
+    started = time.perf_counter()
+    alert_ts = parse_time(starts_at)
+    start_ts, end_ts = alert_ts - parse_duration(before), alert_ts + parse_duration(after)
+    step = max(MIN_STEP_SECONDS, (end_ts - start_ts) / CHANGE_POINT_POINTS)
+    top_k = max(1, min(top_k, MAX_TOP_K))
+
+    configured = load_golden_signals()
+    selected = {name: configured[name] for name in (signals or configured) if name in configured}
+    unknown = sorted(set(signals or ()) - set(configured))
+    namespaces = [namespace] if namespace else alert_namespaces(start_ts, end_ts, alert_ts)
+    if not namespaces:
+        return {
+            "error": (
+                "No namespace given and no alert with a namespace became active in the window. "
+                "Pass the alert's namespace: every namespace at once exceeds the PromQL series budget on large clusters."
+            ),
+        }
+    # Namespaces are DNS labels, so they need no regex escaping
+    matcher = "|".join(namespaces)
+    with tracing.ContextThreadPoolExecutor(max_workers=max(1, len(selected))) as pool:
+        fetched = list(pool.map(
+            lambda item: _fetch_signal(item[0], Template(item[1]).safe_substitute(namespace=matcher), start_ts, end_ts, step),
+            selected.items(),
+        ))
+
+    candidates = []
+    errors = {}
+    scanned = 0
+    for name, response, signal_step, labels, matrix in fetched:
+        if "error" in response:
+            errors[name] = response["error"]
+            continue
+        if not labels:
+            continue
+        scanned += len(labels)
+        split, strength, mean_before, mean_after = detect_change_points(matrix)
+        change_ts = start_ts + (split - 0.5) * signal_step
+        lead = alert_ts - change_ts
+        proximity = np.exp2(-np.abs(lead) / PROXIMITY_HALF_LIFE_SECONDS) * np.where(lead >= -signal_step, 1.0, AFTER_ALERT_WEIGHT)
+        rank = strength * proximity
+        for i in np.flatnonzero(np.isfinite(strength) & (strength >= MIN_SHIFT_STRENGTH)):
+            candidates.append((float(rank[i]), name, i, labels, change_ts, lead, strength, mean_before, mean_after))
+
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    ranked = []
+    for rank, name, i, labels, change_ts, lead, strength, mean_before, mean_after in candidates[:top_k]:
+        before_value, after_value = float(mean_before[i]), float(mean_after[i])
+        ranked.append({
+            "signal": name,
+            "metric": labels[i],
+            "changed_at": datetime.fromtimestamp(float(change_ts[i]), tz=timezone.utc).isoformat(timespec="seconds"),
+            "lead_seconds": round(float(lead[i])),
+            "direction": "up" if after_value > before_value else "down",
+            "mean_before": round(before_value, 4),
+            "mean_after": round(after_value, 4),
+            "pct_change": round((after_value - before_value) / abs(before_value) * 100, 1) if before_value else None,
+            "strength": round(float(strength[i]), 1),
+            "score": round(rank, 2),
+        })
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Scanned {scanned} series from {len(selected)} signals in {elapsed:.3f}s, {len(candidates)} shifted")
+    response = {
+        "alert_start": datetime.fromtimestamp(alert_ts, tz=timezone.utc).isoformat(timespec="seconds"),
+        "window": {"before": before, "after": after, "step": format_duration(step)},
+        "namespaces": namespaces,
+        "signals": list(selected),
+        "series_scanned": scanned,
+        "shifted_series": len(candidates),
+        "candidates": ranked,
+        "seconds": round(elapsed, 3),
+    }
+    if errors:
+        response["errors"] = errors
+    if unknown:
+        response["unknown_signals"] = unknown
+        response["available_signals"] = sorted(configured)
+    return response
@@ -3,16 +3,19 @@
 
 import os
 import logging
-import requests
-from typing import Any, Dict, Optional
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from langchain_core.tools import tool
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+from telemetry import tracing
+from tools.http import pooled_session
+from tools.timeutil import parse_duration, parse_time
+
 logger = logging.getLogger(__name__)
 
 logger.info("Initializing ArgoCD Tools")
@@ -27,15 +30,20 @@ config = ArgoCDConfig(
     token=os.environ.get("ARGOCD_TOKEN", "")
 )
 
+session = pooled_session()
+
 def make_argocd_request(endpoint: str, method: str = "GET", json: Optional[dict] = None, params: Optional[dict] = None) -> Any:
     if not config.url or not config.token:
         raise ValueError("ArgoCD configuration missing. Set ARGOCD_URL and ARGOCD_TOKEN.")
     url = f"{config.url.rstrip('/')}/api/v1/{endpoint.lstrip('/')}"
     headers = {"Authorization": f"Bearer {config.token}"}
     logger.debug(f"Requesting {method} {url} params={params} json={json}")
-    resp = requests.request(method, url, headers=headers, params=params, json=json, timeout=30)
+    with tracing.span(f"argocd {method}", {"http.request.method": method, "url.full": url}) as http_span:
+        resp = session.request(method, url, headers=headers, params=params, json=json, timeout=30)
+        http_span.set_attribute("http.response.status_code", resp.status_code)
     resp.raise_for_status()
-    return resp.json()
+    with tracing.span("argocd json.parse", {"http.response.body.size": len(resp.content)}):
+        return resp.json()
 
 @tool(description="Lists all applications managed by ArgoCD, including name, status, project, namespace and sync information. Use to get an overview of the environment state and quickly identify applications with errors, outdated or out of compliance. Ideal for initial incident triage and impact analysis.")
 async def list_applications() -> Dict[str, Any]:
@@ -71,7 +79,9 @@ async def get_application_events(app_name: str) -> Dict[str, Any]:
 def get_pod_logs_stream(app_name, params):
     url = f"{config.url.rstrip('/')}/api/v1/applications/{app_name}/logs"
     headers = {"Authorization": f"Bearer {config.token}"}
-    with requests.get(url, headers=headers, params=params, stream=True, timeout=10) as resp:
+    with tracing.span("argocd GET", {"http.request.method": "GET", "url.full": url}) as http_span, \
+            session.get(url, headers=headers, params=params, stream=True, timeout=10) as resp:
+        http_span.set_attribute("http.response.status_code", resp.status_code)
         resp.raise_for_status()
         # Read only the first lines of the stream
         lines = []
@@ -81,3 +91,258 @@ def get_pod_logs_stream(app_name, params):
             if len(lines) >= params.get("tailLines", 100):
                 break
         return "\n".join(lines)
+
+
+# -- Deploy index ----------------------------------------------------------
+
+DEPLOY_INDEX_REFRESH_SECONDS = float(os.environ.get("DEPLOY_INDEX_REFRESH_SECONDS", 60))
+# Only the fields the index needs are requested when listing applications
+DEPLOY_INDEX_FIELDS = ",".join((
+    "items.metadata.name",
+    "items.spec.destination",
+    "items.status.history",
+    "items.status.operationState",
+))
+# A deploy this long before the alert scores half of one right at the alert
+DEPLOY_HALF_LIFE_SECONDS = 1800
+# Deploys after the alert started can only be follow-ups (rollbacks, fixes)
+AFTER_ALERT_WEIGHT = 0.2
+# Failed or still running syncs are more suspicious than clean ones
+UNFINISHED_SYNC_WEIGHT = 1.5
+MAX_DEPLOY_RESULTS = 50
+
+
+@dataclass
+class Deploy:
+    time: float
+    app: str
+    namespace: str
+    revision: str
+    phase: str = "Succeeded"
+    started_at: Optional[float] = None
+    message: str = ""
+    history_id: Optional[int] = None
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    try:
+        return parse_time(value) if value else None
+    except ValueError:
+        return None
+
+
+def _app_deploys(app: Dict[str, Any]) -> List[Deploy]:
+    name = app["metadata"]["name"]
+    namespace = ((app.get("spec") or {}).get("destination") or {}).get("namespace") or ""
+    status = app.get("status") or {}
+    deploys = []
+    for entry in status.get("history") or []:
+        deployed_at = _timestamp(entry.get("deployedAt"))
+        if deployed_at is not None:
+            deploys.append(Deploy(
+                time=deployed_at,
+                app=name,
+                namespace=namespace,
+                revision=str(entry.get("revision") or ""),
+                started_at=_timestamp(entry.get("deployStartedAt")),
+                history_id=entry.get("id"),
+            ))
+    # Failed and running syncs are only visible in the operation state
+    operation = status.get("operationState") or {}
+    if operation.get("phase") and operation["phase"] != "Succeeded":
+        started_at = _timestamp(operation.get("startedAt"))
+        at = _timestamp(operation.get("finishedAt")) or started_at
+        if at is not None:
+            deploys.append(Deploy(
+                time=at,
+                app=name,
+                namespace=namespace,
+                revision=str((operation.get("syncResult") or {}).get("revision") or (operation.get("operation") or {}).get("sync", {}).get("revision") or ""),
+                phase=operation["phase"],
+                started_at=started_at,
+                message=operation.get("message") or "",
+            ))
+    return deploys
+
+
+def _app_version(app: Dict[str, Any]) -> str:
+    """Return what the deploys of `app` are derived from.
+
+    resourceVersion is no use here: ArgoCD bumps it on every reconcile
+    (`status.reconciledAt`), so it would mark nearly every app as changed.
+    """
+    status = app.get("status") or {}
+    history = status.get("history") or [{}]
+    operation = status.get("operationState") or {}
+    namespace = ((app.get("spec") or {}).get("destination") or {}).get("namespace") or ""
+    return ":".join(str(v) for v in (
+        history[-1].get("id"), operation.get("phase"), operation.get("startedAt"), operation.get("finishedAt"), namespace,
+    ))
+
+
+class DeployIndex:
+    """Time-sorted index of the deploys of every ArgoCD application.
+
+    Built from `status.history` and `status.operationState`. Refreshes re-list
+    the applications with only the needed fields and re-parse just the ones
+    whose last history entry or operation state changed. Like the metric catalog, a stale index is
+    refreshed in the background while lookups keep using the old one.
+    """
+
+    def __init__(self, refresh_seconds: float = DEPLOY_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at = 0.0
+        self._apps: Dict[str, Tuple[str, List[Deploy]]] = {}
+        # namespace ("" for all) -> (sorted times, deploys in the same order)
+        self._by_namespace: Dict[str, Tuple[List[float], List[Deploy]]] = {}
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_namespace.get("", ((), ()))[1])
+
+    @property
+    def applications(self) -> int:
+        return len(self._apps)
+
+    def refresh(self) -> None:
+        """Re-list the applications and re-index the ones that changed."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            start = time.time()
+            items = make_argocd_request("applications", params={"fields": DEPLOY_INDEX_FIELDS}).get("items") or []
+            apps: Dict[str, Tuple[str, List[Deploy]]] = {}
+            changed = 0
+            for app in items:
+                name = app["metadata"]["name"]
+                version = _app_version(app)
+                known = self._apps.get(name)
+                if known is not None and known[0] == version:
+                    apps[name] = known
+                else:
+                    apps[name] = (version, _app_deploys(app))
+                    changed += 1
+            if changed or len(apps) != len(self._apps) or not self.loaded_at:
+                deploys = sorted((d for _, app_deploys in apps.values() for d in app_deploys), key=lambda d: d.time)
+                by_namespace: Dict[str, Tuple[List[float], List[Deploy]]] = {"": ([d.time for d in deploys], deploys)}
+                for deploy in deploys:
+                    times, ordered = by_namespace.setdefault(deploy.namespace, ([], []))
+                    times.append(deploy.time)
+                    ordered.append(deploy)
+            else:
+                by_namespace = self._by_namespace
+            with self._lock:
+                self._apps, self._by_namespace = apps, by_namespace
+                self.loaded_at = time.time()
+            logger.info(f"Deploy index refreshed: {len(items)} applications ({changed} changed) in {time.time() - start:.2f}s")
+        finally:
+            self._refreshing.release()
+
+    def ensure_fresh(self) -> None:
+        """Load the index if empty; refresh it in the background if stale."""
+        if not self.loaded_at:
+            self.refresh()
+            if not self.loaded_at:
+                # Another thread is doing the first load
+                with self._refreshing:
+                    pass
+        elif time.time() - self.loaded_at > self.refresh_seconds:
+            threading.Thread(target=self._refresh_quietly, name="deploy-index-refresh", daemon=True).start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Deploy index refresh failed, keeping the previous index: {e}")
+
+    def between(self, start: float, end: float, namespace: Optional[str] = None) -> List[Deploy]:
+        """Deploys in [start, end], oldest first, optionally of one destination namespace."""
+        with self._lock:
+            times, deploys = self._by_namespace.get(namespace or "", ([], []))
+        return deploys[bisect_left(times, start):bisect_right(times, end)]
+
+    def latest_applications(self, namespace: Optional[str] = None, limit: int = 20) -> List[str]:
+        """Names of the applications deployed most recently, newest first."""
+        with self._lock:
+            _, deploys = self._by_namespace.get(namespace or "", ([], []))
+        names: Dict[str, None] = {}
+        for deploy in reversed(deploys):
+            names.setdefault(deploy.app)
+            if len(names) >= limit:
+                break
+        return list(names)
+
+
+deploy_index = DeployIndex()
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(timespec="seconds") if ts is not None else None
+
+
+@tool(description="Find the ArgoCD deploys most likely related to an alert: looks up every application's sync history and failed/running syncs around the alert start (optionally only those deploying to one namespace) and ranks them by how shortly before the alert they happened. Answers from a cached index in milliseconds; use it first when checking whether an incident followed a deploy.")
+async def correlate_deploys(
+    alert_time: str,
+    namespace: Optional[str] = None,
+    before: str = "6h",
+    after: str = "15m",
+    top_k: int = 10,
+) -> Dict[str, Any]:
+    """
+    Rank recent deploys by their likely relation to an alert.
+
+    Args:
+        alert_time: Alert start (startsAt / activeAt, RFC3339 or Unix timestamp).
+        namespace: Only consider applications deploying to this namespace.
+        before: How far before the alert to look.
+        after: How far after the alert to look.
+        top_k: Number of deploys to return.
+
+    Returns:
+        A dictionary with the ranked `deploys` (app, revision, time and delta to
+        the alert) and the size and age of the index.
+    """
+    logger.info(f"Correlating deploys with alert at {alert_time} (namespace {namespace or 'all'})")
+    alert_ts = parse_time(alert_time)
+    try:
+        deploy_index.ensure_fresh()
+    except Exception as e:
+        logger.error(f"Could not load the deploy index: {e}")
+        return {"error": f"Could not load ArgoCD applications: {e}"}
+
+    candidates = deploy_index.between(alert_ts - parse_duration(before), alert_ts + parse_duration(after), namespace)
+    ranked = []
+    for deploy in candidates:
+        lead = alert_ts - deploy.time
+        score = math.exp2(-abs(lead) / DEPLOY_HALF_LIFE_SECONDS) * (1.0 if lead >= 0 else AFTER_ALERT_WEIGHT)
+        if deploy.phase != "Succeeded":
+            score *= UNFINISHED_SYNC_WEIGHT
+        ranked.append((score, deploy))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    return {
+        "alert_time": _iso(alert_ts),
+        "namespace": namespace or "all",
+        "deploys": [
+            {
+                "app": deploy.app,
+                "namespace": deploy.namespace,
+                "revision": deploy.revision,
+                "deployed_at": _iso(deploy.time),
+                "started_at": _iso(deploy.started_at),
+                "seconds_before_alert": round(alert_ts - deploy.time),
+                "phase": deploy.phase,
+                "message": deploy.message,
+                "history_id": deploy.history_id,
+                "score": round(score, 3),
+            }
+            for score, deploy in ranked[:max(1, min(top_k, MAX_DEPLOY_RESULTS))]
+        ],
+        "candidates": len(candidates),
+        "index": {
+            "applications": deploy_index.applications,
+            "deploys": len(deploy_index),
+            "age_seconds": round(time.time() - deploy_index.loaded_at, 1),
+        },
+    }
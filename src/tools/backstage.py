@@ -2,21 +2,15 @@
 
 import os
 import logging
-import requests
-import dotenv
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 from langchain_core.tools import tool
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+from telemetry import tracing
+from tools.http import pooled_session
+
 logger = logging.getLogger(__name__)
 
-dotenv.load_dotenv()
 logger.info("Initializing Backstage MCP Server")
 
 @dataclass
@@ -27,15 +21,20 @@ config = BackstageConfig(
     url=os.environ.get("BACKSTAGE_BASE_URL", "http://localhost:7007")
 )
 
+session = pooled_session()
+
 def backstage_request(endpoint: str, params: Optional[Dict[str, str]] = None) -> Any:
     """Make a request to the Backstage catalog API."""
     if not config.url:
         raise ValueError("Backstage catalog URL is not set.")
     url = f"{config.url.rstrip('/')}/{endpoint.lstrip('/')}"
     logger.debug(f"Requesting Backstage endpoint: {url}")
-    resp = requests.get(url, params=params)
+    with tracing.span("backstage GET", {"http.request.method": "GET", "url.full": url}) as http_span:
+        resp = session.get(url, params=params)
+        http_span.set_attribute("http.response.status_code", resp.status_code)
     resp.raise_for_status()
-    return resp.json()
+    with tracing.span("backstage json.parse", {"http.response.body.size": len(resp.content)}):
+        return resp.json()
 
 @tool(description="List all entities of a given kind and optional type (e.g., teams, lines, services, users, systems). Use this tool when you don't have context or are unsure about specific entity names.")
 async def list_entities(kind: str, type: Optional[str] = None) -> List[Dict[str, Any]]:
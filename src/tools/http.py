@@ -0,0 +1,39 @@
+"""Keep-alive HTTP sessions for the Prometheus, ArgoCD and Backstage clients.
+
+Each backend gets one module-level session, so calls reuse pooled TCP (and
+TLS) connections instead of opening a new one per request. The pool is sized
+for concurrent tool calls: requests beyond `HTTP_POOL_SIZE` per host still
+work but their connections are closed afterwards.
+
+When a cassette is installed (telemetry.cassette), requests are recorded to
+or replayed from it.
+"""
+
+import os
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from telemetry import cassette
+
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 32))
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter going through the active cassette, if any."""
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        tape = cassette.active
+        if tape is None:
+            return super().send(request, **kwargs)
+        return tape.send_requests(self, request, partial(super().send, request, **kwargs))
+
+
+def pooled_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """Return a session keeping up to `pool_size` connections per host alive."""
+    session = requests.Session()
+    adapter = PooledAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
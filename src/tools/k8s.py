@@ -1,49 +1,294 @@
 #!/usr/bin/env python
 
-import os
-import logging
-import subprocess
 import json
-from typing import Any, Dict, List, Optional
+import logging
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+import numpy as np
 from langchain_core.tools import tool
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+from telemetry import cassette, tracing
+from tools.timeutil import parse_duration
+
 logger = logging.getLogger(__name__)
 
 logger.info("Initializing Kubernetes Tools")
 
-# Initialize Kubernetes client
-try:
-    # Try to load in-cluster config first
-    config.load_incluster_config()
-    logger.info("Using in-cluster Kubernetes configuration")
-except:
+DEFAULT_KUBE_CONTEXT = "kind-agent-cluster"
+IN_CLUSTER = "in-cluster"
+# Comma-separated kubeconfig contexts (or "in-cluster"); the first one is the default cluster
+KUBE_CONTEXTS = [c.strip() for c in os.environ.get("KUBE_CONTEXTS", "").split(",") if c.strip()]
+ALL_CLUSTERS = "all"
+
+# list_pods, list_nodes and get_events read the raw JSON instead of building client models
+K8S_FAST_PATH = os.environ.get("K8S_FAST_PATH", "true").lower() != "false"
+# Items per list request on the fast path; only one page is decoded at a time
+K8S_LIST_PAGE_SIZE = int(os.environ.get("K8S_LIST_PAGE_SIZE", 500))
+
+CLUSTER_ARG_HELP = " Pass cluster to target a configured cluster (default: the first one) or 'all' to query every cluster concurrently."
+
+
+class TracedApiClient(client.ApiClient):
+    """ApiClient that traces the HTTP round trip and the model deserialization separately.
+
+    Requests go through the active cassette (telemetry.cassette), if any.
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        with tracing.span(f"k8s {method}", {"http.request.method": method, "url.path": urlsplit(url).path}) as http_span:
+            tape = cassette.active
+            if tape is None:
+                response = super().request(method, url, *args, **kwargs)
+            else:
+                response = tape.send_kubernetes(super().request, method, url, *args, **kwargs)
+            http_span.set_attribute("http.response.status_code", response.status)
+            return response
+
+    def deserialize(self, response, response_type):
+        with tracing.span("k8s deserialize", {"k8s.response_type": str(response_type), "http.response.body.size": len(response.data or b"")}):
+            return super().deserialize(response, response_type)
+
+
+def _load_configuration(context: str, fallback_in_cluster: bool) -> client.Configuration:
+    configuration = client.Configuration()
+    if context == IN_CLUSTER or fallback_in_cluster:
+        try:
+            # Try to load in-cluster config first
+            config.load_incluster_config(client_configuration=configuration)
+            logger.info("Using in-cluster Kubernetes configuration")
+            return configuration
+        except config.ConfigException:
+            if context == IN_CLUSTER:
+                raise
     try:
         # Fall back to kubeconfig
-        config.load_kube_config(context="kind-agent-cluster")
-        logger.info("Using kubeconfig for kind-agent-cluster context")
+        config.load_kube_config(context=context, client_configuration=configuration)
+        logger.info(f"Using kubeconfig for {context} context")
     except Exception as e:
-        logger.warning(f"Could not load Kubernetes config: {e}")
+        logger.warning(f"Could not load Kubernetes config for {context}: {e}")
+    return configuration
 
-# Initialize API clients
-v1 = client.CoreV1Api()
-apps_v1 = client.AppsV1Api()
 
-@tool(description="Lists all pods in a namespace with their status, restart count, and resource usage. Essential for incident triage and identifying problematic pods. Use 'all' for namespace to get cluster-wide view.")
-async def list_pods(namespace: str = "default") -> Dict[str, Any]:
-    """List pods in a namespace or all namespaces."""
-    logger.info(f"Listing pods in namespace: {namespace}")
+class ClusterRegistry:
+    """Known clusters and their API clients.
+
+    Each cluster gets one ApiClient, created on first use and shared by every
+    tool call, so its urllib3 connection pool is reused across calls.
+    """
+
+    def __init__(self, contexts: List[str]):
+        # Without KUBE_CONTEXTS keep the single-cluster behaviour: in-cluster first, then the kind context
+        self._legacy = not contexts
+        self.names = list(contexts or [DEFAULT_KUBE_CONTEXT])
+        self._clients: Dict[str, client.ApiClient] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def default(self) -> str:
+        return self.names[0]
+
+    def select(self, cluster: Optional[str]) -> List[str]:
+        """Resolve a `cluster` tool argument to cluster names; raises ValueError if unknown."""
+        if not cluster:
+            return [self.default]
+        if cluster == ALL_CLUSTERS:
+            return list(self.names)
+        if cluster not in self.names:
+            raise ValueError(f"Unknown cluster {cluster!r}. Configured clusters: {', '.join(self.names)}")
+        return [cluster]
+
+    def api_client(self, cluster: Optional[str] = None) -> client.ApiClient:
+        """Return the shared API client of `cluster`, loading its configuration on first use."""
+        name = cluster or self.default
+        with self._lock:
+            api_client = self._clients.get(name)
+            if api_client is None:
+                if name not in self.names:
+                    raise ValueError(f"Unknown cluster {name!r}")
+                api_client = TracedApiClient(_load_configuration(name, fallback_in_cluster=self._legacy))
+                self._clients[name] = api_client
+            return api_client
+
+    def add(self, name: str, api_client: client.ApiClient) -> None:
+        """Register a cluster with a ready-made API client."""
+        with self._lock:
+            if name not in self.names:
+                self.names.append(name)
+            self._clients[name] = api_client
+
+
+clusters = ClusterRegistry(KUBE_CONTEXTS)
+
+
+def _core_v1(cluster: Optional[str] = None) -> client.CoreV1Api:
+    return client.CoreV1Api(clusters.api_client(cluster))
+
+
+def _apps_v1(cluster: Optional[str] = None) -> client.AppsV1Api:
+    return client.AppsV1Api(clusters.api_client(cluster))
+
+
+def _fan_out(cluster: Optional[str], fetch: Callable[..., Dict[str, Any]], key: Optional[str], *args: Any,
+             sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None, reverse: bool = False) -> Dict[str, Any]:
+    """Run `fetch(cluster_name, *args)` on the selected clusters.
+
+    A single cluster returns `fetch`'s result unchanged. With 'all' the clusters
+    are queried concurrently and the items under `key` (or, without a key, the
+    whole per-cluster results) are merged and tagged with their cluster; a
+    failing cluster is reported under `errors` instead of failing the call.
+    """
     try:
+        names = clusters.select(cluster)
+    except ValueError as e:
+        return {"error": str(e)}
+    if cluster != ALL_CLUSTERS:
+        return fetch(names[0], *args)
+
+    def run(name: str) -> Dict[str, Any]:
+        try:
+            return fetch(name, *args)
+        except Exception as e:
+            logger.error(f"Cluster {name} failed: {e}")
+            return {"error": str(e)}
+
+    with tracing.ContextThreadPoolExecutor(max_workers=len(names)) as pool:
+        results = dict(zip(names, pool.map(run, names)))
+
+    merged: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    for name, result in results.items():
+        if "error" in result:
+            errors[name] = result["error"]
+        elif key:
+            merged.extend({**item, "cluster": name} for item in result.get(key, []))
+        else:
+            merged.append({**result, "cluster": name})
+    if sort_key:
+        merged.sort(key=sort_key, reverse=reverse)
+    return {key or "results": merged, "count": len(merged), "clusters": names, "errors": errors}
+
+
+def _event_sort_key(ev: Dict[str, Any]) -> str:
+    # Sort by last_timestamp with safe fallback
+    return ev.get("last_timestamp") or ev.get("first_timestamp") or ""
+
+
+def _list_raw(list_call: Callable[..., Any], limit: Optional[int] = None, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a list call as plain JSON dicts, page by page.
+
+    The response body is read with `_preload_content=False` and decoded with
+    `json` directly, skipping the generated model classes. Pages of
+    K8S_LIST_PAGE_SIZE items are requested with `limit`/`continue`, so only
+    one page of raw objects is alive while the caller projects them.
+    """
+    token = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = K8S_LIST_PAGE_SIZE if remaining is None else min(K8S_LIST_PAGE_SIZE, remaining)
+        response = list_call(limit=page_size, _continue=token, _preload_content=False, **kwargs)
+        try:
+            body = response.data
+        finally:
+            response.release_conn()
+        with tracing.span("k8s json.parse", {"http.response.body.size": len(body)}):
+            page = json.loads(body)
+        del body
+        items = page.get("items") or []
+        yield from items
+        if remaining is not None:
+            remaining -= len(items)
+        token = (page.get("metadata") or {}).get("continue")
+        if not token:
+            return
+
+
+def iter_events(namespace: str = "all", cluster: Optional[str] = None,
+                field_selector: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield every event of `namespace` (or 'all') in one cluster as raw JSON dicts, page by page.
+
+    The API returns events in storage order, not by time, so callers after
+    the newest events have to read every page.
+    """
+    core = _core_v1(cluster)
+    call = core.list_event_for_all_namespaces if namespace == "all" else partial(core.list_namespaced_event, namespace)
+    return _list_raw(call, field_selector=field_selector)
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    # Same value the client models hold, so both paths render timestamps alike
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def _raw_pod_info(pod: Dict[str, Any]) -> Dict[str, Any]:
+    metadata, spec, status = pod.get("metadata") or {}, pod.get("spec") or {}, pod.get("status") or {}
+    container_statuses = status.get("containerStatuses") or []
+    return {
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "status": status.get("phase"),
+        "ready": f"{sum(1 for c in container_statuses if c.get('ready'))}/{len(spec.get('containers') or [])}",
+        "restarts": sum(c.get("restartCount") or 0 for c in container_statuses),
+        "age": str(_timestamp(metadata.get("creationTimestamp"))),
+        "node": spec.get("nodeName"),
+    }
+
+
+def _raw_event_info(event: Dict[str, Any]) -> Dict[str, Any]:
+    metadata = event.get("metadata") or {}
+    involved = event.get("involvedObject")
+    return {
+        "namespace": metadata.get("namespace"),
+        "type": event.get("type"),
+        "reason": event.get("reason"),
+        "object": f"{involved.get('kind')}/{involved.get('name')}" if involved else None,
+        "message": event.get("message"),
+        "count": event.get("count"),
+        "first_timestamp": str(_timestamp(event.get("firstTimestamp"))),
+        "last_timestamp": str(_timestamp(event.get("lastTimestamp"))),
+    }
+
+
+def _raw_node_info(node: Dict[str, Any]) -> Dict[str, Any]:
+    metadata, status = node.get("metadata") or {}, node.get("status") or {}
+    conditions = {c.get("type"): c.get("status") for c in status.get("conditions") or []}
+    capacity, allocatable = status.get("capacity") or {}, status.get("allocatable") or {}
+    node_info = status.get("nodeInfo") or {}
+    return {
+        "name": metadata.get("name"),
+        "status": "Ready" if conditions.get("Ready") == "True" else "NotReady",
+        "roles": ",".join(
+            label.split("/")[-1] for label in metadata.get("labels") or {}
+            if "node-role.kubernetes.io" in label
+        ) or "worker",
+        "version": node_info.get("kubeletVersion"),
+        "os": node_info.get("operatingSystem"),
+        "capacity": {"cpu": capacity.get("cpu"), "memory": capacity.get("memory"), "pods": capacity.get("pods")},
+        "allocatable": {"cpu": allocatable.get("cpu"), "memory": allocatable.get("memory"), "pods": allocatable.get("pods")},
+        "conditions": conditions,
+    }
+
+
+def _list_pods(cluster: str, namespace: str = "default") -> Dict[str, Any]:
+    logger.info(f"Listing pods in namespace: {namespace} (cluster {cluster})")
+    try:
+        if K8S_FAST_PATH:
+            core = _core_v1(cluster)
+            call = core.list_pod_for_all_namespaces if namespace == "all" else partial(core.list_namespaced_pod, namespace)
+            pod_list = [_raw_pod_info(pod) for pod in _list_raw(call)]
+            return {"pods": pod_list, "count": len(pod_list)}
+
         if namespace == "all":
-            pods = v1.list_pod_for_all_namespaces(watch=False)
+            pods = _core_v1(cluster).list_pod_for_all_namespaces(watch=False)
         else:
-            pods = v1.list_namespaced_pod(namespace, watch=False)
+            pods = _core_v1(cluster).list_namespaced_pod(namespace, watch=False)
         
         pod_list = []
         for pod in pods.items:
@@ -63,12 +308,15 @@ async def list_pods(namespace: str = "default") -> Dict[str, Any]:
         logger.error(f"Error listing pods: {e}")
         return {"error": str(e), "pods": []}
 
-@tool(description="Gets basic information about a pod including status, containers and restart count. Returns empty if pod not found.")
-async def describe_pod(pod_name: str, namespace: str = "default") -> Dict[str, Any]:
-    """Get basic pod information."""
-    logger.info(f"Describing pod {pod_name} in namespace {namespace}")
+@tool(description="Lists all pods in a namespace with their status, restart count, and resource usage. Essential for incident triage and identifying problematic pods. Use 'all' for namespace to get cluster-wide view." + CLUSTER_ARG_HELP)
+async def list_pods(namespace: str = "default", cluster: Optional[str] = None) -> Dict[str, Any]:
+    """List pods in a namespace or all namespaces."""
+    return _fan_out(cluster, _list_pods, "pods", namespace)
+
+def _describe_pod(cluster: str, pod_name: str, namespace: str = "default") -> Dict[str, Any]:
+    logger.info(f"Describing pod {pod_name} in namespace {namespace} (cluster {cluster})")
     try:
-        pod = v1.read_namespaced_pod(pod_name, namespace)
+        pod = _core_v1(cluster).read_namespaced_pod(pod_name, namespace)
         
         # Basic pod info only
         pod_details = {
@@ -108,18 +356,22 @@ async def describe_pod(pod_name: str, namespace: str = "default") -> Dict[str, A
         logger.error(f"Error describing pod: {e}")
         return {"error": f"API error: {e.status} - {e.reason}", "found": False}
 
-@tool(description="Gets the logs from a pod container. Essential for debugging application issues and understanding failure reasons. Supports tail lines and previous container logs.")
-async def get_pod_logs(
+@tool(description="Gets basic information about a pod including status, containers and restart count. Returns empty if pod not found." + CLUSTER_ARG_HELP)
+async def describe_pod(pod_name: str, namespace: str = "default", cluster: Optional[str] = None) -> Dict[str, Any]:
+    """Get basic pod information."""
+    return _fan_out(cluster, _describe_pod, None, pod_name, namespace)
+
+def _get_pod_logs(
+    cluster: str,
     pod_name: str,
     namespace: str = "default",
     container: Optional[str] = None,
     tail_lines: int = 100,
     previous: bool = False
 ) -> Dict[str, Any]:
-    """Get pod logs."""
-    logger.info(f"Getting logs for pod {pod_name} in namespace {namespace}")
+    logger.info(f"Getting logs for pod {pod_name} in namespace {namespace} (cluster {cluster})")
     try:
-        logs = v1.read_namespaced_pod_log(
+        logs = _core_v1(cluster).read_namespaced_pod_log(
             name=pod_name,
             namespace=namespace,
             container=container,
@@ -138,15 +390,25 @@ async def get_pod_logs(
         logger.error(f"Error getting pod logs: {e}")
         return {"error": str(e), "logs": ""}
 
-@tool(description="Lists all deployments in a namespace with replica status and update strategy. Useful for understanding application topology and identifying deployment issues.")
-async def list_deployments(namespace: str = "default") -> Dict[str, Any]:
-    """List deployments in a namespace."""
-    logger.info(f"Listing deployments in namespace: {namespace}")
+@tool(description="Gets the logs from a pod container. Essential for debugging application issues and understanding failure reasons. Supports tail lines and previous container logs." + CLUSTER_ARG_HELP)
+async def get_pod_logs(
+    pod_name: str,
+    namespace: str = "default",
+    container: Optional[str] = None,
+    tail_lines: int = 100,
+    previous: bool = False,
+    cluster: Optional[str] = None
+) -> Dict[str, Any]:
+    """Get pod logs."""
+    return _fan_out(cluster, _get_pod_logs, None, pod_name, namespace, container, tail_lines, previous)
+
+def _list_deployments(cluster: str, namespace: str = "default") -> Dict[str, Any]:
+    logger.info(f"Listing deployments in namespace: {namespace} (cluster {cluster})")
     try:
         if namespace == "all":
-            deployments = apps_v1.list_deployment_for_all_namespaces(watch=False)
+            deployments = _apps_v1(cluster).list_deployment_for_all_namespaces(watch=False)
         else:
-            deployments = apps_v1.list_namespaced_deployment(namespace, watch=False)
+            deployments = _apps_v1(cluster).list_namespaced_deployment(namespace, watch=False)
         
         deployment_list = []
         for dep in deployments.items:
@@ -166,12 +428,15 @@ async def list_deployments(namespace: str = "default") -> Dict[str, Any]:
         logger.error(f"Error listing deployments: {e}")
         return {"error": str(e), "deployments": []}
 
-@tool(description="Gets detailed information about a specific deployment including replicas, conditions, and rollout status. Critical for understanding deployment failures and rollout issues.")
-async def describe_deployment(deployment_name: str, namespace: str = "default") -> Dict[str, Any]:
-    """Get detailed deployment information."""
-    logger.info(f"Describing deployment {deployment_name} in namespace {namespace}")
+@tool(description="Lists all deployments in a namespace with replica status and update strategy. Useful for understanding application topology and identifying deployment issues." + CLUSTER_ARG_HELP)
+async def list_deployments(namespace: str = "default", cluster: Optional[str] = None) -> Dict[str, Any]:
+    """List deployments in a namespace."""
+    return _fan_out(cluster, _list_deployments, "deployments", namespace)
+
+def _describe_deployment(cluster: str, deployment_name: str, namespace: str = "default") -> Dict[str, Any]:
+    logger.info(f"Describing deployment {deployment_name} in namespace {namespace} (cluster {cluster})")
     try:
-        deployment = apps_v1.read_namespaced_deployment(deployment_name, namespace)
+        deployment = _apps_v1(cluster).read_namespaced_deployment(deployment_name, namespace)
         
         deployment_details = {
             "name": deployment.metadata.name,
@@ -212,15 +477,208 @@ async def describe_deployment(deployment_name: str, namespace: str = "default")
         logger.error(f"Error describing deployment: {e}")
         return {"error": str(e)}
 
-@tool(description="Lists all services in a namespace with their type, cluster IP, and endpoints. Essential for understanding service discovery and networking issues.")
-async def list_services(namespace: str = "default") -> Dict[str, Any]:
-    """List services in a namespace."""
-    logger.info(f"Listing services in namespace: {namespace}")
+@tool(description="Gets detailed information about a specific deployment including replicas, conditions, and rollout status. Critical for understanding deployment failures and rollout issues." + CLUSTER_ARG_HELP)
+async def describe_deployment(deployment_name: str, namespace: str = "default", cluster: Optional[str] = None) -> Dict[str, Any]:
+    """Get detailed deployment information."""
+    return _fan_out(cluster, _describe_deployment, None, deployment_name, namespace)
+
+
+# -- Batched describe ------------------------------------------------------
+
+# Up to this many names are fetched with concurrent GETs, more with one LIST
+DESCRIBE_GET_THRESHOLD = 20
+MAX_CONCURRENT_GETS = 8
+MAX_GROUP_MEMBERS = 20
+
+
+def _read_raw(read_call: Callable[..., Any], name: str, namespace: str) -> Dict[str, Any]:
+    response = read_call(name, namespace, _preload_content=False)
+    try:
+        return json.loads(response.data)
+    finally:
+        response.release_conn()
+
+
+def _fetch_many(read_call: Callable[..., Any], list_call: Callable[..., Any], namespace: str,
+                names: Optional[List[str]], label_selector: Optional[str]) -> Dict[str, Any]:
+    """Fetch objects by name and/or label selector in as few round trips as possible.
+
+    Returns:
+        {"items": raw objects, "not_found": names, "errors": {name: message}}
+    """
+    wanted = list(dict.fromkeys(names or []))
+    if label_selector or len(wanted) > DESCRIBE_GET_THRESHOLD:
+        items = list(_list_raw(partial(list_call, namespace), label_selector=label_selector))
+        if wanted:
+            found = {(item.get("metadata") or {}).get("name"): item for item in items}
+            items = [found[name] for name in wanted if name in found]
+            return {"items": items, "not_found": [name for name in wanted if name not in found], "errors": {}}
+        return {"items": items, "not_found": [], "errors": {}}
+
+    def get(name: str) -> Any:
+        try:
+            return _read_raw(read_call, name, namespace)
+        except ApiException as e:
+            return e
+
+    with tracing.ContextThreadPoolExecutor(max_workers=max(1, min(MAX_CONCURRENT_GETS, len(wanted)))) as pool:
+        results = dict(zip(wanted, pool.map(get, wanted)))
+    return {
+        "items": [r for r in results.values() if not isinstance(r, ApiException)],
+        "not_found": [name for name, r in results.items() if isinstance(r, ApiException) and r.status == 404],
+        "errors": {
+            name: f"API error: {r.status} - {r.reason}"
+            for name, r in results.items() if isinstance(r, ApiException) and r.status != 404
+        },
+    }
+
+
+def _container_state(state: Optional[Dict[str, Any]]) -> str:
+    state = state or {}
+    if "running" in state:
+        return "running"
+    if "terminated" in state:
+        return f"terminated ({(state['terminated'] or {}).get('reason')})"
+    if "waiting" in state:
+        return f"waiting ({(state['waiting'] or {}).get('reason')})"
+    return "unknown"
+
+
+def _group(rows: List[Dict[str, Any]], signature_keys: Sequence[str], member_key: str) -> List[Dict[str, Any]]:
+    """Collapse rows sharing the same signature into one group, largest groups first."""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        signature = {key: row[key] for key in signature_keys}
+        group = groups.setdefault(json.dumps(signature, sort_keys=True), {**signature, "count": 0, member_key: []})
+        group["count"] += 1
+        if len(group[member_key]) < MAX_GROUP_MEMBERS:
+            group[member_key].append(row["name"])
+        for key, value in row.items():
+            if key == "name" or key in signature_keys:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                group[key] = group.get(key, 0) + value
+                continue
+            values = group.setdefault(key, [])
+            for item in value if isinstance(value, list) else [value]:
+                if item is not None and item not in values and len(values) < MAX_GROUP_MEMBERS:
+                    values.append(item)
+    return sorted(groups.values(), key=lambda g: -g["count"])
+
+
+def _describe_pods(cluster: str, namespace: str = "default", pod_names: Optional[List[str]] = None,
+                   label_selector: Optional[str] = None) -> Dict[str, Any]:
+    logger.info(f"Describing pods {pod_names or label_selector} in namespace {namespace} (cluster {cluster})")
+    if not pod_names and not label_selector:
+        return {"error": "Pass pod_names or label_selector"}
+    core = _core_v1(cluster)
+    try:
+        fetched = _fetch_many(core.read_namespaced_pod, core.list_namespaced_pod, namespace, pod_names, label_selector)
+    except ApiException as e:
+        logger.error(f"Error describing pods: {e}")
+        return {"error": f"API error: {e.status} - {e.reason}"}
+
+    rows = []
+    for pod in fetched["items"]:
+        spec, status = pod.get("spec") or {}, pod.get("status") or {}
+        containers = []
+        restarts = 0
+        for c in status.get("containerStatuses") or []:
+            last = (c.get("lastState") or {}).get("terminated") or {}
+            containers.append({
+                "name": c.get("name"),
+                "ready": c.get("ready"),
+                "state": _container_state(c.get("state")),
+                "last_termination": f"{last.get('reason')} (exit {last.get('exitCode')})" if last else None,
+            })
+            restarts += c.get("restartCount") or 0
+        rows.append({
+            "name": (pod.get("metadata") or {}).get("name"),
+            "phase": status.get("phase"),
+            "reason": status.get("reason"),
+            "containers": containers,
+            "restarts": restarts,
+            "nodes": spec.get("nodeName"),
+            "images": [c.get("image") for c in spec.get("containers") or []],
+        })
+    return {
+        "namespace": namespace,
+        "count": len(rows),
+        "groups": _group(rows, ("phase", "reason", "containers"), "pods"),
+        "not_found": fetched["not_found"],
+        "errors": fetched["errors"],
+    }
+
+
+@tool(description="Describes many pods in one call, selected by a list of names and/or a label selector (e.g. 'app=checkout'). Pods with identical phase, container states and last termination reasons are grouped together, so 15 crash-looping pods come back as one group with their names, total restarts, nodes and images; missing pods are listed separately. Prefer it over calling describe_pod repeatedly." + CLUSTER_ARG_HELP)
+async def describe_pods(
+    namespace: str = "default",
+    pod_names: Optional[List[str]] = None,
+    label_selector: Optional[str] = None,
+    cluster: Optional[str] = None
+) -> Dict[str, Any]:
+    """Describe a batch of pods, grouped by identical status."""
+    return _fan_out(cluster, _describe_pods, None, namespace, pod_names, label_selector)
+
+
+def _describe_deployments(cluster: str, namespace: str = "default", deployment_names: Optional[List[str]] = None,
+                          label_selector: Optional[str] = None) -> Dict[str, Any]:
+    logger.info(f"Describing deployments {deployment_names or label_selector} in namespace {namespace} (cluster {cluster})")
+    if not deployment_names and not label_selector:
+        return {"error": "Pass deployment_names or label_selector"}
+    apps = _apps_v1(cluster)
+    try:
+        fetched = _fetch_many(apps.read_namespaced_deployment, apps.list_namespaced_deployment, namespace, deployment_names, label_selector)
+    except ApiException as e:
+        logger.error(f"Error describing deployments: {e}")
+        return {"error": f"API error: {e.status} - {e.reason}"}
+
+    rows = []
+    for deployment in fetched["items"]:
+        spec, status = deployment.get("spec") or {}, deployment.get("status") or {}
+        desired = spec.get("replicas", 1)
+        ready = status.get("readyReplicas") or 0
+        rows.append({
+            "name": (deployment.get("metadata") or {}).get("name"),
+            "rollout": "complete" if ready >= desired and (status.get("updatedReplicas") or 0) >= desired else "incomplete",
+            # Healthy conditions are the same everywhere; only the failing ones tell groups apart
+            "conditions": [
+                {"type": c.get("type"), "status": c.get("status"), "reason": c.get("reason")}
+                for c in status.get("conditions") or []
+                if (c.get("status") != "True") or c.get("reason") in ("ProgressDeadlineExceeded", "ReplicaSetCreateError")
+            ],
+            "desired_replicas": desired or 0,
+            "ready_replicas": ready,
+            "unavailable_replicas": status.get("unavailableReplicas") or 0,
+            "images": [c.get("image") for c in ((spec.get("template") or {}).get("spec") or {}).get("containers") or []],
+            "messages": next((c.get("message") for c in status.get("conditions") or [] if c.get("status") != "True"), None),
+        })
+    return {
+        "namespace": namespace,
+        "count": len(rows),
+        "groups": _group(rows, ("rollout", "conditions"), "deployments"),
+        "not_found": fetched["not_found"],
+        "errors": fetched["errors"],
+    }
+
+
+@tool(description="Describes many deployments in one call, selected by a list of names and/or a label selector. Deployments with the same rollout state and failing conditions are grouped, with summed desired/ready/unavailable replicas, their images and condition messages; missing deployments are listed separately. Prefer it over calling describe_deployment repeatedly." + CLUSTER_ARG_HELP)
+async def describe_deployments(
+    namespace: str = "default",
+    deployment_names: Optional[List[str]] = None,
+    label_selector: Optional[str] = None,
+    cluster: Optional[str] = None
+) -> Dict[str, Any]:
+    """Describe a batch of deployments, grouped by rollout state."""
+    return _fan_out(cluster, _describe_deployments, None, namespace, deployment_names, label_selector)
+
+def _list_services(cluster: str, namespace: str = "default") -> Dict[str, Any]:
+    logger.info(f"Listing services in namespace: {namespace} (cluster {cluster})")
     try:
         if namespace == "all":
-            services = v1.list_service_for_all_namespaces(watch=False)
+            services = _core_v1(cluster).list_service_for_all_namespaces(watch=False)
         else:
-            services = v1.list_namespaced_service(namespace, watch=False)
+            services = _core_v1(cluster).list_namespaced_service(namespace, watch=False)
         
         service_list = []
         for svc in services.items:
@@ -242,22 +700,33 @@ async def list_services(namespace: str = "default") -> Dict[str, Any]:
         logger.error(f"Error listing services: {e}")
         return {"error": str(e), "services": []}
 
-@tool(description="Gets cluster events sorted by timestamp. Critical for understanding the sequence of events during an incident. Can filter by namespace, object type, and reason.")
-async def get_events(
+@tool(description="Lists all services in a namespace with their type, cluster IP, and endpoints. Essential for understanding service discovery and networking issues." + CLUSTER_ARG_HELP)
+async def list_services(namespace: str = "default", cluster: Optional[str] = None) -> Dict[str, Any]:
+    """List services in a namespace."""
+    return _fan_out(cluster, _list_services, "services", namespace)
+
+def _get_events(
+    cluster: str,
     namespace: str = "all",
     limit: int = 50,
     field_selector: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Get cluster events."""
-    logger.info(f"Getting events in namespace: {namespace}")
+    logger.info(f"Getting events in namespace: {namespace} (cluster {cluster})")
     try:
+        if K8S_FAST_PATH:
+            core = _core_v1(cluster)
+            call = core.list_event_for_all_namespaces if namespace == "all" else partial(core.list_namespaced_event, namespace)
+            event_list = [_raw_event_info(event) for event in _list_raw(call, limit=limit, field_selector=field_selector)]
+            event_list.sort(key=_event_sort_key, reverse=True)
+            return {"events": event_list, "count": len(event_list)}
+
         if namespace == "all":
-            events = v1.list_event_for_all_namespaces(
+            events = _core_v1(cluster).list_event_for_all_namespaces(
                 limit=limit,
                 field_selector=field_selector
             )
         else:
-            events = v1.list_namespaced_event(
+            events = _core_v1(cluster).list_namespaced_event(
                 namespace,
                 limit=limit,
                 field_selector=field_selector
@@ -277,22 +746,31 @@ async def get_events(
             }
             event_list.append(event_info)
         
-        # Sort by last_timestamp with safe fallback
-        def _ts_key(ev: Dict[str, Any]):
-            return ev.get("last_timestamp") or ev.get("first_timestamp") or ""
-        event_list.sort(key=_ts_key, reverse=True)
+        event_list.sort(key=_event_sort_key, reverse=True)
         
         return {"events": event_list, "count": len(event_list)}
     except ApiException as e:
         logger.error(f"Error getting events: {e}")
         return {"error": str(e), "events": []}
 
-@tool(description="Gets node information including capacity, allocatable resources, and conditions. Essential for understanding resource constraints and node health issues.")
-async def list_nodes() -> Dict[str, Any]:
-    """List cluster nodes with their status and resources."""
-    logger.info("Listing cluster nodes")
+@tool(description="Gets cluster events sorted by timestamp. Critical for understanding the sequence of events during an incident. Can filter by namespace, object type, and reason." + CLUSTER_ARG_HELP)
+async def get_events(
+    namespace: str = "all",
+    limit: int = 50,
+    field_selector: Optional[str] = None,
+    cluster: Optional[str] = None
+) -> Dict[str, Any]:
+    """Get cluster events."""
+    return _fan_out(cluster, _get_events, "events", namespace, limit, field_selector, sort_key=_event_sort_key, reverse=True)
+
+def _list_nodes(cluster: str) -> Dict[str, Any]:
+    logger.info(f"Listing cluster nodes (cluster {cluster})")
     try:
-        nodes = v1.list_node(watch=False)
+        if K8S_FAST_PATH:
+            node_list = [_raw_node_info(node) for node in _list_raw(_core_v1(cluster).list_node)]
+            return {"nodes": node_list, "count": len(node_list)}
+
+        nodes = _core_v1(cluster).list_node(watch=False)
         
         node_list = []
         for node in nodes.items:
@@ -326,3 +804,340 @@ async def list_nodes() -> Dict[str, Any]:
     except ApiException as e:
         logger.error(f"Error listing nodes: {e}")
         return {"error": str(e), "nodes": []}
+
+@tool(description="Gets node information including capacity, allocatable resources, and conditions. Essential for understanding resource constraints and node health issues." + CLUSTER_ARG_HELP)
+async def list_nodes(cluster: Optional[str] = None) -> Dict[str, Any]:
+    """List cluster nodes with their status and resources."""
+    return _fan_out(cluster, _list_nodes, "nodes")
+
+
+# -- Capacity ----------------------------------------------------------------
+
+_QUANTITY_RE = re.compile(r"^([+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$")
+_QUANTITY_MULTIPLIERS = {
+    "": 1.0, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18,
+    "Ki": 2.0 ** 10, "Mi": 2.0 ** 20, "Gi": 2.0 ** 30, "Ti": 2.0 ** 40, "Pi": 2.0 ** 50, "Ei": 2.0 ** 60,
+}
+PRESSURE_CONDITIONS = ("MemoryPressure", "DiskPressure", "PIDPressure", "NetworkUnavailable")
+MAX_CAPACITY_ROWS = 15
+GIB = 2.0 ** 30
+
+
+def parse_quantity(value: Optional[str]) -> float:
+    """Parse a Kubernetes quantity ("250m", "1.5Gi", "1e3") into a float; NaN if invalid."""
+    match = _QUANTITY_RE.match(str(value).strip()) if value is not None else None
+    if not match or match.group(2) not in _QUANTITY_MULTIPLIERS:
+        return float("nan")
+    return float(match.group(1)) * _QUANTITY_MULTIPLIERS[match.group(2)]
+
+
+def parse_quantities(values: Sequence[Optional[str]]) -> np.ndarray:
+    """Parse many quantities at once; missing values count as 0.
+
+    Clusters reuse a handful of distinct request/limit strings, so each
+    distinct string is parsed once and the results are gathered into an
+    array, keeping the cost linear in the number of values.
+    """
+    parsed = {value: parse_quantity(value) for value in set(values) if value is not None}
+    parsed[None] = 0.0
+    return np.fromiter((parsed[value] for value in values), dtype=float, count=len(values))
+
+
+def _pod_resources(pods: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Effective requests and limits per pod: max(sum of containers, largest init container)."""
+    rows: Dict[str, List[Any]] = {"pod": [], "init": [], "cpu_request": [], "cpu_limit": [], "memory_request": [], "memory_limit": []}
+    for index, pod in enumerate(pods):
+        spec = pod.get("spec") or {}
+        for init, containers in ((False, spec.get("containers")), (True, spec.get("initContainers"))):
+            for container in containers or []:
+                resources = container.get("resources") or {}
+                requests, limits = resources.get("requests") or {}, resources.get("limits") or {}
+                rows["pod"].append(index)
+                rows["init"].append(init)
+                rows["cpu_request"].append(requests.get("cpu"))
+                rows["cpu_limit"].append(limits.get("cpu"))
+                rows["memory_request"].append(requests.get("memory"))
+                rows["memory_limit"].append(limits.get("memory"))
+
+    pod_index = np.asarray(rows["pod"], dtype=int)
+    init = np.asarray(rows["init"], dtype=bool)
+    totals = {}
+    for name in ("cpu_request", "cpu_limit", "memory_request", "memory_limit"):
+        values = np.nan_to_num(parse_quantities(rows[name]))
+        regular = np.bincount(pod_index[~init], weights=values[~init], minlength=len(pods))
+        largest_init = np.zeros(len(pods))
+        np.maximum.at(largest_init, pod_index[init], values[init])
+        totals[name] = np.maximum(regular, largest_init)
+    return totals
+
+
+def _ratio(used: np.ndarray, available: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(available > 0, used / available, np.nan)
+
+
+def _pct(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value) * 100, 1)
+
+
+def _cluster_capacity(cluster: str, top: int = MAX_CAPACITY_ROWS) -> Dict[str, Any]:
+    logger.info(f"Computing cluster capacity (cluster {cluster})")
+    try:
+        core = _core_v1(cluster)
+        nodes = list(_list_raw(core.list_node))
+        # Finished pods hold no resources
+        pods = list(_list_raw(core.list_pod_for_all_namespaces, field_selector="status.phase!=Succeeded,status.phase!=Failed"))
+    except ApiException as e:
+        logger.error(f"Error computing cluster capacity: {e}")
+        return {"error": str(e)}
+
+    node_names = [(node.get("metadata") or {}).get("name") for node in nodes]
+    node_slot = {name: i for i, name in enumerate(node_names)}
+    allocatable = {
+        resource: parse_quantities([((node.get("status") or {}).get("allocatable") or {}).get(resource) for node in nodes])
+        for resource in ("cpu", "memory", "pods")
+    }
+
+    resources = _pod_resources(pods)
+    # Unscheduled pods go to an extra slot past the last node
+    pod_node = np.fromiter(
+        (node_slot.get((pod.get("spec") or {}).get("nodeName"), len(nodes)) for pod in pods), dtype=int, count=len(pods),
+    )
+    namespaces = sorted({(pod.get("metadata") or {}).get("namespace") or "" for pod in pods})
+    namespace_slot = {name: i for i, name in enumerate(namespaces)}
+    pod_namespace = np.fromiter(
+        (namespace_slot[(pod.get("metadata") or {}).get("namespace") or ""] for pod in pods), dtype=int, count=len(pods),
+    )
+    per_node = {name: np.bincount(pod_node, weights=values, minlength=len(nodes) + 1) for name, values in resources.items()}
+    per_node["pods"] = np.bincount(pod_node, minlength=len(nodes) + 1).astype(float)
+    per_namespace = {name: np.bincount(pod_namespace, weights=values, minlength=len(namespaces)) for name, values in resources.items()}
+
+    ratios = {
+        "cpu_request": _ratio(per_node["cpu_request"][:-1], allocatable["cpu"]),
+        "cpu_limit": _ratio(per_node["cpu_limit"][:-1], allocatable["cpu"]),
+        "memory_request": _ratio(per_node["memory_request"][:-1], allocatable["memory"]),
+        "memory_limit": _ratio(per_node["memory_limit"][:-1], allocatable["memory"]),
+        "pods": _ratio(per_node["pods"][:-1], allocatable["pods"]),
+    }
+    pressure = np.nan_to_num(np.fmax(ratios["cpu_request"], ratios["memory_request"]), nan=-1.0)
+
+    conditions = []
+    for node in nodes:
+        states = {c.get("type"): c.get("status") for c in (node.get("status") or {}).get("conditions") or []}
+        flagged = [name for name in PRESSURE_CONDITIONS if states.get(name) == "True"]
+        if states.get("Ready") != "True":
+            flagged.append("NotReady")
+        if (node.get("spec") or {}).get("unschedulable"):
+            flagged.append("Cordoned")
+        conditions.append(flagged)
+
+    def node_row(i: int) -> Dict[str, Any]:
+        return {
+            "node": node_names[i],
+            "cpu": f"{per_node['cpu_request'][i]:.2f}/{allocatable['cpu'][i]:.2f} cores",
+            "cpu_request_pct": _pct(ratios["cpu_request"][i]),
+            "cpu_limit_pct": _pct(ratios["cpu_limit"][i]),
+            "memory": f"{per_node['memory_request'][i] / GIB:.1f}/{allocatable['memory'][i] / GIB:.1f} GiB",
+            "memory_request_pct": _pct(ratios["memory_request"][i]),
+            "memory_limit_pct": _pct(ratios["memory_limit"][i]),
+            "pods": f"{int(per_node['pods'][i])}/{int(np.nan_to_num(allocatable['pods'][i]))}",
+            "conditions": conditions[i],
+        }
+
+    total_cpu, total_memory = float(np.nansum(allocatable["cpu"])), float(np.nansum(allocatable["memory"]))
+    namespace_order = np.argsort(-(_ratio(per_namespace["cpu_request"], np.full(len(namespaces), total_cpu))
+                                   + _ratio(per_namespace["memory_request"], np.full(len(namespaces), total_memory))))
+    overcommitted = np.flatnonzero((ratios["cpu_limit"] > 1) | (ratios["memory_limit"] > 1))
+    return {
+        "totals": {
+            "nodes": len(nodes),
+            "pods": len(pods),
+            "unscheduled_pods": int(per_node["pods"][-1]),
+            "cpu_allocatable_cores": round(total_cpu, 2),
+            "cpu_request_pct": _pct(per_node["cpu_request"][:-1].sum() / total_cpu if total_cpu else np.nan),
+            "cpu_limit_pct": _pct(per_node["cpu_limit"][:-1].sum() / total_cpu if total_cpu else np.nan),
+            "memory_allocatable_gib": round(total_memory / GIB, 1),
+            "memory_request_pct": _pct(per_node["memory_request"][:-1].sum() / total_memory if total_memory else np.nan),
+            "memory_limit_pct": _pct(per_node["memory_limit"][:-1].sum() / total_memory if total_memory else np.nan),
+        },
+        "top_nodes": [node_row(i) for i in np.argsort(-pressure, kind="stable")[:top]],
+        "nodes_with_conditions": [node_row(i) for i in range(len(nodes)) if conditions[i]][:top],
+        "limit_overcommitted_nodes": [node_names[i] for i in overcommitted[:top]],
+        "limit_overcommitted_count": len(overcommitted),
+        "top_namespaces": [
+            {
+                "namespace": namespaces[i],
+                "cpu_request_cores": round(float(per_namespace["cpu_request"][i]), 2),
+                "cpu_request_pct": _pct(per_namespace["cpu_request"][i] / total_cpu if total_cpu else np.nan),
+                "memory_request_gib": round(float(per_namespace["memory_request"][i]) / GIB, 1),
+                "memory_request_pct": _pct(per_namespace["memory_request"][i] / total_memory if total_memory else np.nan),
+            }
+            for i in namespace_order[:top]
+        ],
+    }
+
+
+@tool(description="Summarises cluster capacity and pressure in one call: CPU/memory requests and limits aggregated per node and per namespace against node allocatable, the most loaded nodes, nodes with MemoryPressure/DiskPressure/PIDPressure or NotReady, and nodes whose limits are overcommitted. Use it instead of list_nodes plus list_pods to find out whether scheduling or resource pressure explains an incident." + CLUSTER_ARG_HELP)
+async def cluster_capacity(cluster: Optional[str] = None) -> Dict[str, Any]:
+    """Summarise requests, limits and pressure per node and namespace."""
+    return _fan_out(cluster, _cluster_capacity, None)
+
+
+# -- Log search --------------------------------------------------------------
+
+LOG_SEARCH_CONCURRENCY = int(os.environ.get("LOG_SEARCH_CONCURRENCY", 8))
+MAX_LOG_MATCHES = 200
+LOG_CONTEXT_LINES = 2
+LOG_CHUNK_BYTES = 64 * 1024
+# Longer lines are cut so a runaway line cannot grow the buffer
+MAX_LOG_LINE_CHARS = 2000
+
+
+def _stream_lines(response: Any) -> Iterator[str]:
+    """Yield decoded lines from a streaming log response holding at most one chunk plus one partial line."""
+    partial_line = b""
+    for chunk in response.stream(LOG_CHUNK_BYTES, decode_content=True):
+        lines = (partial_line + chunk).split(b"\n")
+        partial_line = lines.pop()[:MAX_LOG_LINE_CHARS * 4]
+        for line in lines:
+            yield line.decode("utf-8", "replace")[:MAX_LOG_LINE_CHARS]
+    if partial_line:
+        yield partial_line.decode("utf-8", "replace")[:MAX_LOG_LINE_CHARS]
+
+
+def _grep_container(core: client.CoreV1Api, namespace: str, pod: str, container: str, regex: "re.Pattern[str]",
+                    since_seconds: int, limit: int, cancelled: Callable[[], bool]) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """Stream one container's log and collect up to `limit` matching lines.
+
+    Returns the matches, the number of hits seen and whether the stream was
+    cut short, either by reaching `limit` or by `cancelled()`.
+    """
+    matches: List[Dict[str, Any]] = []
+    response = core.read_namespaced_pod_log(
+        pod, namespace, container=container, since_seconds=since_seconds, timestamps=True, _preload_content=False,
+    )
+    try:
+        context: deque = deque(maxlen=LOG_CONTEXT_LINES)
+        for line in _stream_lines(response):
+            if cancelled():
+                return matches, len(matches), True
+            timestamp, _, message = line.partition(" ")
+            if not timestamp[:1].isdigit():
+                timestamp, message = "", line
+            if regex.search(message):
+                matches.append({
+                    "pod": pod,
+                    "container": container,
+                    "timestamp": timestamp,
+                    "line": message,
+                    "before": [previous for _, previous in context],
+                })
+                if len(matches) >= limit:
+                    return matches, len(matches), True
+            context.append((timestamp, message))
+    finally:
+        response.close()
+        response.release_conn()
+    return matches, len(matches), False
+
+
+def _search_logs(cluster: str, namespace: str, selector: str, pattern: str, since: str = "1h",
+                 max_matches: int = 50, container: Optional[str] = None) -> Dict[str, Any]:
+    """Grep every container, keeping the first max_matches matches in (pod, container, timestamp) order.
+
+    Each container collects up to max_matches matches on its own, so the
+    result does not depend on which stream happens to be fastest. Once the
+    containers ahead of a target in that order have finished with enough
+    matches between them, its stream is cancelled.
+    """
+    logger.info(f"Searching logs of {selector} in {namespace} for {pattern!r} (cluster {cluster})")
+    try:
+        regex = re.compile(pattern)
+    except re.error as e:
+        return {"error": f"Invalid pattern: {e}"}
+    since_seconds = max(1, int(parse_duration(since)))
+    max_matches = max(1, min(max_matches, MAX_LOG_MATCHES))
+    core = _core_v1(cluster)
+    try:
+        pods = list(_list_raw(partial(core.list_namespaced_pod, namespace), label_selector=selector))
+    except ApiException as e:
+        logger.error(f"Error listing pods for log search: {e}")
+        return {"error": str(e)}
+
+    targets = sorted(
+        ((pod.get("metadata") or {}).get("name"), c.get("name"))
+        for pod in pods
+        if (pod.get("status") or {}).get("phase") != "Pending"
+        for c in (pod.get("spec") or {}).get("containers") or []
+        if container is None or c.get("name") == container
+    )
+    results: List[Any] = [None] * len(targets)
+    finished = [False] * len(targets)
+    lock = threading.Lock()
+    # Targets from `cutoff` on cannot contribute to the result any more
+    progress = {"prefix": 0, "found": 0, "cutoff": len(targets)}
+
+    def settle(index: int, result: Any) -> Any:
+        with lock:
+            results[index], finished[index] = result, True
+            while progress["cutoff"] == len(targets) and progress["prefix"] < len(targets) and finished[progress["prefix"]]:
+                done = results[progress["prefix"]]
+                progress["prefix"] += 1
+                progress["found"] += len(done[0]) if isinstance(done, tuple) else 0
+                if progress["found"] >= max_matches:
+                    progress["cutoff"] = progress["prefix"]
+        return result
+
+    def grep(index: int) -> Any:
+        pod, name = targets[index]
+        if index >= progress["cutoff"]:
+            return settle(index, None)
+        try:
+            result: Any = _grep_container(core, namespace, pod, name, regex, since_seconds, max_matches,
+                                          lambda: index >= progress["cutoff"])
+        except ApiException as e:
+            result = f"API error: {e.status} - {e.reason}"
+        except Exception as e:
+            # Broken or timed out streams (urllib3 ProtocolError, ReadTimeoutError...) only lose this target
+            logger.warning(f"Error reading logs of {pod}/{name}: {e}")
+            result = f"{type(e).__name__}: {e}"
+        return settle(index, result)
+
+    with tracing.ContextThreadPoolExecutor(max_workers=max(1, min(LOG_SEARCH_CONCURRENCY, len(targets)))) as pool:
+        list(pool.map(grep, range(len(targets))))
+
+    keys = [f"{pod}/{name}" for pod, name in targets]
+    searched = [(key, r) for key, r in zip(keys, results) if isinstance(r, tuple)]
+    matches = sorted(
+        (m for _, (found, _, _) in searched for m in found),
+        key=lambda m: (m["pod"], m["container"], m["timestamp"]),
+    )[:max_matches]
+    hits = {key: count for key, (_, count, _) in searched if count}
+    skipped = [key for key, r in zip(keys, results) if r is None]
+    return {
+        "namespace": namespace,
+        "selector": selector,
+        "pattern": pattern,
+        "containers_searched": len(searched),
+        "matches": matches,
+        "count": len(matches),
+        "hits_per_container": dict(sorted(hits.items(), key=lambda item: -item[1])),
+        # Counts are lower bounds once a stream was cut short or a container skipped
+        "stopped_early": bool(skipped) or any(truncated for _, (_, _, truncated) in searched),
+        "skipped": skipped,
+        "errors": {key: r for key, r in zip(keys, results) if isinstance(r, str)},
+    }
+
+
+@tool(description="Search the logs of every pod matching a label selector for a regex, concurrently, and return the matching lines with pod, container, timestamp and preceding lines plus per-container hit counts. Returns the first max_matches matches ordered by pod, container and time. Use it to find which replica logged an error instead of calling get_pod_logs pod by pod." + CLUSTER_ARG_HELP)
+async def search_logs(
+    namespace: str,
+    selector: str,
+    pattern: str,
+    since: str = "1h",
+    max_matches: int = 50,
+    container: Optional[str] = None,
+    cluster: Optional[str] = None
+) -> Dict[str, Any]:
+    """Grep the logs of all pods of a workload."""
+    return _fan_out(cluster, _search_logs, None, namespace, selector, pattern, since, max_matches, container)
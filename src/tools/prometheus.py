@@ -1,24 +1,23 @@
 #!/usr/bin/env python
 
 import os
+import re
 import logging
-from typing import Any, Dict, Optional
-from dataclasses import dataclass
+import threading
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, replace
 import time
 from langchain_core.tools import tool
 
-import dotenv
 import requests
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-logger = logging.getLogger(__name__)
+from telemetry import tracing
+from tools.http import pooled_session
+from tools.promql_guard import guard_query
 
-dotenv.load_dotenv()
+logger = logging.getLogger(__name__)
 
 # Constants for safety limits
 REQUEST_TIMEOUT = 30  # seconds
@@ -34,6 +33,8 @@ config = PrometheusConfig(
     url=os.environ.get("PROMETHEUS_URL", ""),
 )
 
+session = pooled_session()
+
 def make_prometheus_request(endpoint: str, params: Optional[Dict[str, str]] = None) -> Any:
     """Make a request to the Prometheus API."""
     if not config.url:
@@ -48,14 +49,17 @@ def make_prometheus_request(endpoint: str, params: Optional[Dict[str, str]] = No
     start_time = time.time()
     try:
         # Make the request with cookies for authentication and timeout
-        response = requests.get(
-            url,
-            params=params,
-            timeout=REQUEST_TIMEOUT
-        )
-        
+        with tracing.span("prometheus GET", {"http.request.method": "GET", "url.full": url, "promql": (params or {}).get("query", "")}) as http_span:
+            response = session.get(
+                url,
+                params=params,
+                timeout=REQUEST_TIMEOUT
+            )
+            http_span.set_attribute("http.response.status_code", response.status_code)
+
         response.raise_for_status()
-        result = response.json()
+        with tracing.span("prometheus json.parse", {"http.response.body.size": len(response.content)}):
+            result = response.json()
         
         if result["status"] != "success":
             error_msg = f"Prometheus API error: {result.get('error', 'Unknown error')}"
@@ -77,7 +81,34 @@ def make_prometheus_request(endpoint: str, params: Optional[Dict[str, str]] = No
         logger.error(f"Request to {endpoint} failed after {duration:.2f}s: {str(e)}")
         raise
 
-@tool(description="Execute a PromQL instant query against Prometheus")
+def range_query(query: str, start: str, end: str, step: str) -> Dict[str, Any]:
+    """Run a range query through the cost guard.
+
+    Returns:
+        The matrix result (plus a `cost_guard` note and the new `step` when the step was raised),
+        or the guard's structured error when the query was rejected.
+    """
+    verdict = guard_query(query, make_prometheus_request, start=start, end=end, step=step)
+    if not verdict.allowed:
+        return verdict.error
+
+    params = {
+        "query": query,
+        "start": start,
+        "end": end,
+        "step": verdict.step or step
+    }
+    data = make_prometheus_request("query_range", params=params)
+    response = {
+        "resultType": data["resultType"],
+        "result": data["result"]
+    }
+    if verdict.note:
+        response["cost_guard"] = verdict.note
+        response["step"] = verdict.step
+    return response
+
+@tool(description="Execute a PromQL instant query against Prometheus. Queries estimated to touch too many series or samples are rejected with an error explaining the budget and how to narrow them.")
 async def execute_query(query: str, time: Optional[str] = None) -> Dict[str, Any]:
     """
     Execute an instant query against Prometheus.
@@ -92,6 +123,10 @@ async def execute_query(query: str, time: Optional[str] = None) -> Dict[str, Any
     params = {"query": query}
     if time:
         params["time"] = time
+
+    verdict = guard_query(query, make_prometheus_request, time=time)
+    if not verdict.allowed:
+        return verdict.error
     
     try:
         data = make_prometheus_request("query", params=params)
@@ -104,7 +139,7 @@ async def execute_query(query: str, time: Optional[str] = None) -> Dict[str, Any
         logger.error(f"Query execution failed: {str(e)}")
         raise
 
-@tool(description="Execute a PromQL range query with start time, end time, and step interval")
+@tool(description="Execute a PromQL range query with start time, end time, and step interval. The step may be raised to keep the query within the cost budget; queries still over budget are rejected with an error explaining how to narrow them.")
 async def execute_range_query(query: str, start: str, end: str, step: str) -> Dict[str, Any]:
     """
     Execute a range query against Prometheus.
@@ -117,21 +152,12 @@ async def execute_range_query(query: str, start: str, end: str, step: str) -> Di
     """
     logger.info(f"Executing range query: {query}")
     logger.debug(f"Time range: {start} to {end} with step {step}")
-    
-    params = {
-        "query": query,
-        "start": start,
-        "end": end,
-        "step": step
-    }
-    
+
     try:
-        data = make_prometheus_request("query_range", params=params)
-        logger.info(f"Range query returned {len(data['result'])} series")
-        return {
-            "resultType": data["resultType"],
-            "result": data["result"]
-        }
+        response = range_query(query, start, end, step)
+        if "error" not in response:
+            logger.info(f"Range query returned {len(response['result'])} series")
+        return response
     except Exception as e:
         logger.error(f"Range query execution failed: {str(e)}")
         raise
@@ -222,3 +248,263 @@ async def get_alerts() -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Failed to fetch alerts: {str(e)}")
         raise
+
+
+# -- Metric catalog -------------------------------------------------------
+
+METRIC_CATALOG_REFRESH_SECONDS = float(os.environ.get("METRIC_CATALOG_REFRESH_SECONDS", 600))
+# Metrics per /api/v1/series request when collecting label names
+CATALOG_SERIES_BATCH = 50
+# Series returned per /api/v1/series request; a sample is enough to learn the label names
+CATALOG_SERIES_LIMIT = 1000
+# /api/v1/series requests in flight at once, on the pooled session
+CATALOG_SERIES_CONCURRENCY = int(os.environ.get("METRIC_CATALOG_CONCURRENCY", 8))
+# How long a search waits for a cold catalog before answering with what is loaded
+CATALOG_COLD_WAIT_SECONDS = float(os.environ.get("METRIC_CATALOG_COLD_WAIT_SECONDS", 5))
+# Only series seen recently are sampled for their label names
+CATALOG_SERIES_WINDOW_SECONDS = 300
+MAX_SEARCH_RESULTS = 15
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _words(text: str) -> Set[str]:
+    return {w for w in re.split(r"[^a-z0-9]+", text.lower()) if w}
+
+
+@dataclass
+class MetricEntry:
+    name: str
+    type: str = "unknown"
+    help: str = ""
+    unit: str = ""
+    labels: Tuple[str, ...] = ()
+
+
+class MetricCatalog:
+    """In-memory snapshot of metric names, metadata and label names with trigram search.
+
+    The snapshot is refreshed in a background thread once it is older than
+    `refresh_seconds`; searches keep using the previous snapshot meanwhile.
+    The first load publishes names and metadata before the label names, which
+    take one /api/v1/series request per batch, so a search on a cold catalog
+    waits a bounded time and may get matches without labels (`complete` is
+    False until they arrive). `warm()` starts that load ahead of the first
+    search.
+    """
+
+    def __init__(self, refresh_seconds: float = METRIC_CATALOG_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at = 0.0
+        self.complete = False
+        self.last_error: Optional[str] = None
+        self._entries: List[MetricEntry] = []
+        self._trigram_index: Dict[str, List[int]] = {}
+        self._word_index: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        # Set once the first snapshot is published or a load attempt ends
+        self._ready = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _collect_entries(self) -> List[MetricEntry]:
+        """Return every metric with its metadata but no label names yet."""
+        names = make_prometheus_request("label/__name__/values")
+        metadata = make_prometheus_request("metadata")
+        entries = []
+        for name in names:
+            meta = (metadata.get(name) or [{}])[0]
+            entries.append(MetricEntry(
+                name=name,
+                type=meta.get("type", "unknown"),
+                help=meta.get("help", ""),
+                unit=meta.get("unit", ""),
+            ))
+        return entries
+
+    def _collect_labels(self, names: List[str]) -> Dict[str, Set[str]]:
+        """Return the label names of the recent series of `names`, fetching the batches concurrently.
+
+        Each request is capped at CATALOG_SERIES_LIMIT series. When a batch
+        hits the cap, its metrics that did not show up are asked for again,
+        so one high-cardinality metric cannot hide the others.
+        """
+        now = time.time()
+
+        def fetch(batch: List[str]) -> Dict[str, Set[str]]:
+            found: Dict[str, Set[str]] = {}
+            pending = batch
+            while pending:
+                series = make_prometheus_request("series", params={
+                    "match[]": [f'{{__name__="{name}"}}' for name in pending],
+                    "start": f"{now - CATALOG_SERIES_WINDOW_SECONDS:.3f}",
+                    "end": f"{now:.3f}",
+                    "limit": str(CATALOG_SERIES_LIMIT),
+                })
+                for labelset in series:
+                    found.setdefault(labelset.get("__name__", ""), set()).update(k for k in labelset if k != "__name__")
+                # Servers without `limit` support return everything, which ends the loop too
+                if len(series) < CATALOG_SERIES_LIMIT:
+                    break
+                pending = [name for name in pending if name not in found]
+            return found
+
+        batches = [names[i:i + CATALOG_SERIES_BATCH] for i in range(0, len(names), CATALOG_SERIES_BATCH)]
+        labels: Dict[str, Set[str]] = {}
+        with tracing.ContextThreadPoolExecutor(max_workers=max(1, min(CATALOG_SERIES_CONCURRENCY, len(batches)))) as pool:
+            for found in pool.map(fetch, batches):
+                for name, label_names in found.items():
+                    labels.setdefault(name, set()).update(label_names)
+        return labels
+
+    def _publish(self, entries: List[MetricEntry], complete: bool) -> None:
+        trigram_index: Dict[str, List[int]] = {}
+        word_index: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            for trigram in _trigrams(entry.name):
+                trigram_index.setdefault(trigram, []).append(i)
+            for word in _words(entry.help) | set(entry.labels):
+                word_index.setdefault(word, []).append(i)
+        with self._lock:
+            self._entries, self._trigram_index, self._word_index = entries, trigram_index, word_index
+            self.loaded_at, self.complete = time.time(), complete
+        self._ready.set()
+
+    def refresh(self) -> None:
+        """Take a new snapshot from Prometheus and rebuild the index."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            start = time.time()
+            entries = self._collect_entries()
+            if not self.loaded_at:
+                # Searches on a cold catalog can use the names while the labels load
+                self._publish(entries, complete=False)
+            labels = self._collect_labels([entry.name for entry in entries])
+            entries = [replace(entry, labels=tuple(sorted(labels.get(entry.name, ())))) for entry in entries]
+            self._publish(entries, complete=True)
+            logger.info(f"Metric catalog refreshed: {len(entries)} metrics in {time.time() - start:.2f}s")
+        except Exception as e:
+            # Recorded before `_ready` is set so a waiting search sees it
+            self.last_error = str(e)
+            raise
+        finally:
+            self._refreshing.release()
+            self._ready.set()
+
+    def _start_refresh(self, name: str) -> None:
+        """Refresh in a background thread unless one is already running."""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_quietly, name=name, daemon=True)
+            self._refresh_thread.start()
+
+    def warm(self) -> None:
+        """Start loading an empty catalog in the background; no-op if loaded, loading or unconfigured."""
+        if self.loaded_at or self._refreshing.locked() or not config.url:
+            return
+        self.last_error = None
+        self._ready.clear()
+        self._start_refresh("metric-catalog-load")
+
+    def ensure_fresh(self, timeout: Optional[float] = None) -> bool:
+        """Load the catalog if empty; refresh it in the background if stale.
+
+        A cold catalog is loaded in the background and waited for at most
+        `timeout` seconds (None waits for the first snapshot). Returns whether
+        a snapshot is available, and raises if the load failed without one.
+        """
+        if not self.loaded_at:
+            if not config.url:
+                # Fails with the configuration error; there is nothing to wait for
+                self.refresh()
+            self.warm()
+            self._ready.wait(timeout)
+            if not self.loaded_at and self.last_error:
+                raise RuntimeError(f"Metric catalog load failed: {self.last_error}")
+        elif time.time() - self.loaded_at > self.refresh_seconds and not self._refreshing.locked():
+            # Searches keep arriving while a refresh runs; start one thread, not one per search
+            self._start_refresh("metric-catalog-refresh")
+        return bool(self.loaded_at)
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Metric catalog refresh failed, keeping the previous snapshot: {e}")
+
+    def search(self, term: str, limit: int = MAX_SEARCH_RESULTS) -> List[Tuple[float, MetricEntry]]:
+        """Rank metrics by trigram similarity of their name, plus help-text and label-name matches."""
+        term = term.strip()
+        query_trigrams = _trigrams(re.sub(r"\s+", "_", term))
+        query_words = _words(term)
+        with self._lock:
+            entries, trigram_index, word_index = self._entries, self._trigram_index, self._word_index
+        shared = Counter(chain.from_iterable(trigram_index.get(t, ()) for t in query_trigrams))
+        described = Counter(chain.from_iterable(word_index.get(w, ()) for w in query_words))
+
+        # Only the strongest candidates of each signal are worth a full score
+        candidates = {i for i, _ in shared.most_common(limit * 20)} | {i for i, _ in described.most_common(limit * 20)}
+        scored = []
+        for i in candidates:
+            entry = entries[i]
+            name_trigrams = len(entry.name) + 1
+            similarity = shared.get(i, 0) / (len(query_trigrams) + name_trigrams - shared.get(i, 0))
+            score = similarity + 0.25 * described.get(i, 0) / max(1, len(query_words))
+            if term.lower() in entry.name.lower():
+                score += 0.5
+            scored.append((score, entry))
+        scored.sort(key=lambda item: (-item[0], item[1].name))
+        return scored[:limit]
+
+
+metric_catalog = MetricCatalog()
+
+
+@tool(description="Search the local catalog of Prometheus metric names by keyword, fuzzy or partial name (e.g. 'cpu usage', 'restarts', 'http latency'). Returns matching metric names with type, help text and label names without querying Prometheus. Use before writing PromQL when unsure of the exact metric or label names.")
+async def search_metrics(term: str, limit: int = MAX_SEARCH_RESULTS) -> Dict[str, Any]:
+    """
+    Search the metric catalog.
+
+    Args:
+        term: Words, partial or misspelled metric name to look for.
+        limit: Maximum number of metrics to return.
+
+    Returns:
+        A dictionary with the ranked `matches` and the size and age of the catalog.
+        `catalog.complete` is False while the label names are still loading.
+    """
+    logger.info(f"Searching metric catalog for: {term}")
+    if not metric_catalog.ensure_fresh(CATALOG_COLD_WAIT_SECONDS):
+        return {
+            "term": term,
+            "matches": [],
+            "error": f"The metric catalog is still loading after {CATALOG_COLD_WAIT_SECONDS:g}s; retry shortly.",
+        }
+    matches = metric_catalog.search(term, max(1, min(limit, 50)))
+    return {
+        "term": term,
+        "matches": [
+            {
+                "name": entry.name,
+                "type": entry.type,
+                "help": entry.help,
+                "unit": entry.unit,
+                "labels": list(entry.labels),
+                "score": round(score, 3),
+            }
+            for score, entry in matches
+        ],
+        "catalog": {
+            "metrics": len(metric_catalog),
+            "age_seconds": round(time.time() - metric_catalog.loaded_at, 1),
+            "complete": metric_catalog.complete,
+        },
+    }
@@ -0,0 +1,472 @@
+"""Pre-flight cost guard for model-written PromQL.
+
+Before `execute_query` / `execute_range_query` hit Prometheus, the vector
+selectors of the query are extracted, the series each one matches are counted
+through `/api/v1/series` (capped with `limit`), and the number of samples the
+query would scan is estimated from the selector ranges, the query window and
+the step. The selectors are probed concurrently and their counts cached for
+PROMQL_GUARD_CACHE_SECONDS, so a query the model retries or refines does not
+pay the series lookups again. Range queries over budget get a larger step when that is enough;
+anything else over budget is rejected with a structured error telling the
+model what to narrow.
+
+The guard fails open: if the query cannot be parsed or the series lookup
+fails, the query runs as before and Prometheus has the last word.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telemetry import metrics, tracing
+from tools.timeutil import format_duration, parse_duration, parse_time
+
+logger = logging.getLogger(__name__)
+
+PROMQL_GUARD_ENABLED = os.environ.get("PROMQL_GUARD_ENABLED", "true").lower() not in ("0", "false", "no")
+PROMQL_MAX_SERIES = int(os.environ.get("PROMQL_MAX_SERIES", 5000))
+PROMQL_MAX_SAMPLES = int(os.environ.get("PROMQL_MAX_SAMPLES", 20_000_000))
+# How long a selector's series count is reused, and how many counts are kept
+SERIES_CACHE_SECONDS = float(os.environ.get("PROMQL_GUARD_CACHE_SECONDS", 60))
+SERIES_CACHE_SIZE = 512
+# Series lookups of one query run in parallel, up to this many
+PROBE_CONCURRENCY = 8
+# Label sets kept per selector to suggest narrowing matchers
+SUGGESTION_SAMPLE_SIZE = 1000
+# global scrape_interval in cluster/resources/prometheus/prometheus-config.yaml
+SCRAPE_INTERVAL_SECONDS = float(os.environ.get("PROMQL_SCRAPE_INTERVAL_SECONDS", 15))
+LOOKBACK_DELTA_SECONDS = 300
+# Prometheus refuses range queries with more points per series than this
+MAX_RANGE_POINTS = 11000
+# Do not coarsen a range query below this many points; reject it instead
+MIN_REWRITE_POINTS = 30
+
+_IDENT_RE = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+_NUMBER_RE = re.compile(r"(?:0x[0-9a-fA-F]+|\d*\.?\d+(?:[eE][+-]?\d+)?)[a-zA-Z0-9]*")
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`[^`]*`')
+_MATCHER_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(=~|!~|!=|=)\s*("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`[^`]*`)')
+_GROUPING_KEYWORDS = {"by", "without", "on", "ignoring", "group_left", "group_right"}
+_KEYWORDS = {"bool", "and", "or", "unless", "atan2", "inf", "nan"}
+# Aggregations may be followed by `by (...)` / `without (...)` instead of "("
+_AGGREGATIONS = {
+    "sum", "min", "max", "avg", "group", "stddev", "stdvar", "count", "count_values",
+    "bottomk", "topk", "quantile", "limitk", "limit_ratio",
+}
+
+
+@dataclass
+class Selector:
+    """A vector selector found in a query."""
+
+    text: str
+    metric: Optional[str] = None
+    matchers: List[Tuple[str, str, str]] = field(default_factory=list)
+    range_seconds: float = 0.0
+    offset_seconds: float = 0.0
+    # Evaluations per query step added by enclosing subqueries
+    subquery_factor: float = 1.0
+
+    @property
+    def samples_per_step(self) -> float:
+        """Estimate the samples read for each series at every evaluation step."""
+        per_series = max(1.0, self.range_seconds / SCRAPE_INTERVAL_SECONDS) if self.range_seconds else 1.0
+        return per_series * self.subquery_factor
+
+
+@dataclass
+class GuardVerdict:
+    """Outcome of the cost guard for one query."""
+
+    allowed: bool
+    step: Optional[str] = None
+    estimate: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[Dict[str, Any]] = None
+    note: Optional[str] = None
+
+
+def _skip_spaces(query: str, i: int) -> int:
+    while i < len(query) and query[i].isspace():
+        i += 1
+    return i
+
+
+def _matching_close(query: str, i: int, open_char: str, close_char: str) -> int:
+    """Return the index just past the bracket that closes the one at `i`."""
+    depth = 0
+    while i < len(query):
+        string = _STRING_RE.match(query, i)
+        if string:
+            i = string.end()
+            continue
+        if query[i] == open_char:
+            depth += 1
+        elif query[i] == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise ValueError(f"unbalanced {open_char!r} in query")
+
+
+def _parse_matchers(body: str) -> Tuple[Optional[str], List[Tuple[str, str, str]]]:
+    metric = None
+    matchers = []
+    i = 0
+    while i < len(body):
+        if body[i].isspace() or body[i] == ",":
+            i += 1
+            continue
+        string = _STRING_RE.match(body, i)
+        if string:
+            metric = string.group(0)[1:-1]
+            i = string.end()
+            continue
+        matcher = _MATCHER_RE.match(body, i)
+        if not matcher:
+            raise ValueError(f"invalid label matchers: {{{body}}}")
+        label, op, value = matcher.groups()
+        if label == "__name__" and op == "=":
+            metric = value[1:-1]
+        else:
+            matchers.append((label, op, value[1:-1]))
+        i = matcher.end()
+    return metric, matchers
+
+
+def _parse_range(query: str, i: int) -> Tuple[float, Optional[float], int]:
+    """Parse `[range]` or `[range:step]` at `i`; returns (range, step, end index)."""
+    end = _matching_close(query, i, "[", "]")
+    body = query[i + 1:end - 1].strip()
+    if ":" in body:
+        range_text, step_text = body.split(":", 1)
+        step = parse_duration(step_text.strip()) if step_text.strip() else SCRAPE_INTERVAL_SECONDS
+        return parse_duration(range_text.strip()), step, end
+    return parse_duration(body), None, end
+
+
+def parse_selectors(query: str) -> List[Selector]:
+    """Extract the vector selectors of a PromQL query.
+
+    This is a scanner, not a full PromQL parser: it only needs to find metric
+    names, label matchers, ranges, offsets and subqueries well enough to
+    estimate cost.
+
+    Raises:
+        ValueError: If the query is malformed in a way the scanner notices.
+    """
+    selectors: List[Selector] = []
+    group_starts: List[int] = []
+    last_group: Optional[int] = None
+    i = 0
+    while i < len(query):
+        char = query[i]
+        if char.isspace():
+            i += 1
+            continue
+        if char == "#":
+            newline = query.find("\n", i)
+            i = len(query) if newline < 0 else newline
+            continue
+        string = _STRING_RE.match(query, i)
+        if string:
+            i = string.end()
+            continue
+        if char == "(":
+            group_starts.append(len(selectors))
+            i += 1
+            continue
+        if char == ")":
+            last_group = group_starts.pop() if group_starts else 0
+            i += 1
+            nxt = _skip_spaces(query, i)
+            if nxt < len(query) and query[nxt] == "[":
+                # Subquery: every selector inside is evaluated once per subquery step
+                sub_range, sub_step, i = _parse_range(query, nxt)
+                for selector in selectors[last_group:]:
+                    selector.subquery_factor *= max(1.0, sub_range / (sub_step or SCRAPE_INTERVAL_SECONDS))
+            continue
+        if char == "@":
+            i = _skip_spaces(query, i + 1)
+            token = _IDENT_RE.match(query, i) or _NUMBER_RE.match(query, i)
+            i = token.end() if token else i + 1
+            continue
+        if char.isdigit() or (char == "." and i + 1 < len(query) and query[i + 1].isdigit()):
+            number = _NUMBER_RE.match(query, i)
+            i = number.end() if number else i + 1
+            continue
+
+        start = i
+        metric = None
+        ident = _IDENT_RE.match(query, i)
+        if ident:
+            word = ident.group(0)
+            i = _skip_spaces(query, ident.end())
+            lowered = word.lower()
+            if lowered in _GROUPING_KEYWORDS:
+                if i < len(query) and query[i] == "(":
+                    i = _matching_close(query, i, "(", ")")
+                continue
+            if lowered == "offset":
+                # A negative offset looks forward in time
+                duration = re.match(r"(-?)\s*([0-9a-z.]+)", query[i:])
+                if duration and selectors:
+                    sign = -1.0 if duration.group(1) else 1.0
+                    selectors[-1].offset_seconds = sign * parse_duration(duration.group(2))
+                i += duration.end() if duration else 0
+                continue
+            if lowered in _KEYWORDS or lowered in _AGGREGATIONS or (i < len(query) and query[i] == "("):
+                continue
+            metric = word
+        elif char != "{":
+            i += 1
+            continue
+
+        matchers: List[Tuple[str, str, str]] = []
+        if i < len(query) and query[i] == "{":
+            close = _matching_close(query, i, "{", "}")
+            braced_metric, matchers = _parse_matchers(query[i + 1:close - 1])
+            metric = metric or braced_metric
+            i = close
+        text = query[start:i].strip()
+        selector = Selector(text=text, metric=metric, matchers=matchers)
+        nxt = _skip_spaces(query, i)
+        if nxt < len(query) and query[nxt] == "[":
+            selector.range_seconds, sub_step, i = _parse_range(query, nxt)
+            if sub_step:
+                # `metric[1h:1m]` is a subquery over an instant selector
+                selector.subquery_factor = max(1.0, selector.range_seconds / sub_step)
+                selector.range_seconds = 0.0
+        selectors.append(selector)
+    return selectors
+
+
+class SeriesCountCache:
+    """Series counts by selector and window length, reused for `ttl_seconds`.
+
+    The window position is left out of the key: counts barely move between two
+    queries a few seconds apart, which is all the cache has to cover.
+    """
+
+    def __init__(self, ttl_seconds: float = SERIES_CACHE_SECONDS, max_entries: int = SERIES_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[str, int], Tuple[float, int, List[Dict[str, str]]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[Tuple[int, List[Dict[str, str]]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: Tuple[str, int], count: int, sample: List[Dict[str, str]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), count, sample)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+series_counts = SeriesCountCache()
+
+
+def _window(selector: Selector, start: float, end: float) -> Tuple[float, float]:
+    """Return the time range whose samples `selector` reads for a query over [start, end]."""
+    return (
+        start - selector.offset_seconds - max(selector.range_seconds, LOOKBACK_DELTA_SECONDS),
+        end - selector.offset_seconds,
+    )
+
+
+def _cache_key(selector: Selector, start: float, end: float) -> Tuple[str, int]:
+    window_start, window_end = _window(selector, start, end)
+    return selector.text, int(window_end - window_start)
+
+
+def _count_series(
+    selector: Selector,
+    start: float,
+    end: float,
+    request: Callable[..., Any],
+) -> Tuple[int, List[Dict[str, str]]]:
+    window_start, window_end = _window(selector, start, end)
+    key = _cache_key(selector, start, end)
+    cached = series_counts.get(key)
+    if cached is not None:
+        return cached
+    series = request("series", params={
+        "match[]": selector.text,
+        "start": f"{window_start:.3f}",
+        "end": f"{window_end:.3f}",
+        # Honoured by Prometheus >= 2.51; older servers return every match
+        "limit": str(PROMQL_MAX_SERIES + 1),
+    })
+    sample = series[:SUGGESTION_SAMPLE_SIZE]
+    series_counts.put(key, len(series), sample)
+    return len(series), sample
+
+
+def _count_all(
+    selectors: List[Selector],
+    start: float,
+    end: float,
+    request: Callable[..., Any],
+) -> List[Tuple[Selector, int, List[Dict[str, str]]]]:
+    """Count the series of every selector, with one concurrent lookup per distinct one."""
+    distinct = list({_cache_key(s, start, end): s for s in selectors}.values())
+    if len(distinct) <= 1:
+        counts = [_count_series(selector, start, end, request) for selector in distinct]
+    else:
+        with tracing.ContextThreadPoolExecutor(max_workers=min(PROBE_CONCURRENCY, len(distinct))) as pool:
+            counts = list(pool.map(lambda selector: _count_series(selector, start, end, request), distinct))
+    by_key = {_cache_key(s, start, end): count for s, count in zip(distinct, counts)}
+    return [(s, *by_key[_cache_key(s, start, end)]) for s in selectors]
+
+
+def _suggest_matchers(selector: Selector, sample: List[Dict[str, str]]) -> List[str]:
+    """Suggest low-cardinality labels (namespace, job, ...) that split the matched series."""
+    pinned = {label for label, op, _ in selector.matchers if op == "="}
+    values: Dict[str, Counter] = {}
+    for labels in sample:
+        for label, value in labels.items():
+            if label != "__name__" and label not in pinned:
+                values.setdefault(label, Counter())[value] += 1
+    # Labels unique to (almost) every series are not a useful narrowing step
+    ranked = sorted(
+        (len(counts), label, counts)
+        for label, counts in values.items()
+        if 2 <= len(counts) <= len(sample) / 2
+    )
+    suggestions = []
+    for distinct, label, counts in ranked[:3]:
+        examples = ", ".join(f'{label}="{value}"' for value, _ in counts.most_common(3))
+        suggestions.append(f"Add a {label} matcher to {selector.text} ({distinct}+ values), e.g. {examples}")
+    return suggestions
+
+
+def _nice_step(seconds: float) -> float:
+    """Round a step up to a multiple of the scrape interval, then to whole minutes/hours."""
+    for unit in (3600, 60, SCRAPE_INTERVAL_SECONDS):
+        if seconds >= unit * 2:
+            return math.ceil(seconds / unit) * unit
+    return math.ceil(seconds / SCRAPE_INTERVAL_SECONDS) * SCRAPE_INTERVAL_SECONDS
+
+
+def guard_query(
+    query: str,
+    request: Callable[..., Any],
+    *,
+    time: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    step: Optional[str] = None,
+) -> GuardVerdict:
+    """Estimate the cost of a query and decide whether it may run.
+
+    Args:
+        query: PromQL written by the model.
+        request: Function performing Prometheus API requests (`make_prometheus_request`).
+        time: Evaluation time of an instant query.
+        start: Start of a range query.
+        end: End of a range query.
+        step: Step of a range query.
+
+    Returns:
+        The verdict; `step` holds the (possibly coarsened) step of range queries
+        and `error` the structured error to hand back when the query is rejected.
+    """
+    if not PROMQL_GUARD_ENABLED:
+        return GuardVerdict(allowed=True, step=step)
+    try:
+        selectors = parse_selectors(query)
+        if step is not None:
+            window_start, window_end = parse_time(start), parse_time(end)
+            step_seconds = parse_duration(step)
+            steps = int((window_end - window_start) // step_seconds) + 1 if step_seconds > 0 else 1
+        else:
+            window_start = window_end = parse_time(time)
+            step_seconds, steps = 0.0, 1
+        counted = _count_all(selectors, window_start, window_end, request)
+    except Exception as e:
+        logger.warning(f"PromQL cost guard skipped for {query!r}: {e}")
+        return GuardVerdict(allowed=True, step=step)
+
+    series = sum(count for _, count, _ in counted)
+    per_step = sum(count * selector.samples_per_step for selector, count, _ in counted)
+
+    note = None
+    if step is not None and (steps > MAX_RANGE_POINTS or per_step * steps > PROMQL_MAX_SAMPLES):
+        max_steps = min(MAX_RANGE_POINTS, int(PROMQL_MAX_SAMPLES // per_step) if per_step else MAX_RANGE_POINTS)
+        if max_steps >= MIN_REWRITE_POINTS:
+            new_step = _nice_step((window_end - window_start) / max(1, max_steps - 1))
+            note = (
+                f"step raised from {step} to {format_duration(new_step)} to stay within the budget of "
+                f"{PROMQL_MAX_SAMPLES:,} samples and {MAX_RANGE_POINTS} points per series"
+            )
+            step, step_seconds = f"{int(new_step)}s", new_step
+            steps = int((window_end - window_start) // step_seconds) + 1
+
+    samples = int(per_step * steps)
+    estimate = {
+        "series": series,
+        "series_capped": any(count > PROMQL_MAX_SERIES for _, count, _ in counted),
+        "samples": samples,
+        "steps": steps,
+        "selectors": [
+            {
+                "selector": selector.text,
+                "series": count,
+                **({"range": format_duration(selector.range_seconds)} if selector.range_seconds else {}),
+            }
+            for selector, count, _ in counted
+        ],
+    }
+    if series <= PROMQL_MAX_SERIES and samples <= PROMQL_MAX_SAMPLES:
+        if note:
+            logger.info(f"PromQL cost guard rewrote {query!r}: {note}")
+        metrics.PROMQL_GUARD_DECISIONS.labels("rewritten" if note else "allowed").inc()
+        return GuardVerdict(allowed=True, step=step, estimate=estimate, note=note)
+
+    suggestions = []
+    for selector, count, sample in sorted(counted, key=lambda c: c[1], reverse=True):
+        if count > PROMQL_MAX_SERIES / max(1, len(counted)):
+            suggestions.extend(_suggest_matchers(selector, sample))
+        if selector.range_seconds > 3600 and count * selector.samples_per_step * steps > PROMQL_MAX_SAMPLES / max(1, len(counted)):
+            suggestions.append(f"Shorten the [{format_duration(selector.range_seconds)}] range of {selector.text}")
+    if series > PROMQL_MAX_SERIES and not suggestions:
+        widest = max(counted, key=lambda c: c[1])[0]
+        suggestions.append(f"Add label matchers (e.g. namespace, job) to {widest.text} to select fewer series")
+    if step is not None:
+        suggestions.append("Query a shorter time window or use a larger step")
+
+    logger.warning(f"PromQL cost guard rejected {query!r}: {series} series, {samples} samples")
+    metrics.PROMQL_GUARD_DECISIONS.labels("rejected").inc()
+    return GuardVerdict(
+        allowed=False,
+        step=step,
+        estimate=estimate,
+        error={
+            "error": (
+                f"Query rejected by the PromQL cost guard: it would touch {series:,}{'+' if estimate['series_capped'] else ''} series "
+                f"and scan about {samples:,} samples, over the budget of {PROMQL_MAX_SERIES:,} series and "
+                f"{PROMQL_MAX_SAMPLES:,} samples. Narrow the query and try again; wrapping it in sum() or topk() "
+                f"does not help, the budget counts the series each selector reads."
+            ),
+            "query": query,
+            "estimate": estimate,
+            "budget": {"max_series": PROMQL_MAX_SERIES, "max_samples": PROMQL_MAX_SAMPLES},
+            "suggestions": suggestions,
+        },
+    )
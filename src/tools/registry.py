@@ -0,0 +1,84 @@
+"""The tools exposed by the agent and the MCP server.
+
+Both `agent.graph` and `mcps.server` serve this list, so a tool added here is
+available to the LangGraph agent and to external MCP clients alike.
+"""
+
+from typing import Dict, List
+
+from langchain_core.tools import BaseTool
+
+from tools.analytics import correlate_change_points, score_anomalies
+from tools.argocd import correlate_deploys
+from tools.backstage import (
+    get_entity_metadata,
+    list_entities,
+    list_entity_attributes,
+    search_catalog_entities,
+    search_entities_by_attribute,
+)
+from tools.k8s import (
+    cluster_capacity,
+    describe_deployment,
+    describe_deployments,
+    describe_pod,
+    describe_pods,
+    get_events,
+    get_pod_logs,
+    list_deployments,
+    list_nodes,
+    list_pods,
+    list_services,
+    search_logs,
+)
+from tools.prometheus import (
+    execute_query,
+    execute_range_query,
+    get_alerts,
+    list_metric_label_values,
+    search_metrics,
+)
+from tools.timeline import build_timeline
+
+# Tools by backend; the agent's tool router binds whole groups at a time
+TOOL_GROUPS: Dict[str, List[BaseTool]] = {
+    "kubernetes": [
+        list_pods,
+        describe_pod,
+        describe_pods,
+        get_pod_logs,
+        search_logs,
+        list_deployments,
+        describe_deployment,
+        describe_deployments,
+        list_services,
+        get_events,
+        list_nodes,
+        cluster_capacity,
+    ],
+    "prometheus": [
+        execute_query,
+        execute_range_query,
+        list_metric_label_values,
+        get_alerts,
+        search_metrics,
+        score_anomalies,
+        correlate_change_points,
+    ],
+    "argocd": [
+        correlate_deploys,
+    ],
+    # Cross-source tools
+    "timeline": [
+        build_timeline,
+    ],
+    "backstage": [
+        list_entities,
+        get_entity_metadata,
+        search_entities_by_attribute,
+        search_catalog_entities,
+        list_entity_attributes,
+    ],
+}
+
+SRE_TOOLS: List[BaseTool] = [tool for tools in TOOL_GROUPS.values() for tool in tools]
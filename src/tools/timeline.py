@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+"""Unified incident timeline across Kubernetes, ArgoCD and Prometheus.
+
+Every source is fetched concurrently and normalized into entries sorted by
+time; the per-source streams are then k-way merged with a heap, so building
+the timeline costs O(n log k) on top of the fetches and never re-sorts the
+combined list. Repeated events are collapsed while merging.
+
+Kubernetes events are streamed page by page and only the newest
+MAX_K8S_EVENTS since the start of the window are kept. ArgoCD deploys and
+failed syncs come from the shared deploy index (`tools.argocd.deploy_index`).
+"""
+
+import heapq
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.tools import tool
+
+from telemetry import tracing
+from tools.argocd import Deploy, deploy_index, make_argocd_request
+from tools.k8s import ALL_CLUSTERS, CLUSTER_ARG_HELP, clusters, iter_events
+from tools.prometheus import make_prometheus_request
+from tools.timeutil import parse_duration, parse_time
+
+logger = logging.getLogger(__name__)
+
+MAX_TIMELINE_ENTRIES = 200
+# Newest Kubernetes events kept per cluster
+MAX_K8S_EVENTS = 1000
+# Applications whose ArgoCD events are fetched (most recently deployed first)
+MAX_EVENT_APPLICATIONS = 20
+# Identical events closer than this to the previous occurrence are collapsed
+COLLAPSE_WINDOW_SECONDS = 600
+MAX_MESSAGE_CHARS = 300
+
+# (epoch seconds, entry)
+TimelineItem = Tuple[float, Dict[str, Any]]
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    try:
+        return parse_time(str(value))
+    except ValueError:
+        return None
+
+
+def _entry(source: str, kind: str, reason: str, obj: str, message: str, count: int = 1) -> Dict[str, Any]:
+    message = (message or "").strip()
+    if len(message) > MAX_MESSAGE_CHARS:
+        message = message[:MAX_MESSAGE_CHARS] + "..."
+    return {"source": source, "type": kind, "reason": reason, "object": obj, "message": message, "count": count or 1}
+
+
+def _sorted(items: Iterable[TimelineItem], since_ts: float) -> List[TimelineItem]:
+    return sorted((item for item in items if item[0] >= since_ts), key=lambda item: item[0])
+
+
+def _cluster_events(cluster: str, scope: str, since_ts: float, tag: bool) -> List[TimelineItem]:
+    """Return the newest MAX_K8S_EVENTS events of one cluster since `since_ts`, oldest first."""
+    newest: List[Tuple[float, int, Dict[str, Any]]] = []
+    for seq, event in enumerate(iter_events(scope, cluster)):
+        metadata = event.get("metadata") or {}
+        ts = _to_epoch(event.get("lastTimestamp") or event.get("eventTime") or event.get("firstTimestamp") or metadata.get("creationTimestamp"))
+        if ts is None or ts < since_ts or (len(newest) >= MAX_K8S_EVENTS and ts <= newest[0][0]):
+            continue
+        involved = event.get("involvedObject")
+        obj = f"{involved.get('kind')}/{involved.get('name')}" if involved else ""
+        if metadata.get("namespace"):
+            obj = f"{metadata['namespace']}/{obj}"
+        entry = _entry("k8s", event.get("type") or "Normal", event.get("reason") or "", obj, event.get("message"), event.get("count"))
+        if tag:
+            entry["cluster"] = cluster
+        # Min-heap on time: the oldest kept event is the first to go
+        if len(newest) < MAX_K8S_EVENTS:
+            heapq.heappush(newest, (ts, seq, entry))
+        else:
+            heapq.heapreplace(newest, (ts, seq, entry))
+    return [(ts, entry) for ts, _, entry in sorted(newest)]
+
+
+def _kubernetes_events(scope: str, since_ts: float, cluster: Optional[str] = None) -> List[TimelineItem]:
+    names = clusters.select(cluster)
+    tag = cluster == ALL_CLUSTERS
+    if len(names) == 1:
+        return _cluster_events(names[0], scope, since_ts, tag)
+    with tracing.ContextThreadPoolExecutor(max_workers=len(names)) as pool:
+        streams = list(pool.map(lambda name: _cluster_events(name, scope, since_ts, tag), names))
+    return list(heapq.merge(*streams, key=lambda item: item[0]))
+
+
+def _argocd_events(name: str) -> Iterator[TimelineItem]:
+    for event in make_argocd_request(f"applications/{name}/events").get("items", []):
+        ts = _to_epoch(event.get("lastTimestamp") or event.get("eventTime") or event.get("firstTimestamp"))
+        if ts is None:
+            continue
+        involved = event.get("involvedObject") or {}
+        obj = f"{involved.get('namespace') or event.get('metadata', {}).get('namespace', '')}/{involved.get('kind')}/{involved.get('name')}"
+        yield ts, _entry("argocd", event.get("type") or "Normal", event.get("reason") or "", obj, event.get("message"), event.get("count"))
+
+
+def _argocd_sync(deploy: Deploy) -> TimelineItem:
+    target = f"Application/{deploy.app}"
+    if deploy.phase == "Succeeded":
+        message = f"Synced revision {deploy.revision[:12]} (history id {deploy.history_id})"
+        return deploy.time, _entry("argocd", "Normal", "Deployed", target, message)
+    # Running or failed syncs never reach the history
+    kind = "Normal" if deploy.phase == "Running" else "Warning"
+    return deploy.time, _entry("argocd", kind, f"Sync{deploy.phase}", target, deploy.message)
+
+
+def _argocd_timeline(scope: str, since_ts: float, cluster: Optional[str] = None) -> List[TimelineItem]:
+    deploy_index.ensure_fresh()
+    namespace = None if scope == "all" else scope
+    # Already time-sorted by the index
+    items = [_argocd_sync(deploy) for deploy in deploy_index.between(since_ts, float("inf"), namespace)]
+    recent = deploy_index.latest_applications(namespace, MAX_EVENT_APPLICATIONS)
+    with tracing.ContextThreadPoolExecutor(max_workers=max(1, len(recent))) as pool:
+        for events in pool.map(lambda name: list(_argocd_events(name)), recent):
+            items.extend(events)
+    return _sorted(items, since_ts)
+
+
+def _alert_timeline(scope: str, since_ts: float, cluster: Optional[str] = None) -> List[TimelineItem]:
+    items = []
+    for alert in make_prometheus_request("alerts").get("alerts", []):
+        labels = alert.get("labels") or {}
+        if scope != "all" and labels.get("namespace") != scope:
+            continue
+        # Alertmanager payloads carry startsAt, the Prometheus API activeAt
+        ts = _to_epoch(alert.get("startsAt") or alert.get("activeAt"))
+        if ts is None:
+            continue
+        target = labels.get("pod") or labels.get("deployment") or labels.get("instance") or labels.get("job") or ""
+        obj = "/".join(part for part in (labels.get("namespace"), target) if part)
+        message = (alert.get("annotations") or {}).get("summary") or (alert.get("annotations") or {}).get("description")
+        reason = f"{labels.get('alertname', 'alert')} ({alert.get('state') or 'firing'})"
+        items.append((ts, _entry("alert", labels.get("severity") or "alert", reason, obj, message)))
+    return _sorted(items, since_ts)
+
+
+# Sources take (scope, since_ts, cluster); only Kubernetes is per cluster
+_SOURCES: Dict[str, Callable[[str, float, Optional[str]], List[TimelineItem]]] = {
+    "k8s": _kubernetes_events,
+    "argocd": _argocd_timeline,
+    "alert": _alert_timeline,
+}
+
+
+def merge_timeline(streams: List[List[TimelineItem]], limit: int = MAX_TIMELINE_ENTRIES) -> Tuple[List[Dict[str, Any]], int]:
+    """K-way merge time-sorted streams into one timeline, collapsing repeated events.
+
+    An event repeating the same (reason, object, message, cluster) within
+    COLLAPSE_WINDOW_SECONDS of its previous occurrence is folded into that
+    entry; the same event seen by several sources is tagged with all of them. Only the newest `limit` entries are kept.
+
+    Returns:
+        (entries oldest first, number of entries dropped by the limit)
+    """
+    kept: Deque[Dict[str, Any]] = deque()
+    open_entries: Dict[Tuple[str, str, str, Optional[str]], Dict[str, Any]] = {}
+    dropped = 0
+    for ts, entry in heapq.merge(*streams, key=lambda item: item[0]):
+        key = (entry["reason"], entry["object"], entry["message"], entry.get("cluster"))
+        previous = open_entries.get(key)
+        if previous is not None and ts - previous["_last"] <= COLLAPSE_WINDOW_SECONDS:
+            sources = previous["source"].split(",")
+            # The same event reported by a second source is tagged, not counted twice
+            if not (ts == previous["_last"] and entry["source"] not in sources):
+                previous["count"] += entry["count"]
+            previous["_last"] = ts
+            if entry["source"] not in sources:
+                previous["source"] += f",{entry['source']}"
+            continue
+        entry = dict(entry, _first=ts, _last=ts)
+        open_entries[key] = entry
+        kept.append(entry)
+        if len(kept) > limit:
+            evicted = kept.popleft()
+            dropped += 1
+            evicted_key = (evicted["reason"], evicted["object"], evicted["message"], evicted.get("cluster"))
+            if open_entries.get(evicted_key) is evicted:
+                del open_entries[evicted_key]
+
+    entries = []
+    for entry in kept:
+        first, last = entry.pop("_first"), entry.pop("_last")
+        entry = {"time": datetime.fromtimestamp(first, tz=timezone.utc).isoformat(timespec="seconds"), **entry}
+        if last != first:
+            entry["last_time"] = datetime.fromtimestamp(last, tz=timezone.utc).isoformat(timespec="seconds")
+        entries.append(entry)
+    return entries, dropped
+
+
+@tool(description="Build one time-ordered incident timeline for a namespace (or 'all'): Kubernetes events, ArgoCD deployments, failed syncs and application events, and Prometheus alert start times, merged and de-duplicated with a source tag on each entry. Use it to reconstruct what happened when instead of calling get_events, get_application_events and get_alerts separately." + CLUSTER_ARG_HELP)
+async def build_timeline(scope: str = "all", since: str = "1h", limit: int = MAX_TIMELINE_ENTRIES,
+                         cluster: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build a merged, time-ordered incident timeline.
+
+    Args:
+        scope: Namespace to build the timeline for, or 'all'.
+        since: Look-back window ("30m", "2h") or an absolute RFC3339 start time.
+        limit: Maximum number of entries; the newest ones are kept.
+        cluster: Cluster whose Kubernetes events are included (default: the first one), or 'all'.
+
+    Returns:
+        A dictionary with the timeline entries (oldest first), per-source entry
+        counts and the errors of sources that could not be fetched.
+    """
+    logger.info(f"Building timeline for {scope} since {since}")
+    started = time.perf_counter()
+    try:
+        since_ts = time.time() - parse_duration(since)
+    except ValueError:
+        since_ts = parse_time(since)
+    limit = max(1, min(limit, MAX_TIMELINE_ENTRIES))
+
+    def fetch(name: str) -> Tuple[str, Any]:
+        try:
+            return name, _SOURCES[name](scope, since_ts, cluster)
+        except Exception as e:
+            logger.warning(f"Timeline source {name} failed: {e}")
+            return name, e
+
+    with tracing.ContextThreadPoolExecutor(max_workers=len(_SOURCES)) as pool:
+        fetched = dict(pool.map(fetch, _SOURCES))
+
+    streams = [items for items in fetched.values() if isinstance(items, list)]
+    entries, dropped = merge_timeline(streams, limit)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Timeline for {scope}: {sum(len(s) for s in streams)} events merged into {len(entries)} entries in {elapsed:.3f}s")
+    return {
+        "scope": scope,
+        "since": datetime.fromtimestamp(since_ts, tz=timezone.utc).isoformat(timespec="seconds"),
+        "entries": entries,
+        "count": len(entries),
+        "dropped": dropped,
+        "sources": {name: len(items) for name, items in fetched.items() if isinstance(items, list)},
+        "errors": {name: str(error) for name, error in fetched.items() if isinstance(error, Exception)},
+    }
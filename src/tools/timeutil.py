@@ -0,0 +1,48 @@
+"""Time helpers shared by the tools: Prometheus-style durations and API timestamps."""
+
+import math
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+
+
+def parse_duration(text: str) -> float:
+    """Parse a Prometheus duration ("5m", "1h30m") or a float number of seconds."""
+    text = str(text).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(text)
+    if not parts or "".join(n + u for n, u in parts) != text:
+        raise ValueError(f"invalid duration: {text!r}")
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def parse_time(value: Optional[str]) -> float:
+    """Parse a Prometheus API timestamp (RFC3339 or Unix seconds); None means now."""
+    if value is None or value == "":
+        return time.time()
+    try:
+        return float(value)
+    except ValueError:
+        # Prometheus reports nanoseconds; fromisoformat takes at most microseconds
+        text = re.sub(r"(\.\d{6})\d+", r"\1", str(value).replace("Z", "+00:00"))
+        parsed = datetime.fromisoformat(text)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+def format_duration(seconds: float) -> str:
+    """Render seconds as a compact Prometheus duration."""
+    seconds = int(math.ceil(seconds))
+    for unit in ("d", "h", "m"):
+        size = _DURATION_UNITS[unit]
+        if seconds >= size and seconds % size == 0:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
@@ -1,5 +1,7 @@
 import os
 import sys
+import asyncio
+import logging
 import discord
 from dotenv import load_dotenv
 from collections import defaultdict
@@ -15,10 +17,22 @@ for _p in (SRC_DIR, REPO_ROOT):
     if _p not in sys.path:
         sys.path.insert(0, _p)
 
-from agent import graph
-
 load_dotenv()
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# The agent graph is built lazily (see agent.get_graph) so the bot can log in first
+from agent import get_graph
+from telemetry import cassette, tracing
+from telemetry.metrics import DISCORD_QUEUE_DEPTH, start_metrics_server
+from tools.prometheus import metric_catalog
+
+# AGENT_CASSETTE records (or replays) the bot's backend and LLM traffic
+cassette.install_from_env()
 langfuse_handler = CallbackHandler()
 intents = discord.Intents.default()
 intents.message_content = True
@@ -107,6 +121,9 @@ class VibeDebuggerDiscordClient(discord.Client):
         print(self.user.name)
         print(self.user.id)
         print('------')
+        # Warm up the agent graph and the metric catalog off the event loop so the first alert does not pay for them
+        metric_catalog.warm()
+        await asyncio.to_thread(get_graph)
 
     async def on_message(self, message):
         print(f'Message from {message.author}: {message.content}')
@@ -119,10 +136,13 @@ class VibeDebuggerDiscordClient(discord.Client):
         channel_history.append(("user", message.content or ""))
 
         # Send the accumulated conversation to the agent and reply with its answer
+        DISCORD_QUEUE_DEPTH.inc()
         try:
-            result = await graph.ainvoke({
-                "messages": channel_history
-            }, config={"callbacks": [langfuse_handler]})
+            graph = await asyncio.to_thread(get_graph)
+            with tracing.span("discord.message", {"discord.channel_id": message.channel.id, "message.length": len(message.content or "")}):
+                result = await graph.ainvoke({
+                    "messages": channel_history
+                }, config={"callbacks": [langfuse_handler]})
 
             # Extract the latest assistant message content
             messages = result.get("messages", [])
@@ -135,6 +155,8 @@ class VibeDebuggerDiscordClient(discord.Client):
                 reply_content = "(no response)"
         except Exception as e:
             reply_content = f"Agent error: {e}"
+        finally:
+            DISCORD_QUEUE_DEPTH.dec()
 
         # Track assistant response in history
         channel_history.append(("assistant", reply_content))
@@ -145,5 +167,6 @@ class VibeDebuggerDiscordClient(discord.Client):
             if chunk.strip():  # Only send non-empty chunks
                 await message.channel.send(chunk)
 
+start_metrics_server()
 client = VibeDebuggerDiscordClient(intents=intents)
 client.run(os.getenv('DISCORD_TOKEN') or os.getenv('DISCORD_PUBLIC_KEY'))
@@ -0,0 +1,81 @@
+import json
+
+from agent.alerts import (
+    matching_prometheus_alerts,
+    notification_fingerprint,
+    parse_alert_message,
+)
+
+
+def _webhook(*alerts, status="firing"):
+    return json.dumps({"status": status, "alerts": [{"labels": labels, "startsAt": "2025-01-01T10:00:00Z"} for labels in alerts]})
+
+
+def _one(text):
+    alerts = parse_alert_message(text)
+    assert len(alerts) == 1, alerts
+    return alerts[0]
+
+
+def test_severity_is_not_part_of_the_identity():
+    warning = _one(_webhook({"alertname": "HighCPU", "namespace": "apps", "severity": "warning"}))
+    critical = _one(_webhook({"alertname": "HighCPU", "namespace": "apps", "severity": "critical"}))
+    assert warning.fingerprint == critical.fingerprint
+    assert "severity" not in warning.identity_labels
+
+
+def test_identity_labels_tell_alerts_apart():
+    apps = _one(_webhook({"alertname": "HighCPU", "namespace": "apps"}))
+    payments = _one(_webhook({"alertname": "HighCPU", "namespace": "payments"}))
+    other = _one(_webhook({"alertname": "HighMemory", "namespace": "apps"}))
+    assert len({apps.fingerprint, payments.fingerprint, other.fingerprint}) == 3
+
+
+def test_fingerprint_ignores_label_order():
+    a = _one(json.dumps({"labels": {"alertname": "X", "pod": "p", "namespace": "n"}}))
+    b = _one(json.dumps({"labels": {"namespace": "n", "alertname": "X", "pod": "p"}}))
+    assert a.fingerprint == b.fingerprint
+
+
+def test_notification_fingerprint_is_order_independent_and_deduplicated():
+    first, second = parse_alert_message(_webhook({"alertname": "A"}, {"alertname": "B"}))
+    assert notification_fingerprint([first, second]) == notification_fingerprint([second, first])
+    assert notification_fingerprint([first, first]) == first.fingerprint
+    assert set(notification_fingerprint([first, second]).split("+")) == {first.fingerprint, second.fingerprint}
+
+
+def test_proxy_and_label_set_messages_match_the_webhook_identity():
+    webhook = _one(_webhook({"alertname": "KubePodCrashLooping", "namespace": "apps", "pod": "api-1", "severity": "critical"}))
+    proxy = _one(
+        "🚨 **KubePodCrashLooping** (FIRING)\n"
+        "**Namespace:** apps\n"
+        "**Pod:** api-1\n"
+        "**Severidade:** warning\n"
+        "**Instance:** unknown\n"
+        "**Início:** 2025-01-01T10:00:00Z"
+    )
+    label_set = _one('alertname="KubePodCrashLooping", namespace="apps", pod="api-1"')
+    assert proxy.fingerprint == webhook.fingerprint == label_set.fingerprint
+    assert proxy.starts_at == "2025-01-01T10:00:00Z"
+
+
+def test_resolved_status():
+    assert _one(_webhook({"alertname": "A"}, status="resolved")).resolved
+    assert _one("✅ **A** (RESOLVED)\n**Namespace:** apps").resolved
+    assert not _one(_webhook({"alertname": "A"})).resolved
+
+
+def test_questions_are_not_alerts():
+    assert parse_alert_message("Quais pods estão reiniciando?") == []
+    assert parse_alert_message('{"question": "why?"}') == []
+    assert parse_alert_message("") == []
+
+
+def test_matching_prometheus_alerts_requires_every_identity_label():
+    alert = _one(_webhook({"alertname": "HighCPU", "namespace": "apps", "severity": "critical"}))
+    candidates = [
+        {"labels": {"alertname": "HighCPU", "namespace": "apps", "severity": "warning", "pod": "a"}},
+        {"labels": {"alertname": "HighCPU", "namespace": "payments"}},
+        {"labels": {"alertname": "HighMemory", "namespace": "apps"}},
+    ]
+    assert matching_prometheus_alerts(alert, candidates) == candidates[:1]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+import tools.analytics as analytics
+
+ALERT_TS = 1_700_000_000
+
+
+@pytest.fixture
+def prometheus(monkeypatch):
+    """Serve /alerts from a list the test fills and record the range queries sent."""
+    alerts, queries = [], []
+    monkeypatch.setattr(analytics, "make_prometheus_request", lambda endpoint, params=None: {"alerts": alerts})
+
+    def range_query(query, start, end, step):
+        queries.append(query)
+        return {"resultType": "matrix", "result": []}
+
+    monkeypatch.setattr(analytics, "range_query", range_query)
+    return alerts, queries
+
+
+def _alert(namespace, active_at):
+    return {"labels": {"alertname": "HighCPU", "namespace": namespace}, "activeAt": str(active_at), "state": "firing"}
+
+
+def _correlate(**args):
+    return asyncio.run(analytics.correlate_change_points.ainvoke({"starts_at": str(ALERT_TS), **args}))
+
+
+def test_unscoped_call_without_alert_namespaces_is_refused(prometheus):
+    alerts, queries = prometheus
+    alerts.append(_alert("old", ALERT_TS - 86400))
+    result = _correlate()
+    assert "namespace" in result["error"]
+    assert queries == []
+
+
+def test_unscoped_call_scans_the_namespaces_of_nearby_alerts(prometheus):
+    alerts, queries = prometheus
+    alerts.extend([_alert("far", ALERT_TS - 3000), _alert("near", ALERT_TS - 60), _alert("old", ALERT_TS - 86400)])
+    result = _correlate()
+    assert result["namespaces"] == ["near", "far"]
+    assert queries and all('namespace=~"near|far"' in query for query in queries)
+    assert not any('".+"' in query for query in queries)
+
+
+def test_given_namespace_skips_the_alert_lookup(prometheus):
+    _, queries = prometheus
+    result = _correlate(namespace="payments")
+    assert result["namespaces"] == ["payments"]
+    assert all('namespace=~"payments"' in query for query in queries)
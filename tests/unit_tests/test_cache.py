@@ -0,0 +1,119 @@
+import json
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+import agent.graph as graph
+from agent.cache import CachedInvestigation, InvestigationCache, evidence_hash
+
+
+def _alert(state="firing", active_at="2025-01-01T10:00:00Z", value="0.9", **labels):
+    return {"labels": {"alertname": "HighCPU", **labels}, "state": state, "activeAt": active_at, "value": value}
+
+
+def test_evidence_hash_ignores_value_and_order():
+    a, b = _alert(pod="a"), _alert(pod="b")
+    assert evidence_hash([a, b]) == evidence_hash([b, dict(a, value="42")])
+
+
+@pytest.mark.parametrize("change", [{"state": "pending"}, {"active_at": "2025-01-01T11:00:00Z"}, {"pod": "c"}])
+def test_evidence_hash_changes_with_material_fields(change):
+    assert evidence_hash([_alert(pod="a")]) != evidence_hash([_alert(**{"pod": "a", **change})])
+
+
+def _entry(report="report", created_at=None):
+    return CachedInvestigation(report=report, evidence_hash="h", created_at=created_at or time.time())
+
+
+def test_entries_expire_after_the_ttl():
+    cache = InvestigationCache(ttl_seconds=60)
+    cache.put("fresh", _entry())
+    cache.put("old", _entry(created_at=time.time() - 61))
+    assert cache.get("fresh") is not None
+    assert cache.get("old") is None
+    assert len(cache) == 1
+
+
+def test_oldest_entry_is_dropped_when_full():
+    cache = InvestigationCache(max_entries=2)
+    now = time.time()
+    cache.put("a", _entry(created_at=now - 30))
+    cache.put("b", _entry(created_at=now - 20))
+    cache.put("c", _entry(created_at=now - 10))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+
+
+def test_evict_removes_every_notification_containing_the_alert():
+    cache = InvestigationCache()
+    cache.put("aaa", _entry())
+    cache.put("aaa+bbb", _entry())
+    cache.put("bbb", _entry())
+    assert cache.evict("aaa") == 2
+    assert cache.get("bbb") is not None
+    assert cache.evict("zzz") == 0
+
+
+@pytest.fixture
+def prometheus_alerts(monkeypatch):
+    """Serve `get_alerts` from a list the test can change; use a fresh investigation cache."""
+    alerts = [_alert(namespace="apps", pod="api-1")]
+    monkeypatch.setattr(graph, "make_prometheus_request", lambda endpoint, params=None: {"alerts": alerts})
+    monkeypatch.setattr(graph, "investigation_cache", InvestigationCache())
+    return alerts
+
+
+def _notification(status="firing"):
+    labels = {"alertname": "HighCPU", "namespace": "apps", "severity": "critical"}
+    return {"messages": [HumanMessage(json.dumps({"status": status, "alerts": [{"labels": labels}]}))]}
+
+
+def _investigate(state):
+    """Run the cache check and, on a miss, store a report the way the graph does."""
+    result = graph.check_investigation_cache(state)
+    investigation = result["investigation"]
+    if investigation.get("fingerprint") and not investigation.get("cached"):
+        graph.store_investigation({**state, "investigation": investigation, "messages": [AIMessage("report v1")]})
+    return result
+
+
+def test_renotification_with_unchanged_evidence_reuses_the_report(prometheus_alerts):
+    first = _investigate(_notification())
+    assert not first["investigation"].get("cached")
+
+    prometheus_alerts[0] = dict(prometheus_alerts[0], value="0.95")  # value moves on every evaluation
+    second = graph.check_investigation_cache(_notification())
+    assert second["investigation"]["cached"]
+    assert "report v1" in second["messages"][0].content
+
+
+def test_changed_evidence_reinvestigates_the_delta(prometheus_alerts):
+    _investigate(_notification())
+    prometheus_alerts.append(_alert(namespace="apps", pod="api-2"))
+
+    result = graph.check_investigation_cache(_notification())
+    assert not result["investigation"].get("cached")
+    (delta,) = result["messages"]
+    assert isinstance(delta, SystemMessage)
+    assert "api-2" in delta.content and "report v1" in delta.content
+
+
+def test_resolved_notification_evicts_the_investigation(prometheus_alerts):
+    _investigate(_notification())
+    assert len(graph.investigation_cache) == 1
+
+    assert graph.check_investigation_cache(_notification("resolved")) == {"investigation": {}}
+    assert len(graph.investigation_cache) == 0
+    assert not graph.check_investigation_cache(_notification())["investigation"].get("cached")
+
+
+def test_notification_without_prometheus_evidence_bypasses_the_cache(prometheus_alerts):
+    prometheus_alerts.clear()  # e.g. the alert already left Prometheus, or its labels do not match
+    first = _investigate(_notification())
+    assert "fingerprint" not in first["investigation"]
+    assert len(graph.investigation_cache) == 0
+
+    second = graph.check_investigation_cache(_notification())
+    assert not second["investigation"].get("cached")
+    assert "messages" not in second
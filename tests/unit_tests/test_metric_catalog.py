@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+
+import tools.prometheus as prometheus
+from tools.prometheus import MetricCatalog
+
+NAMES = [f"metric_{i:03d}_seconds_total" for i in range(120)]
+
+
+@pytest.fixture
+def fake_prometheus(monkeypatch):
+    """Serve the catalog endpoints; /series blocks until `labels_ready` is set."""
+    labels_ready = threading.Event()
+    labels_ready.set()
+    series_calls = []
+
+    def request(endpoint, params=None):
+        if endpoint == "label/__name__/values":
+            return NAMES
+        if endpoint == "metadata":
+            return {name: [{"type": "counter", "help": f"Help of {name}"}] for name in NAMES}
+        assert endpoint == "series"
+        labels_ready.wait(5)
+        series_calls.append(threading.get_ident())
+        return [{"__name__": match[11:-2], "pod": "p", "namespace": "n"} for match in params["match[]"]]
+
+    monkeypatch.setattr(prometheus, "make_prometheus_request", request)
+    monkeypatch.setattr(prometheus.config, "url", "http://prometheus.test")
+    return labels_ready, series_calls
+
+
+def test_refresh_collects_labels_of_every_batch(fake_prometheus):
+    _, series_calls = fake_prometheus
+    catalog = MetricCatalog()
+    catalog.refresh()
+    assert len(catalog) == len(NAMES) and catalog.complete
+    assert len(series_calls) == -(-len(NAMES) // prometheus.CATALOG_SERIES_BATCH)
+    ((_, entry),) = catalog.search(NAMES[7], limit=1)
+    assert entry.name == NAMES[7] and entry.labels == ("namespace", "pod")
+
+
+def test_cold_search_answers_from_names_while_labels_load(fake_prometheus, monkeypatch):
+    labels_ready, _ = fake_prometheus
+    labels_ready.clear()
+    monkeypatch.setattr(prometheus, "metric_catalog", MetricCatalog())
+    monkeypatch.setattr(prometheus, "CATALOG_COLD_WAIT_SECONDS", 2)
+
+    result = asyncio.run(prometheus.search_metrics.ainvoke({"term": NAMES[3]}))
+    assert result["matches"][0]["name"] == NAMES[3]
+    assert result["matches"][0]["labels"] == []
+    assert result["catalog"]["complete"] is False
+
+    labels_ready.set()
+    with prometheus.metric_catalog._refreshing:  # wait for the background load
+        pass
+    assert prometheus.metric_catalog.complete
+
+
+def test_failed_cold_load_is_reported(monkeypatch):
+    def request(endpoint, params=None):
+        raise ConnectionError("prometheus down")
+
+    monkeypatch.setattr(prometheus, "make_prometheus_request", request)
+    monkeypatch.setattr(prometheus.config, "url", "http://prometheus.test")
+    with pytest.raises(RuntimeError, match="prometheus down"):
+        MetricCatalog().ensure_fresh(timeout=2)
+
+
+def test_capped_batches_ask_again_for_the_metrics_left_out(fake_prometheus, monkeypatch):
+    _, series_calls = fake_prometheus
+    # Each request returns at most 30 series, so a batch of 50 metrics needs two requests
+    monkeypatch.setattr(prometheus, "CATALOG_SERIES_LIMIT", 30)
+    request = prometheus.make_prometheus_request
+    monkeypatch.setattr(prometheus, "make_prometheus_request", lambda endpoint, params=None: (
+        request(endpoint, params)[:int(params["limit"])] if endpoint == "series" else request(endpoint, params)
+    ))
+    catalog = MetricCatalog()
+    catalog.refresh()
+    assert all(entry.labels == ("namespace", "pod") for _, entry in catalog.search("metric", limit=len(NAMES)))
+    assert len(series_calls) > -(-len(NAMES) // prometheus.CATALOG_SERIES_BATCH)
+
+
+def test_stale_searches_start_a_single_refresh(fake_prometheus):
+    labels_ready, _ = fake_prometheus
+    catalog = MetricCatalog(refresh_seconds=0)
+    catalog.refresh()
+    started = []
+    refresh = catalog._refresh_quietly
+    catalog._refresh_quietly = lambda: started.append(1) or refresh()
+    labels_ready.clear()
+    for _ in range(5):
+        catalog.ensure_fresh()
+    labels_ready.set()
+    catalog._refresh_thread.join(5)
+    assert len(started) == 1
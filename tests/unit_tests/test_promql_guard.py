@@ -0,0 +1,131 @@
+import pytest
+
+from tools.promql_guard import (
+    PROMQL_MAX_SERIES,
+    SCRAPE_INTERVAL_SECONDS,
+    guard_query,
+    parse_selectors,
+    series_counts,
+)
+
+
+def _only(query):
+    selectors = parse_selectors(query)
+    assert len(selectors) == 1, selectors
+    return selectors[0]
+
+
+def test_metric_and_matchers():
+    selector = _only('http_requests_total{job="api", code=~"5..", path!="/health"}')
+    assert selector.metric == "http_requests_total"
+    assert selector.matchers == [("job", "=", "api"), ("code", "=~", "5.."), ("path", "!=", "/health")]
+
+
+def test_name_matcher_and_quoted_metric():
+    assert _only('{__name__="up", job="node"}').metric == "up"
+    assert _only('{"up", job="node"}').metric == "up"
+
+
+def test_strings_with_brackets_do_not_confuse_the_scanner():
+    selector = _only('count(x{path=~"/api/{id}[0-9]+"})')
+    assert selector.metric == "x"
+    assert selector.matchers == [("path", "=~", "/api/{id}[0-9]+")]
+
+
+def test_functions_keywords_and_grouping_are_not_selectors():
+    selectors = parse_selectors('sum by (namespace) (rate(a[5m])) / on (namespace) group_left sum without (pod) (b) > bool 0')
+    assert [s.metric for s in selectors] == ["a", "b"]
+
+
+def test_range_and_offset():
+    selector = _only("rate(x[5m] offset 1h)")
+    assert selector.range_seconds == 300
+    assert selector.offset_seconds == 3600
+    assert selector.samples_per_step == 300 / SCRAPE_INTERVAL_SECONDS
+
+
+@pytest.mark.parametrize("query", ["x offset -5m", "x offset - 5m", "rate(x[1m] offset -5m)"])
+def test_negative_offset(query):
+    assert _only(query).offset_seconds == -300
+
+
+def test_offsets_apply_to_their_own_selector():
+    selectors = parse_selectors("x offset 2m - y offset -30s")
+    assert [(s.metric, s.offset_seconds) for s in selectors] == [("x", 120), ("y", -30)]
+
+
+def test_subquery_multiplies_inner_selectors():
+    selector = _only("max_over_time(rate(x[5m])[1h:1m])")
+    assert selector.range_seconds == 300
+    assert selector.subquery_factor == 60
+
+
+def test_subquery_over_instant_selector():
+    selector = _only("max_over_time(x[1h:5m])")
+    assert selector.range_seconds == 0
+    assert selector.subquery_factor == 12
+
+
+def test_at_modifier_numbers_and_comments_are_skipped():
+    selectors = parse_selectors("x @ 1609746000 * 2.5e3 # trailing y{a=\"b\"}\n+ z @ end()")
+    assert [s.metric for s in selectors] == ["x", "z"]
+
+
+@pytest.mark.parametrize("query", ["x{job=}", "x{job=\"a\"", "x[5q]"])
+def test_malformed_queries_raise(query):
+    with pytest.raises(ValueError):
+        parse_selectors(query)
+
+
+def _fake_series(calls, count=10):
+    def request(endpoint, params):
+        calls.append(params)
+        return [{"__name__": "x", "pod": str(i)} for i in range(count)]
+
+    return request
+
+
+def test_guard_counts_each_distinct_selector_once_and_caches_it():
+    series_counts.clear()
+    calls = []
+    query = "sum(rate(a[5m])) / sum(rate(b[1h])) + a + a offset 1h"
+    verdict = guard_query(query, _fake_series(calls))
+    assert verdict.allowed
+    # a[5m], a and a offset 1h all read a 5m window (the lookback delta)
+    assert sorted(c["match[]"] for c in calls) == ["a", "b"]
+    assert verdict.estimate["series"] == 40
+
+    guard_query(query, _fake_series(calls))
+    assert len(calls) == 2
+
+
+def test_guard_negative_offset_moves_the_window_forward():
+    series_counts.clear()
+    calls = []
+    guard_query("x offset -1h", _fake_series(calls), time="10000")
+    assert float(calls[0]["end"]) == 10000 + 3600
+
+
+def test_guard_rejects_over_budget():
+    series_counts.clear()
+    verdict = guard_query("x", _fake_series([], count=PROMQL_MAX_SERIES + 1))
+    assert not verdict.allowed
+    assert verdict.estimate["series_capped"]
+    assert verdict.error["suggestions"]
+
+
+def test_suggested_matcher_brings_a_rejected_query_under_budget():
+    series_counts.clear()
+
+    def request(endpoint, params):
+        series = [{"__name__": "x", "namespace": f"ns-{i % 5}", "pod": str(i)} for i in range(PROMQL_MAX_SERIES + 1)]
+        return [labels for labels in series if f'namespace="{labels["namespace"]}"' in params["match[]"] or params["match[]"] == "x"]
+
+    verdict = guard_query("sum by (namespace) (x)", request)
+    assert not verdict.allowed
+    assert not any("sum" in s or "topk" in s for s in verdict.error["suggestions"])
+    first = verdict.error["suggestions"][0]
+    assert first.startswith("Add a namespace matcher")
+
+    matcher = first.split("e.g. ")[1].split(",")[0]
+    assert guard_query(f"sum by (namespace) (x{{{matcher}}})", request).allowed
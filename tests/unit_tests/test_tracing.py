@@ -0,0 +1,22 @@
+from contextvars import ContextVar
+
+from telemetry import tracing
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def test_pooled_calls_see_the_submitters_context():
+    request_id.set("r-1")
+    with tracing.ContextThreadPoolExecutor(max_workers=4) as pool:
+        seen = list(pool.map(lambda _: request_id.get(), range(8)))
+    assert seen == ["r-1"] * 8
+
+
+def test_pooled_calls_nest_under_the_current_span():
+    parent = object()
+    token = tracing._current_span.set(parent)
+    try:
+        with tracing.ContextThreadPoolExecutor(max_workers=2) as pool:
+            assert list(pool.map(lambda _: tracing._current_span.get(), range(2))) == [parent, parent]
+    finally:
+        tracing._current_span.reset(token)